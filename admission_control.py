@@ -0,0 +1,159 @@
+"""
+Admission control and load shedding for the FastAPI backend.
+
+Requests are grouped into endpoint classes (cheap lookups, text inference,
+audio inference, agent calls). Each class has its own concurrency limit and
+waiting-queue depth, and keeps an EWMA of its service time. A request is
+rejected up front with 503 and ``Retry-After`` when its class queue is full
+or its estimated wait exceeds the class budget, so a burst of audio uploads
+cannot push text requests (or health checks) into the tens of seconds.
+
+It is a pure ASGI middleware (not BaseHTTPMiddleware), so response bodies pass
+through untouched; exempt paths such as the reminder SSE stream skip it.
+"""
+import asyncio
+import json
+import logging
+import math
+import time
+from typing import Dict, Iterable, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class EndpointClass:
+    """Limits and live counters for one class of endpoints"""
+
+    def __init__(self, name: str, max_concurrency: int, max_queue: int,
+                 wait_budget: float, initial_service_time: float, alpha: float = 0.2):
+        self.name = name
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.wait_budget = wait_budget
+        self.service_time = initial_service_time  # EWMA, seconds
+        self.alpha = alpha
+        self.in_flight = 0
+        self.waiting = 0
+        self.admitted = 0
+        self.rejected = 0
+        self._semaphore: Optional[asyncio.Semaphore] = None
+
+    @property
+    def semaphore(self) -> asyncio.Semaphore:
+        # Created on first use so it binds to the serving event loop (per worker after fork)
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        return self._semaphore
+
+    def estimated_wait(self) -> float:
+        """Expected queueing delay for a request arriving now"""
+        if self.in_flight < self.max_concurrency:
+            return 0.0
+        return math.ceil((self.waiting + 1) / self.max_concurrency) * self.service_time
+
+    def record(self, seconds: float) -> None:
+        self.service_time += self.alpha * (seconds - self.service_time)
+
+    def status(self) -> Dict:
+        return {
+            "in_flight": self.in_flight,
+            "waiting": self.waiting,
+            "max_concurrency": self.max_concurrency,
+            "max_queue": self.max_queue,
+            "service_time_ewma": round(self.service_time, 4),
+            "estimated_wait": round(self.estimated_wait(), 3),
+            "admitted": self.admitted,
+            "rejected": self.rejected
+        }
+
+
+def default_endpoint_classes() -> Dict[str, EndpointClass]:
+    return {
+        "cheap": EndpointClass("cheap", max_concurrency=64, max_queue=256, wait_budget=1.0, initial_service_time=0.01),
+        "text": EndpointClass("text", max_concurrency=4, max_queue=32, wait_budget=10.0, initial_service_time=0.5),
+        "audio": EndpointClass("audio", max_concurrency=2, max_queue=8, wait_budget=20.0, initial_service_time=3.0),
+        "agent": EndpointClass("agent", max_concurrency=2, max_queue=8, wait_budget=20.0, initial_service_time=5.0)
+    }
+
+
+class AdmissionController:
+    """Maps request paths to endpoint classes and decides admission"""
+
+    def __init__(self, routes: Iterable[Tuple[str, str]], classes: Optional[Dict[str, EndpointClass]] = None,
+                 default_class: str = "cheap", exempt: Iterable[str] = ()):
+        self.routes = list(routes)  # (path prefix, class name), first match wins
+        self.classes = classes or default_endpoint_classes()
+        self.default_class = default_class
+        self.exempt = set(exempt)
+
+    def classify(self, path: str) -> Optional[EndpointClass]:
+        """Endpoint class for a path, or None if the path bypasses admission control"""
+        if path in self.exempt:
+            return None
+        for prefix, name in self.routes:
+            if path.startswith(prefix):
+                return self.classes[name]
+        return self.classes[self.default_class]
+
+    def status(self) -> Dict[str, Dict]:
+        return {name: endpoint_class.status() for name, endpoint_class in self.classes.items()}
+
+
+class AdmissionControlMiddleware:
+    def __init__(self, app, controller: AdmissionController):
+        self.app = app
+        self.controller = controller
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        endpoint_class = self.controller.classify(scope["path"])
+        if endpoint_class is None:
+            return await self.app(scope, receive, send)
+
+        semaphore = endpoint_class.semaphore
+        if not semaphore.locked():
+            # Free slot: acquiring does not suspend, so no other request can take it first
+            await semaphore.acquire()
+        else:
+            estimated_wait = endpoint_class.estimated_wait()
+            if endpoint_class.waiting >= endpoint_class.max_queue or estimated_wait > endpoint_class.wait_budget:
+                return await self.reject(send, endpoint_class, estimated_wait)
+
+            endpoint_class.waiting += 1
+            try:
+                await asyncio.wait_for(semaphore.acquire(), endpoint_class.wait_budget)
+            except asyncio.TimeoutError:
+                return await self.reject(send, endpoint_class, endpoint_class.estimated_wait())
+            finally:
+                endpoint_class.waiting -= 1
+
+        endpoint_class.in_flight += 1
+        endpoint_class.admitted += 1
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            endpoint_class.record(time.perf_counter() - start)
+            endpoint_class.in_flight -= 1
+            endpoint_class.semaphore.release()
+
+    async def reject(self, send, endpoint_class: EndpointClass, estimated_wait: float):
+        endpoint_class.rejected += 1
+        retry_after = max(1, math.ceil(estimated_wait or endpoint_class.service_time))
+        logger.warning(f"Shedding {endpoint_class.name} request: {endpoint_class.waiting} waiting, "
+                       f"estimated wait {estimated_wait:.1f}s")
+        body = json.dumps({
+            "detail": f"Server is busy ({endpoint_class.name} requests), please retry in {retry_after}s"
+        }).encode()
+        await send({
+            "type": "http.response.start",
+            "status": 503,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode()),
+                (b"retry-after", str(retry_after).encode())
+            ]
+        })
+        await send({"type": "http.response.body", "body": body})
@@ -0,0 +1,212 @@
+"""
+Process pool for acoustic feature extraction.
+
+librosa's feature code holds the GIL for long stretches, so two audio requests
+extracting features on backend threads mostly take turns. ``AudioFeaturePool``
+runs ``extract_mood_features`` (EnhancedMoodDetector) and
+``voice_feature_summary`` (VoiceMoodDetector) in worker processes instead.
+The PCM is not pickled: it is copied once into a ``SharedMemory`` block and
+each worker maps the block by name. Only the small feature vector comes back.
+
+Workers are spawned (not forked from a process full of threads and model
+weights) and warmed up by their initializer: librosa and numba are imported
+and one short clip is run through both extractors, so the first request does
+not pay for imports and JIT compilation. ``status()`` reports queued and
+running tasks and how busy the workers have been, for ``/stats``.
+
+``MEAL_FEATURE_WORKERS`` sets the number of processes (default: one per core,
+at most 4); 0 disables the pool and callers extract in their own thread.
+``submit`` raises ``FeaturePoolUnavailable`` when the pool is disabled (or
+could not be started), so callers can fall back to their own thread.
+"""
+import logging
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import Future, ProcessPoolExecutor
+from multiprocessing import shared_memory
+from typing import Dict, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+WORKERS_ENV = "MEAL_FEATURE_WORKERS"
+MAX_DEFAULT_WORKERS = 4
+WARMUP_SECONDS = 1.0
+
+
+class FeaturePoolUnavailable(RuntimeError):
+    """The pool is disabled or failed to start; extract in the calling thread instead"""
+
+
+def default_workers() -> int:
+    """MEAL_FEATURE_WORKERS, else one process per core (at most MAX_DEFAULT_WORKERS)"""
+    configured = os.environ.get(WORKERS_ENV)
+    if configured:
+        return max(0, int(configured))
+    return min(os.cpu_count() or 1, MAX_DEFAULT_WORKERS)
+
+
+# --- Worker side ---
+
+def _warm_worker():
+    """Initializer: import librosa (and numba) and JIT the feature code on a short tone"""
+    from audio_features import extract_mood_features, voice_feature_summary
+    sr = 16000
+    t = np.arange(int(WARMUP_SECONDS * sr)) / sr
+    tone = (0.1 * np.sin(2 * np.pi * 220 * t)).astype(np.float32)
+    extract_mood_features(tone, sr, "full")
+    extract_mood_features(tone, sr, "fast")
+    voice_feature_summary(tone, sr, "full")
+
+
+def _extract(kind: str, name: str, length: int, sr: int, profile: Optional[str]):
+    """Run one extractor on a shared-memory buffer; returns (features, seconds spent, pid)"""
+    from audio_features import extract_mood_features, voice_feature_summary
+    start = time.perf_counter()
+    block = shared_memory.SharedMemory(name=name)
+    try:
+        samples = np.ndarray((length,), dtype=np.float32, buffer=block.buf)
+        if kind == "mood":
+            features = extract_mood_features(samples, sr, profile)
+        else:
+            features = voice_feature_summary(samples, sr, profile)
+        del samples  # the mapping cannot close while a view exists
+    finally:
+        block.close()
+    return features, time.perf_counter() - start, os.getpid()
+
+
+def _worker_pid() -> int:
+    return os.getpid()
+
+
+# --- Parent side ---
+
+class AudioFeaturePool:
+    """Worker processes that extract acoustic features from shared-memory PCM"""
+
+    def __init__(self, workers: Optional[int] = None):
+        self.workers = default_workers() if workers is None else max(0, workers)
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+        self._start_lock = threading.Lock()
+        self._started_at: Optional[float] = None
+        self._warm_pids = set()
+        self.submitted = 0
+        self.completed = 0
+        self.failed = 0
+        self._in_flight = 0
+        self._shared_bytes = 0
+        self._busy_seconds = 0.0
+
+    @property
+    def enabled(self) -> bool:
+        return self.workers > 0
+
+    def start(self):
+        """Spawn and warm every worker (blocking; call from a background thread)"""
+        with self._start_lock:
+            if not self.enabled or self._executor is not None:
+                return
+            executor = ProcessPoolExecutor(max_workers=self.workers,
+                                           mp_context=multiprocessing.get_context("spawn"),
+                                           initializer=_warm_worker)
+            try:
+                # Workers are spawned on demand; submitting one task per worker at once starts them all
+                warmups = [executor.submit(_worker_pid) for _ in range(self.workers)]
+                pids = {future.result() for future in warmups}
+            except BaseException:
+                # e.g. the initializer failed: do not leave spawned processes behind
+                executor.shutdown(wait=False, cancel_futures=True)
+                raise
+            with self._lock:
+                self._warm_pids.update(pids)
+                self._started_at = time.perf_counter()
+            self._executor = executor
+        logger.info(f"Audio feature pool ready: {len(pids)} worker processes")
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def mood_features(self, samples: np.ndarray, sr: int, profile: Optional[str] = None) -> np.ndarray:
+        """extract_mood_features in a worker process (blocking)"""
+        return self.submit("mood", samples, sr, profile).result()
+
+    def voice_features(self, samples: np.ndarray, sr: int, profile: Optional[str] = None) -> Dict[str, float]:
+        """voice_feature_summary in a worker process (blocking)"""
+        return self.submit("voice", samples, sr, profile).result()
+
+    def submit(self, kind: str, samples: np.ndarray, sr: int, profile: Optional[str] = None) -> Future:
+        """Copy the samples into shared memory and queue an extraction; the future holds the features"""
+        if self._executor is None:
+            self.start()
+        executor = self._executor
+        if executor is None:  # disabled, or shut down after a failed start
+            raise FeaturePoolUnavailable("Audio feature pool is not running")
+        samples = np.ascontiguousarray(samples, dtype=np.float32).reshape(-1)
+        block = shared_memory.SharedMemory(create=True, size=max(samples.nbytes, 1))
+        np.ndarray(samples.shape, dtype=np.float32, buffer=block.buf)[:] = samples
+
+        with self._lock:
+            self.submitted += 1
+            self._in_flight += 1
+            self._shared_bytes += block.size
+        try:
+            task = executor.submit(_extract, kind, block.name, len(samples), sr, profile)
+        except Exception:
+            self._release(block, None)
+            raise
+
+        result: Future = Future()
+
+        def finish(task: Future):
+            try:
+                features, seconds, pid = task.result()
+            except BaseException as e:
+                self._release(block, None)
+                result.set_exception(e)
+                return
+            self._release(block, seconds, pid)
+            result.set_result(features)
+
+        task.add_done_callback(finish)
+        return result
+
+    def _release(self, block: shared_memory.SharedMemory, seconds: Optional[float], pid: Optional[int] = None):
+        with self._lock:
+            self._in_flight -= 1
+            self._shared_bytes -= block.size
+            if seconds is None:
+                self.failed += 1
+            else:
+                self.completed += 1
+                self._busy_seconds += seconds
+                self._warm_pids.add(pid)
+        block.close()
+        block.unlink()
+
+    def status(self) -> Dict:
+        """Queue depth and worker utilization for /stats"""
+        with self._lock:
+            in_flight = self._in_flight
+            running = min(in_flight, self.workers)
+            uptime = time.perf_counter() - self._started_at if self._started_at is not None else 0.0
+            return {
+                "enabled": self.enabled,
+                "workers": self.workers,
+                "warm_workers": len(self._warm_pids),
+                "running": running,
+                "queued": in_flight - running,
+                "submitted": self.submitted,
+                "completed": self.completed,
+                "failed": self.failed,
+                "shared_memory_mb": round(self._shared_bytes / 2 ** 20, 2),
+                "busy_seconds": round(self._busy_seconds, 2),
+                # Share of worker time spent extracting since the pool started
+                "utilization": round(self._busy_seconds / (uptime * self.workers), 3) if uptime and self.workers else 0.0
+            }
@@ -0,0 +1,429 @@
+"""
+Acoustic features for the rule-based audio mood detectors, from one spectrogram.
+
+``EnhancedMoodDetector.extract_audio_features`` used to call librosa's mfcc,
+spectral_centroid, spectral_rolloff, piptrack and beat_track on the raw signal,
+and each of them ran its own STFT (beat_track its own mel spectrogram too).
+``compute_spectra`` runs the STFT and the mel spectrogram once, and every
+feature is derived from those with the same librosa defaults, so the vector
+is identical to the per-call version (``benchmarks/bench_audio_features.py``
+checks this and times both). Zero-crossing rate and RMS stay time-domain:
+they are framing only, no FFT.
+
+The "fast" profile fills the same slots from cheaper estimators: spectra of
+an 8 kHz copy, autocorrelation pitch on a 4 kHz copy of the voiced frames
+(instead of piptrack over the whole spectrogram, or yin at 44.1 kHz), tempo
+from the onset envelope of the 8 kHz spectrogram (no beat tracking) and
+frame-energy statistics. The rule-based detectors only compare these values
+against coarse thresholds; ``benchmarks/feature_profile_agreement.py`` checks
+that both profiles land on the same moods. Pick the profile per deployment
+with ``MEAL_AUDIO_FEATURE_PROFILE=fast`` or per call with ``profile=``.
+
+Clips longer than ``STREAMING_MIN_SECONDS`` (and raw uploads handed to the
+detector) go through ``StreamingMoodFeatures`` instead: the signal is fed in
+blocks, frames are cut exactly where the centered STFT cuts them and only
+running sums are kept, so memory no longer grows with the clip's duration.
+``benchmarks/bench_streaming_features.py`` compares it with the whole-signal
+vector and measures peak memory.
+"""
+import os
+from dataclasses import dataclass
+from typing import Dict, Iterable, Iterator, Optional
+
+import numpy as np
+import scipy.fft
+import scipy.signal
+import librosa
+
+from audio_io import resample
+
+# librosa's defaults for every call we replace
+N_FFT = 2048
+HOP_LENGTH = 512
+
+FEATURE_PROFILES = ("full", "fast")
+PROFILE_ENV = "MEAL_AUDIO_FEATURE_PROFILE"
+
+# Fast profile: 8 kHz spectra with the same 128 ms window and 32 ms hop as the full profile,
+# and pitch on a 4 kHz copy (64 ms frames cover lags down to 60 Hz)
+FAST_SAMPLE_RATE = 8000
+FAST_N_FFT = 1024
+FAST_HOP_LENGTH = 256
+PITCH_SAMPLE_RATE = 4000
+PITCH_FRAME = 256
+PITCH_FMIN = 60.0
+PITCH_FMAX = 400.0
+VOICED_ENERGY_RATIO = 0.1  # frames within 10 dB of the loudest count as voiced
+VOICED_CORRELATION = 0.4  # normalized autocorrelation peak needed to accept a pitch
+
+# Streaming: clips longer than this are summarized block by block
+STREAMING_MIN_SECONDS = 30.0
+STREAM_BLOCK_SECONDS = 5.0
+TOP_DB = 80.0  # power_to_db default
+TEMPO_AC_SECONDS = 8.0  # feature.tempo's autocorrelation window (ac_size)
+LOG_MEL_FLOOR = -100.0  # 10 * log10(amin)
+LOG_MEL_HIST_STEP = 0.25
+LOG_MEL_HIST_BINS = 800  # -100 dB .. +100 dB
+
+
+@dataclass
+class Spectra:
+    """Spectrograms shared by all features of one signal"""
+    magnitude: np.ndarray  # |STFT|
+    power: np.ndarray  # |STFT|**2
+    log_mel: np.ndarray  # power_to_db(mel(power))
+    sample_rate: int
+
+
+def compute_spectra(y: np.ndarray, sr: int) -> Spectra:
+    """One STFT and one mel spectrogram for the whole signal"""
+    magnitude = np.abs(librosa.stft(y, n_fft=N_FFT, hop_length=HOP_LENGTH))
+    power = magnitude ** 2
+    mel = librosa.feature.melspectrogram(S=power, sr=sr, n_fft=N_FFT, hop_length=HOP_LENGTH)
+    return Spectra(magnitude=magnitude, power=power, log_mel=librosa.power_to_db(mel), sample_rate=sr)
+
+
+def default_profile() -> str:
+    """Deployment-wide profile from MEAL_AUDIO_FEATURE_PROFILE (default "full")"""
+    return resolve_profile(os.environ.get(PROFILE_ENV) or "full")
+
+
+def resolve_profile(profile: Optional[str]) -> str:
+    """Validate a profile name; None means the deployment default"""
+    if profile is None:
+        return default_profile()
+    profile = profile.strip().lower()
+    if profile not in FEATURE_PROFILES:
+        raise ValueError(f"Unknown audio feature profile {profile!r}; expected one of {', '.join(FEATURE_PROFILES)}")
+    return profile
+
+
+def extract_mood_features(y: np.ndarray, sr: int, profile: Optional[str] = None) -> np.ndarray:
+    """The detect_mood_from_audio_features vector from the chosen profile"""
+    if resolve_profile(profile) == "fast":
+        return fast_mood_feature_vector(y, sr)
+    if len(y) > STREAMING_MIN_SECONDS * sr:  # long clip: no full-length spectrograms
+        return stream_mood_feature_vector(clip_blocks(y, sr), sr)
+    return mood_feature_vector(y, sr)
+
+
+def mood_feature_vector(y: np.ndarray, sr: int) -> np.ndarray:
+    """The 19-value vector detect_mood_from_audio_features expects (13 MFCC means, then
+    spectral centroid, rolloff, zero-crossing rate, pitch, energy and tempo)"""
+    spectra = compute_spectra(y, sr)
+
+    mfcc = np.mean(librosa.feature.mfcc(S=spectra.log_mel, n_mfcc=13), axis=1)
+    spectral_centroid = np.mean(librosa.feature.spectral_centroid(S=spectra.magnitude, sr=sr))
+    spectral_rolloff = np.mean(librosa.feature.spectral_rolloff(S=spectra.magnitude, sr=sr))
+    zero_crossing_rate = np.mean(librosa.feature.zero_crossing_rate(y))
+
+    # Pitch and energy
+    pitches, _ = librosa.piptrack(S=spectra.magnitude, sr=sr)
+    voiced_pitches = pitches[pitches > 0]
+    pitch_mean = np.mean(voiced_pitches) if len(voiced_pitches) > 0 else 0
+    energy = np.mean(librosa.feature.rms(y=y))
+
+    # Tempo from the onset envelope of the shared log-mel spectrogram
+    onset_envelope = librosa.onset.onset_strength(S=spectra.log_mel, sr=sr)
+    tempo, _ = librosa.beat.beat_track(onset_envelope=onset_envelope, sr=sr)
+    tempo = float(np.atleast_1d(tempo)[0])  # scalar in librosa 0.10.1, 1-element array from 0.10.2
+
+    return np.concatenate([
+        mfcc,
+        [spectral_centroid, spectral_rolloff, zero_crossing_rate, pitch_mean, energy, tempo]
+    ])
+
+
+def voice_feature_summary(y: np.ndarray, sr: int, profile: Optional[str] = None) -> Dict[str, float]:
+    """Summary features for VoiceMoodDetector.detect_mood (MFCC and centroid share one STFT)"""
+    fast = resolve_profile(profile) == "fast"
+    if fast:
+        spectra = compute_fast_spectra(y, sr)
+        mfcc = librosa.feature.mfcc(S=spectra.log_mel, n_mfcc=13)
+        spectral_centroid_mean = float(np.mean(_spectral_centroid(spectra)))
+        zero_crossing_rate_mean = _zero_crossing_rate(y)
+        pitch_mean = autocorrelation_pitch(y, sr)
+    else:
+        spectra = compute_spectra(y, sr)
+        mfcc = librosa.feature.mfcc(S=spectra.log_mel, n_mfcc=13)
+        spectral_centroid_mean = np.mean(librosa.feature.spectral_centroid(S=spectra.magnitude, sr=sr))
+        zero_crossing_rate_mean = np.mean(librosa.feature.zero_crossing_rate(y))
+        pitch_mean = np.mean(librosa.yin(y, fmin=50, fmax=500, sr=sr))
+
+    energy = np.sum(np.abs(y) ** 2) / len(y)
+
+    return {
+        'mfcc_mean': np.mean(mfcc),
+        'spectral_centroid_mean': spectral_centroid_mean,
+        'zero_crossing_rate_mean': zero_crossing_rate_mean,
+        'energy': energy,
+        'pitch_mean': pitch_mean
+    }
+
+
+# --- Fast profile ---
+
+def compute_fast_spectra(y: np.ndarray, sr: int) -> Spectra:
+    """STFT and log-mel spectrogram of an 8 kHz copy (a quarter of the full profile's FFT work)"""
+    y = resample(np.asarray(y, dtype=np.float32), sr, FAST_SAMPLE_RATE)
+    magnitude = np.abs(librosa.stft(y, n_fft=FAST_N_FFT, hop_length=FAST_HOP_LENGTH))
+    power = magnitude ** 2
+    mel = librosa.feature.melspectrogram(S=power, sr=FAST_SAMPLE_RATE, n_fft=FAST_N_FFT)
+    return Spectra(magnitude=magnitude, power=power, log_mel=librosa.power_to_db(mel),
+                   sample_rate=FAST_SAMPLE_RATE)
+
+
+def _frequencies(spectra: Spectra) -> np.ndarray:
+    return np.linspace(0, spectra.sample_rate / 2, spectra.magnitude.shape[0])
+
+
+def _spectral_centroid(spectra: Spectra) -> np.ndarray:
+    total = np.maximum(spectra.magnitude.sum(axis=0), 1e-10)
+    return (_frequencies(spectra) @ spectra.magnitude) / total
+
+
+def _spectral_rolloff(spectra: Spectra, roll_percent: float = 0.85) -> np.ndarray:
+    cumulative = np.cumsum(spectra.magnitude, axis=0)
+    return _frequencies(spectra)[np.argmax(cumulative >= roll_percent * cumulative[-1], axis=0)]
+
+
+def _zero_crossing_rate(y: np.ndarray) -> float:
+    """Zero crossings per sample over the whole clip (the mean of per-frame rates)"""
+    signs = np.signbit(y)
+    return float(np.mean(signs[1:] != signs[:-1])) if len(y) > 1 else 0.0
+
+
+def _frames(y: np.ndarray, length: int, hop: int) -> np.ndarray:
+    if len(y) < length:
+        y = np.pad(y, (0, length - len(y)))
+    return np.lib.stride_tricks.sliding_window_view(y, length)[::hop]
+
+
+def autocorrelation_pitch(y: np.ndarray, sr: int) -> float:
+    """Mean f0 of the voiced frames of a 4 kHz copy (0 if nothing is voiced)"""
+    y = resample(np.asarray(y, dtype=np.float32), sr, PITCH_SAMPLE_RATE)
+    frames = _frames(y, PITCH_FRAME, PITCH_FRAME // 2)
+    energy = np.sum(frames ** 2, axis=1)
+    if energy.size == 0 or energy.max() <= 0:
+        return 0.0
+    voiced = frames[energy > VOICED_ENERGY_RATIO * energy.max()]
+    voiced = voiced - voiced.mean(axis=1, keepdims=True)
+
+    # Autocorrelation of every voiced frame at once (zero-padded FFT, no wrap-around)
+    spectrum = np.fft.rfft(voiced, n=2 * PITCH_FRAME, axis=1)
+    autocorrelation = np.fft.irfft(np.abs(spectrum) ** 2, axis=1)[:, :PITCH_FRAME]
+    autocorrelation /= np.maximum(autocorrelation[:, :1], 1e-10)
+
+    min_lag = int(PITCH_SAMPLE_RATE / PITCH_FMAX)
+    max_lag = int(PITCH_SAMPLE_RATE / PITCH_FMIN)
+    lags = min_lag + np.argmax(autocorrelation[:, min_lag:max_lag + 1], axis=1)
+    peaks = autocorrelation[np.arange(len(lags)), lags]
+    accepted = lags[peaks > VOICED_CORRELATION]
+    return float(np.mean(PITCH_SAMPLE_RATE / accepted)) if accepted.size else 0.0
+
+
+def fast_mood_feature_vector(y: np.ndarray, sr: int) -> np.ndarray:
+    """Same 19 slots as mood_feature_vector from cheaper estimators (MFCCs come from 8 kHz spectra)"""
+    spectra = compute_fast_spectra(y, sr)
+
+    mfcc = np.mean(librosa.feature.mfcc(S=spectra.log_mel, n_mfcc=13), axis=1)
+    spectral_centroid = float(np.mean(_spectral_centroid(spectra)))
+    spectral_rolloff = float(np.mean(_spectral_rolloff(spectra)))
+    zero_crossing_rate = _zero_crossing_rate(y)
+
+    # Pitch and frame-energy statistics
+    pitch_mean = autocorrelation_pitch(y, sr)
+    energy = float(np.mean(np.sqrt(np.mean(_frames(y, N_FFT, HOP_LENGTH) ** 2, axis=1))))
+
+    # Tempo from the onset envelope of the 8 kHz spectrogram; no beat tracking
+    onset_envelope = librosa.onset.onset_strength(S=spectra.log_mel, sr=FAST_SAMPLE_RATE,
+                                                  hop_length=FAST_HOP_LENGTH, n_fft=FAST_N_FFT)
+    tempo = librosa.feature.tempo(onset_envelope=onset_envelope, sr=FAST_SAMPLE_RATE, hop_length=FAST_HOP_LENGTH)
+    tempo = float(np.atleast_1d(tempo)[0])
+
+    return np.concatenate([
+        mfcc,
+        [spectral_centroid, spectral_rolloff, zero_crossing_rate, pitch_mean, energy, tempo]
+    ])
+
+
+# --- Streaming (long clips) ---
+
+def clip_blocks(y: np.ndarray, sr: int, block_seconds: float = STREAM_BLOCK_SECONDS) -> Iterator[np.ndarray]:
+    """Consecutive views of an already decoded signal"""
+    block = max(int(block_seconds * sr), 1)
+    for start in range(0, len(y), block):
+        yield y[start:start + block]
+
+
+def stream_mood_feature_vector(blocks: Iterable[np.ndarray], sr: int) -> np.ndarray:
+    """mood_feature_vector from consecutive blocks of one signal, in constant memory"""
+    features = StreamingMoodFeatures(sr)
+    for block in blocks:
+        features.update(block)
+    return features.result()
+
+
+class StreamingMoodFeatures:
+    """Running statistics for mood_feature_vector over a signal fed block by block.
+
+    Frames are cut exactly as librosa's centered STFT cuts them, so every
+    per-frame feature (MFCC input, centroid, rolloff, zero-crossing rate,
+    piptrack, RMS, onset strength) matches the whole-signal computation and
+    only sums are kept. power_to_db clips the log-mel spectrogram at 80 dB
+    below its global maximum, which is only known at the end: the MFCC means
+    apply it exactly through a per-band histogram of log-mel values, onset
+    strength applies it against the running maximum (so tempo can differ when
+    audio more than 80 dB below a later peak precedes it; digital silence
+    does not count, it has no onsets either way). Tempo comes from the sum of
+    the per-frame tempogram columns beat_track would average.
+    """
+
+    def __init__(self, sr: int):
+        self.sample_rate = sr
+        self._mel_basis = librosa.filters.mel(sr=sr, n_fft=N_FFT)
+        n_mels = self._mel_basis.shape[0]
+        self._buffer = np.zeros(N_FFT // 2, dtype=np.float32)  # center=True zero padding
+        self._frames = 0
+
+        # Per-frame sums
+        self._log_mel_sum = np.zeros(n_mels)
+        self._log_mel_hist_count = np.zeros((n_mels, LOG_MEL_HIST_BINS))
+        self._log_mel_hist_sum = np.zeros((n_mels, LOG_MEL_HIST_BINS))
+        self._log_mel_max = -np.inf
+        self._centroid_sum = 0.0
+        self._rolloff_sum = 0.0
+        self._zcr_sum = 0.0
+        self._rms_sum = 0.0
+        self._pitch_sum = 0.0
+        self._pitch_count = 0
+
+        # Onset envelope -> tempogram columns
+        self._previous_log_mel: Optional[np.ndarray] = None
+        self._onsets = [0.0] * (1 + N_FFT // (2 * HOP_LENGTH))  # onset_strength's lag/centering shift
+        self._tempogram = _TempogramSum(librosa.time_to_frames(TEMPO_AC_SECONDS, sr=sr, hop_length=HOP_LENGTH))
+
+    def update(self, block: np.ndarray):
+        self._buffer = np.concatenate([self._buffer, np.asarray(block, dtype=np.float32)])
+        self._consume()
+
+    def result(self) -> np.ndarray:
+        self._buffer = np.concatenate([self._buffer, np.zeros(N_FFT // 2, dtype=np.float32)])
+        self._consume()
+        n = max(self._frames, 1)
+
+        # power_to_db's top_db clip, applied to the summed log-mel through the histogram
+        floor = self._log_mel_max - TOP_DB
+        below = LOG_MEL_FLOOR + LOG_MEL_HIST_STEP * np.arange(LOG_MEL_HIST_BINS) < floor
+        raised = np.maximum(self._log_mel_hist_count[:, below] * floor - self._log_mel_hist_sum[:, below], 0)
+        log_mel_mean = (self._log_mel_sum + raised.sum(axis=1)) / n
+        mfcc = scipy.fft.dct(log_mel_mean, type=2, norm="ortho")[:13]
+
+        # onset_strength trims the shifted envelope to the frame count: the last values fall off
+        onsets = self._onsets[:len(self._onsets) - N_FFT // (2 * HOP_LENGTH)]
+        self._tempogram.add(onsets, final=True)
+        if self._tempogram.any_onset:
+            tempo = librosa.feature.tempo(tg=self._tempogram.mean()[:, np.newaxis], sr=self.sample_rate,
+                                          hop_length=HOP_LENGTH)
+            tempo = float(np.atleast_1d(tempo)[0])
+        else:
+            tempo = 0.0  # beat_track's answer for an onset-free signal
+
+        pitch_mean = self._pitch_sum / self._pitch_count if self._pitch_count else 0
+        return np.concatenate([
+            mfcc,
+            [self._centroid_sum / n, self._rolloff_sum / n, self._zcr_sum / n, pitch_mean,
+             self._rms_sum / n, tempo]
+        ])
+
+    def _consume(self):
+        """Process every complete frame in the buffer and keep the overlap"""
+        if len(self._buffer) < N_FFT:
+            return
+        n_frames = 1 + (len(self._buffer) - N_FFT) // HOP_LENGTH
+        segment = self._buffer[:(n_frames - 1) * HOP_LENGTH + N_FFT]
+        self._frames += n_frames
+
+        frames = np.lib.stride_tricks.sliding_window_view(segment, N_FFT)[::HOP_LENGTH]
+        self._zcr_sum += float(np.sum(np.mean(librosa.zero_crossings(frames, pad=False, axis=-1), axis=-1)))
+        self._rms_sum += float(np.sum(np.sqrt(np.mean(frames ** 2, axis=-1))))
+
+        magnitude = np.abs(librosa.stft(segment, n_fft=N_FFT, hop_length=HOP_LENGTH, center=False))
+        self._centroid_sum += float(np.sum(librosa.feature.spectral_centroid(S=magnitude, sr=self.sample_rate)))
+        self._rolloff_sum += float(np.sum(librosa.feature.spectral_rolloff(S=magnitude, sr=self.sample_rate)))
+        pitches, _ = librosa.piptrack(S=magnitude, sr=self.sample_rate)
+        voiced_pitches = pitches[pitches > 0]
+        self._pitch_sum += float(np.sum(voiced_pitches))
+        self._pitch_count += len(voiced_pitches)
+
+        log_mel = 10.0 * np.log10(np.maximum(1e-10, self._mel_basis @ magnitude ** 2))
+        self._add_log_mel(log_mel)
+
+        self._buffer = self._buffer[n_frames * HOP_LENGTH:]
+
+    def _add_log_mel(self, log_mel: np.ndarray):
+        self._log_mel_sum += log_mel.sum(axis=1)
+        self._log_mel_max = max(self._log_mel_max, float(log_mel.max()))
+        n_mels = log_mel.shape[0]
+        bins = np.clip(((log_mel - LOG_MEL_FLOOR) / LOG_MEL_HIST_STEP).astype(int), 0, LOG_MEL_HIST_BINS - 1)
+        flat = (np.arange(n_mels)[:, np.newaxis] * LOG_MEL_HIST_BINS + bins).ravel()
+        size = n_mels * LOG_MEL_HIST_BINS
+        self._log_mel_hist_count += np.bincount(flat, minlength=size).reshape(n_mels, -1)
+        self._log_mel_hist_sum += np.bincount(flat, weights=log_mel.ravel(), minlength=size).reshape(n_mels, -1)
+
+        # Onset strength: mean positive log-mel increase from the previous frame
+        clipped = np.maximum(log_mel, self._log_mel_max - TOP_DB)
+        if self._previous_log_mel is not None:
+            clipped = np.concatenate([self._previous_log_mel, clipped], axis=1)
+        if clipped.shape[1] > 1:
+            self._onsets.extend(np.mean(np.maximum(0.0, np.diff(clipped, axis=1)), axis=0).tolist())
+        self._previous_log_mel = clipped[:, -1:]
+
+        # Hand over all but the values that may still be trimmed at the end
+        keep = N_FFT // (2 * HOP_LENGTH)
+        if len(self._onsets) > keep:
+            self._tempogram.add(self._onsets[:-keep])
+            self._onsets = self._onsets[-keep:]
+
+
+class _TempogramSum:
+    """Sum of librosa.feature.tempogram columns (centered, Hann-windowed autocorrelation)
+    over an onset envelope that arrives in pieces"""
+
+    def __init__(self, win_length: int):
+        self.win_length = int(win_length)
+        self.columns = 0
+        self.any_onset = False
+        self._window = scipy.signal.get_window("hann", self.win_length, fftbins=True)
+        self._sum = np.zeros(self.win_length)
+        self._pending: Optional[np.ndarray] = None  # padded envelope not yet fully framed
+        self._last = 0.0
+
+    def add(self, onsets, final: bool = False):
+        onsets = np.asarray(onsets, dtype=np.float64)
+        half = self.win_length // 2
+        if onsets.size:
+            self.any_onset = self.any_onset or bool(np.any(onsets))
+            self._last = float(onsets[-1])
+            if self._pending is None:  # linear ramp from 0 up to the first value, as np.pad does
+                onsets = np.pad(onsets, (half, 0), mode="linear_ramp", end_values=0)
+            self._pending = onsets if self._pending is None else np.concatenate([self._pending, onsets])
+        if self._pending is None:
+            return
+        if final:  # ramp back down to 0 after the last value
+            ramp = np.pad(np.array([self._last]), (0, half), mode="linear_ramp", end_values=0)[1:]
+            self._pending = np.concatenate([self._pending, ramp])
+
+        n_columns = len(self._pending) - self.win_length + 1
+        if final:
+            n_columns = min(n_columns, len(self._pending) - 2 * half)
+        if n_columns <= 0:
+            return
+        frames = np.lib.stride_tricks.sliding_window_view(self._pending, self.win_length)[:n_columns]
+        autocorrelation = librosa.autocorrelate(frames * self._window, axis=-1)
+        self._sum += librosa.util.normalize(autocorrelation, norm=np.inf, axis=-1).sum(axis=0)
+        self.columns += n_columns
+        self._pending = self._pending[n_columns:]
+
+    def mean(self) -> np.ndarray:
+        return self._sum / max(self.columns, 1)
@@ -0,0 +1,238 @@
+"""
+In-memory audio decoding shared by every audio consumer.
+
+Uploads used to be written to temp files (including a fixed ``temp.wav`` that
+concurrent requests overwrote) and converted through pydub, which spawns ffmpeg
+for every request. ``decode_audio`` takes the uploaded bytes (or any file-like
+object or path) and decodes WAV, FLAC and OGG in-process with libsndfile; MP3
+is handled in-process too by libsndfile >= 1.1. Only formats libsndfile cannot
+read (m4a/AAC, webm, ...) fall back to ffmpeg, still over pipes rather than
+temp files.
+
+``AudioClip`` wraps one decode: the samples are resampled once to 16 kHz mono
+float32 (the rate Whisper and the feature extractor both work at) and derived
+views (peak-normalized samples, frame energy, voiced intervals) are computed
+on first use and cached, so ASR, acoustic features and VAD share one buffer.
+"""
+import io
+import os
+import shutil
+import subprocess
+from functools import cached_property
+from math import gcd
+from typing import BinaryIO, Iterable, Iterator, List, Optional, Tuple, Union
+
+import numpy as np
+
+try:
+    import soundfile as sf
+except ImportError:  # e.g. libsndfile missing; everything goes through ffmpeg
+    sf = None
+
+AudioSource = Union[bytes, bytearray, memoryview, BinaryIO, str, os.PathLike]
+
+# Every consumer (Whisper, feature extraction, VAD) works at 16 kHz
+TARGET_SAMPLE_RATE = 16000
+# Rate used when ffmpeg has to pick one (raw PCM carries no header)
+FALLBACK_SAMPLE_RATE = TARGET_SAMPLE_RATE
+FFMPEG_TIMEOUT = 30
+
+
+class AudioDecodeError(ValueError):
+    """The audio could not be decoded by libsndfile or ffmpeg"""
+
+
+def _read_source(source: AudioSource) -> Union[bytes, str]:
+    """Bytes for in-memory sources, the path for files on disk"""
+    if isinstance(source, (str, os.PathLike)):
+        return os.fspath(source)
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        return bytes(source)
+    if hasattr(source, "read"):  # file-like, e.g. UploadFile.file or BytesIO
+        if hasattr(source, "seek"):
+            source.seek(0)
+        return source.read()
+    raise TypeError(f"Unsupported audio source: {type(source).__name__}")
+
+
+def _decode_soundfile(data: Union[bytes, str]) -> Tuple[np.ndarray, int]:
+    target = io.BytesIO(data) if isinstance(data, bytes) else data
+    samples, sample_rate = sf.read(target, dtype="float32", always_2d=False)
+    return samples, sample_rate
+
+
+def _decode_ffmpeg(data: Union[bytes, str], sample_rate: int) -> Tuple[np.ndarray, int]:
+    ffmpeg = shutil.which("ffmpeg")
+    if ffmpeg is None:
+        raise AudioDecodeError("Unsupported audio format and ffmpeg is not installed")
+
+    from_stdin = isinstance(data, bytes)
+    cmd = [ffmpeg, "-hide_banner", "-loglevel", "error", "-i", "pipe:0" if from_stdin else data,
+           "-f", "f32le", "-acodec", "pcm_f32le", "-ac", "1", "-ar", str(sample_rate), "pipe:1"]
+    try:
+        proc = subprocess.run(cmd, input=data if from_stdin else None, capture_output=True,
+                              timeout=FFMPEG_TIMEOUT, check=False)
+    except subprocess.TimeoutExpired:
+        raise AudioDecodeError("ffmpeg timed out decoding the audio")
+    if proc.returncode != 0 or not proc.stdout:
+        raise AudioDecodeError(f"ffmpeg could not decode the audio: {proc.stderr.decode(errors='replace').strip()}")
+    return np.frombuffer(proc.stdout, dtype=np.float32).copy(), sample_rate
+
+
+def decode_audio(source: AudioSource, mono: bool = True,
+                 fallback_sample_rate: int = FALLBACK_SAMPLE_RATE) -> Tuple[np.ndarray, int]:
+    """Decode audio bytes/file-like/path to (float32 samples, sample rate)"""
+    data = _read_source(source)
+    if isinstance(data, bytes) and not data:
+        raise AudioDecodeError("Empty audio upload")
+
+    samples: Optional[np.ndarray] = None
+    if sf is not None:
+        try:
+            samples, sample_rate = _decode_soundfile(data)
+        except RuntimeError:  # LibsndfileError: format not recognised
+            samples = None
+    if samples is None:
+        samples, sample_rate = _decode_ffmpeg(data, fallback_sample_rate)
+
+    if mono and samples.ndim > 1:
+        samples = samples.mean(axis=1, dtype=np.float32)
+    if samples.size == 0:
+        raise AudioDecodeError("Audio contains no samples")
+    return np.ascontiguousarray(samples, dtype=np.float32), int(sample_rate)
+
+
+def resample(samples: np.ndarray, orig_sr: int, target_sr: int) -> np.ndarray:
+    """Polyphase resampling (scipy) of mono float32 samples"""
+    if orig_sr == target_sr:
+        return samples
+    from scipy.signal import resample_poly
+    divisor = gcd(int(orig_sr), int(target_sr))
+    resampled = resample_poly(samples, target_sr // divisor, orig_sr // divisor)
+    return np.ascontiguousarray(resampled, dtype=np.float32)
+
+
+def resample_blocks(blocks: Iterable[np.ndarray], orig_sr: int, target_sr: int) -> Iterator[np.ndarray]:
+    """Resample consecutive mono blocks as one signal (same samples as resampling the whole signal)"""
+    if orig_sr == target_sr:
+        yield from blocks
+        return
+    divisor = gcd(int(orig_sr), int(target_sr))
+    up, down = target_sr // divisor, orig_sr // divisor
+    # Each block is filtered with enough neighbouring input to cover resample_poly's filter
+    # (half-length 10 * max(up, down) upsampled samples); offsets stay multiples of `down`
+    # so every block's output lines up with the whole-signal output
+    half_width = 10 * max(up, down) // up + 2
+    context = down * -(-half_width // down)
+    edge = context * up // down
+
+    pending = np.zeros(context, dtype=np.float32)  # resample_poly zero-pads the signal start
+    for block in blocks:
+        pending = np.concatenate([pending, np.asarray(block, dtype=np.float32)])
+        usable = (len(pending) - 2 * context) // down * down
+        if usable > 0:
+            yield resample(pending[:usable + 2 * context], orig_sr, target_sr)[edge:edge + usable * up // down]
+            pending = pending[usable:]
+
+    remaining = len(pending) - context
+    if remaining > 0:
+        tail = resample(np.concatenate([pending, np.zeros(context, dtype=np.float32)]), orig_sr, target_sr)
+        yield tail[edge:edge - (-remaining * up // down)]
+
+
+def iter_audio_blocks(source: AudioSource, block_seconds: float = 5.0) -> Iterator[np.ndarray]:
+    """16 kHz mono float32 blocks of an upload, decoded and resampled block by block.
+    Formats libsndfile cannot read are decoded whole through ffmpeg and then sliced."""
+    data = _read_source(source)
+    if isinstance(data, bytes) and not data:
+        raise AudioDecodeError("Empty audio upload")
+
+    soundfile = None
+    if sf is not None:
+        try:
+            soundfile = sf.SoundFile(io.BytesIO(data) if isinstance(data, bytes) else data)
+        except RuntimeError:  # LibsndfileError: format not recognised
+            soundfile = None
+
+    if soundfile is None:
+        samples, sample_rate = decode_audio(data)
+        samples = resample(samples, sample_rate, TARGET_SAMPLE_RATE)
+        block = int(block_seconds * TARGET_SAMPLE_RATE)
+        for start in range(0, len(samples), block):
+            yield samples[start:start + block]
+        return
+
+    with soundfile:
+        decoded = (frames.mean(axis=1, dtype=np.float32) if frames.ndim > 1 else frames
+                   for frames in soundfile.blocks(blocksize=int(block_seconds * soundfile.samplerate),
+                                                  dtype="float32", always_2d=False))
+        yield from resample_blocks(decoded, soundfile.samplerate, TARGET_SAMPLE_RATE)
+
+
+class AudioClip:
+    """One decoded upload at 16 kHz mono float32 with lazily cached derived views"""
+
+    sample_rate = TARGET_SAMPLE_RATE
+    frame_length = 400  # 25 ms
+    hop_length = 160  # 10 ms
+
+    def __init__(self, samples: np.ndarray, sample_rate: int = TARGET_SAMPLE_RATE):
+        samples = np.asarray(samples, dtype=np.float32)
+        if samples.ndim > 1:
+            samples = samples.mean(axis=1, dtype=np.float32)
+        self.samples = resample(samples, sample_rate, TARGET_SAMPLE_RATE)
+        self.samples.setflags(write=False)  # shared by every consumer
+        self._voiced_cache = {}
+
+    @classmethod
+    def from_source(cls, source: AudioSource) -> "AudioClip":
+        """Decode bytes/file-like/path (or pass an existing clip through)"""
+        if isinstance(source, AudioClip):
+            return source
+        samples, sample_rate = decode_audio(source)
+        return cls(samples, sample_rate)
+
+    @property
+    def duration(self) -> float:
+        return len(self.samples) / self.sample_rate
+
+    @cached_property
+    def normalized(self) -> np.ndarray:
+        """Peak-normalized samples"""
+        peak = float(np.max(np.abs(self.samples))) if self.samples.size else 0.0
+        return self.samples / peak if peak > 0 else self.samples
+
+    @cached_property
+    def frame_rms(self) -> np.ndarray:
+        """RMS energy per 25 ms frame with a 10 ms hop"""
+        samples = self.samples
+        if len(samples) < self.frame_length:
+            samples = np.pad(samples, (0, self.frame_length - len(samples)))
+        frames = np.lib.stride_tricks.sliding_window_view(samples, self.frame_length)[::self.hop_length]
+        return np.sqrt(np.mean(np.square(frames, dtype=np.float32), axis=1))
+
+    def voiced_intervals(self, top_db: float = 40.0, min_rms: float = 1e-4) -> List[Tuple[int, int]]:
+        """Sample ranges whose energy is within top_db of the loudest frame (energy VAD)"""
+        key = (top_db, min_rms)
+        if key not in self._voiced_cache:
+            rms = self.frame_rms
+            peak = float(rms.max()) if rms.size else 0.0
+            if peak < min_rms:  # digital silence
+                self._voiced_cache[key] = []
+            else:
+                voiced = 20 * np.log10(np.maximum(rms, 1e-10) / peak) > -top_db
+                edges = np.flatnonzero(np.diff(np.concatenate(([0], voiced.astype(np.int8), [0]))))
+                self._voiced_cache[key] = [
+                    (int(start * self.hop_length),
+                     int(min(len(self.samples), (end - 1) * self.hop_length + self.frame_length)))
+                    for start, end in zip(edges[::2], edges[1::2])
+                ]
+        return self._voiced_cache[key]
+
+    @property
+    def has_speech(self) -> bool:
+        return bool(self.voiced_intervals())
+
+    def asr_input(self) -> dict:
+        """Input for the HuggingFace ASR pipeline; already at 16 kHz, so it does not resample"""
+        return {"raw": self.normalized, "sampling_rate": self.sample_rate}
@@ -0,0 +1,123 @@
+"""
+Benchmark for the shared-STFT acoustic feature extractor.
+
+Compares ``audio_features.mood_feature_vector`` (one STFT and one mel
+spectrogram per clip) with the previous per-feature librosa calls on
+synthetic speech-like clips, and checks that both produce the same vector:
+
+    python benchmarks/bench_audio_features.py --durations 5,30,120 --json audio.json
+
+Exits with status 1 if any vector differs.
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+from typing import Dict
+
+import numpy as np
+import librosa
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from bench_hot_paths import git_commit, time_op
+
+from audio_features import mood_feature_vector
+
+SAMPLE_RATE = 16000
+DEFAULT_DURATIONS = "5,30,120"
+
+
+def synthetic_speech(seconds: float, sample_rate: int = SAMPLE_RATE, seed: int = 0,
+                     f0: float = 160.0, syllable_rate: float = 4.0, level: float = 0.3) -> np.ndarray:
+    """Voiced harmonic source with a wandering f0, syllable-rate bursts, pauses and background noise"""
+    rng = np.random.default_rng(seed)
+    n = int(seconds * sample_rate)
+    t = np.arange(n) / sample_rate
+    pitch = f0 * (1 + 0.15 * np.sin(2 * np.pi * 0.3 * t + rng.uniform(0, 2 * np.pi)))
+    phase = 2 * np.pi * np.cumsum(pitch) / sample_rate
+    voiced = sum(np.sin(k * phase) / k for k in range(1, 6))
+    syllables = np.clip(np.sin(2 * np.pi * syllable_rate * t + rng.uniform(0, 2 * np.pi)), 0, None)
+    pauses = (np.sin(2 * np.pi * 0.2 * t + rng.uniform(0, 2 * np.pi)) > -0.6).astype(np.float64)
+    noise = 0.01 * rng.standard_normal(n)
+    return (level * voiced * syllables * pauses / 2 + noise).astype(np.float32)
+
+
+def per_call_features(audio: np.ndarray, sr: int) -> np.ndarray:
+    """The previous EnhancedMoodDetector.extract_audio_features body (each call runs its own STFT)"""
+    features = {}
+    features['mfcc'] = np.mean(librosa.feature.mfcc(y=audio, sr=sr, n_mfcc=13), axis=1)
+    features['spectral_centroid'] = np.mean(librosa.feature.spectral_centroid(y=audio, sr=sr))
+    features['spectral_rolloff'] = np.mean(librosa.feature.spectral_rolloff(y=audio, sr=sr))
+    features['zero_crossing_rate'] = np.mean(librosa.feature.zero_crossing_rate(audio))
+    pitches, magnitudes = librosa.piptrack(y=audio, sr=sr)
+    features['pitch_mean'] = np.mean(pitches[pitches > 0]) if len(pitches[pitches > 0]) > 0 else 0
+    features['energy'] = np.mean(librosa.feature.rms(y=audio))
+    tempo, _ = librosa.beat.beat_track(y=audio, sr=sr)
+    features['tempo'] = float(np.atleast_1d(tempo)[0])
+    return np.concatenate([
+        features['mfcc'],
+        [features['spectral_centroid'], features['spectral_rolloff'],
+         features['zero_crossing_rate'], features['pitch_mean'],
+         features['energy'], features['tempo']]
+    ])
+
+
+def bench_duration(seconds: float, min_time: float) -> Dict:
+    clip = synthetic_speech(seconds, seed=int(seconds))
+    expected = per_call_features(clip, SAMPLE_RATE)
+    actual = mood_feature_vector(clip, SAMPLE_RATE)
+    results = {
+        "exact_match": bool(np.array_equal(expected, actual)),
+        "max_abs_diff": float(np.max(np.abs(expected - actual))),
+        "per_call": time_op(lambda i: per_call_features(clip, SAMPLE_RATE), min_time=min_time, min_repeats=3),
+        "shared_stft": time_op(lambda i: mood_feature_vector(clip, SAMPLE_RATE), min_time=min_time, min_repeats=3)
+    }
+    results["speedup"] = round(results["per_call"]["median_ms"] / results["shared_stft"]["median_ms"], 2)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the shared-STFT audio feature extractor")
+    parser.add_argument("--durations", default=DEFAULT_DURATIONS,
+                        help=f"Comma-separated clip lengths in seconds (default: {DEFAULT_DURATIONS})")
+    parser.add_argument("--min-time", type=float, default=2.0, help="Seconds to spend timing each extractor")
+    parser.add_argument("--json", default=None, help="Write results to this file")
+    args = parser.parse_args()
+
+    report = {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "commit": git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "librosa": librosa.__version__
+        },
+        "results": {}
+    }
+
+    print(f"{'clip':>6} {'per-call ms':>12} {'shared ms':>11} {'speedup':>8}  match")
+    print("-" * 50)
+    mismatches = []
+    for seconds in [float(d) for d in args.durations.split(",")]:
+        results = bench_duration(seconds, args.min_time)
+        report["results"][f"{seconds:g}s"] = results
+        match = "✅" if results["exact_match"] else f"❌ (max diff {results['max_abs_diff']:.3g})"
+        print(f"{seconds:>5g}s {results['per_call']['median_ms']:>12.1f} {results['shared_stft']['median_ms']:>11.1f} "
+              f"{results['speedup']:>7.2f}x  {match}")
+        if not results["exact_match"]:
+            mismatches.append(f"{seconds:g}s")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"📄 Results written to {args.json}")
+
+    if mismatches:
+        print(f"\n❌ Feature vectors differ for: {', '.join(mismatches)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""
+Throughput benchmark for the acoustic feature process pool.
+
+Extracts mood features from a batch of synthetic clips with W threads (what
+the backend did before) and with an ``AudioFeaturePool`` of W worker
+processes, for each W, and reports clips per second:
+
+    python benchmarks/bench_feature_pool.py --workers 1,2,4 --clips 16 --json pool.json
+
+Threads stay near the single-worker rate because librosa holds the GIL; the
+process pool should scale with the number of cores.
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from bench_hot_paths import git_commit
+from bench_audio_features import SAMPLE_RATE, synthetic_speech
+
+from audio_features import extract_mood_features
+from audio_feature_pool import AudioFeaturePool
+
+DEFAULT_WORKERS = "1,2,4"
+
+
+def run_threads(clips: List[np.ndarray], workers: int) -> float:
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        start = time.perf_counter()
+        list(executor.map(lambda clip: extract_mood_features(clip, SAMPLE_RATE, "full"), clips))
+        return time.perf_counter() - start
+
+
+def run_processes(clips: List[np.ndarray], workers: int) -> Dict:
+    pool = AudioFeaturePool(workers=workers)
+    try:
+        pool.start()  # spawn and warm up outside the timed region
+        start = time.perf_counter()
+        futures = [pool.submit("mood", clip, SAMPLE_RATE, "full") for clip in clips]
+        for future in futures:
+            future.result()
+        elapsed = time.perf_counter() - start
+        return {"seconds": elapsed, "status": pool.status()}
+    finally:
+        pool.shutdown()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the acoustic feature process pool")
+    parser.add_argument("--workers", default=DEFAULT_WORKERS,
+                        help=f"Comma-separated worker counts (default: {DEFAULT_WORKERS})")
+    parser.add_argument("--clips", type=int, default=16, help="Clips per run")
+    parser.add_argument("--seconds", type=float, default=10.0, help="Length of each clip")
+    parser.add_argument("--json", default=None, help="Write results to this file")
+    args = parser.parse_args()
+
+    clips = [synthetic_speech(args.seconds, seed=i) for i in range(args.clips)]
+    extract_mood_features(clips[0], SAMPLE_RATE, "full")  # JIT/imports, as the pool's initializer does
+    report = {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "commit": git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "clips": args.clips,
+            "clip_seconds": args.seconds
+        },
+        "results": {}
+    }
+
+    print(f"{args.clips} clips of {args.seconds:g}s, {os.cpu_count()} cores")
+    print(f"{'workers':>8} {'threads clips/s':>16} {'processes clips/s':>18} {'speedup':>8}")
+    print("-" * 54)
+    for workers in [int(w) for w in args.workers.split(",")]:
+        thread_seconds = run_threads(clips, workers)
+        process = run_processes(clips, workers)
+        results = {
+            "threads_clips_per_s": round(args.clips / thread_seconds, 2),
+            "processes_clips_per_s": round(args.clips / process["seconds"], 2),
+            "pool_status": process["status"]
+        }
+        results["speedup"] = round(results["processes_clips_per_s"] / results["threads_clips_per_s"], 2)
+        report["results"][str(workers)] = results
+        print(f"{workers:>8} {results['threads_clips_per_s']:>16.2f} {results['processes_clips_per_s']:>18.2f} "
+              f"{results['speedup']:>7.2f}x")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"📄 Results written to {args.json}")
+
+
+if __name__ == "__main__":
+    main()
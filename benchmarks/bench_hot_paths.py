@@ -0,0 +1,204 @@
+"""
+Micro-benchmarks for the VectorMealEngine and EnhancedMealSuggester hot paths.
+
+Times each hot path at several catalog sizes and writes the results as JSON,
+so two runs (e.g. before and after a change) can be compared:
+
+    python benchmarks/bench_hot_paths.py --sizes 300,10000 --json before.json
+    python benchmarks/bench_hot_paths.py --sizes 300,10000 --json after.json --compare before.json
+
+Models are replaced by the offline stubs from model_stubs.py with their
+simulated latency switched off, so the numbers measure this repo's code
+(catalog scans, FAISS search, index rebuilds) rather than model inference.
+Use ``--stub-latency`` to keep the simulated model time, or ``--real-models``
+to load the real ones. Catalogs come from generate_catalog.py (synthetic,
+following meal.json's distributions). Everything runs in a temporary
+directory, so the index files in the repo are left untouched.
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Callable, Dict, List, Optional
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from generate_catalog import write_catalog
+
+DEFAULT_SIZES = "300,10000,100000,1000000"
+MOOD_TEXTS = [
+    "I feel tired after a long day at work",
+    "stressed about exams and can't focus",
+    "happy and full of energy",
+    "a bit lonely tonight",
+    "calm and relaxed after a walk"
+]
+# Mix of direct matches (mood_mappings) and free text that falls through to TF-IDF
+MOOD_INPUTS = ["Exhausted", "Worried", "Happy", "Blue", "kind of meh", "super pumped", "Frazzled", "Content"]
+PARTIAL_MOODS = ["ti", "anx", "hap", "exc", "calm", "lon"]
+
+
+def time_op(fn: Callable[[int], object], min_time: float = 1.0, min_repeats: int = 5,
+            max_repeats: int = 1000) -> Dict:
+    """Call fn(i) until min_time has passed (within the repeat bounds); per-call stats in ms"""
+    fn(0)  # warm-up
+    samples = []
+    started = time.perf_counter()
+    i = 1
+    while len(samples) < max_repeats and (len(samples) < min_repeats or time.perf_counter() - started < min_time):
+        start = time.perf_counter()
+        fn(i)
+        samples.append(time.perf_counter() - start)
+        i += 1
+    samples.sort()
+    return {
+        "repeats": len(samples),
+        "mean_ms": round(statistics.mean(samples) * 1000, 4),
+        "median_ms": round(statistics.median(samples) * 1000, 4),
+        "p95_ms": round(samples[min(len(samples) - 1, int(0.95 * len(samples)))] * 1000, 4),
+        "min_ms": round(samples[0] * 1000, 4)
+    }
+
+
+def bench_size(size: int, workdir: str, min_time: float, seed: int = 42) -> Dict:
+    from vector_meal_engine import VectorMealEngine
+    from enhanced_meal_suggester import EnhancedMealSuggester
+    from state_store import InMemoryStateStore
+
+    rng = random.Random(seed)
+    catalog_path = os.path.join(workdir, f"meal_{size}.json")
+    write_catalog(catalog_path, size, seed=seed)
+    results = {}
+
+    start = time.perf_counter()
+    engine = VectorMealEngine(meal_data_path=catalog_path)
+    results["engine_init"] = {"repeats": 1, "seconds": round(time.perf_counter() - start, 3)}
+
+    start = time.perf_counter()
+    suggester = EnhancedMealSuggester(meal_data_path=catalog_path, store=InMemoryStateStore())
+    results["suggester_init"] = {"repeats": 1, "seconds": round(time.perf_counter() - start, 3)}
+    suggester.set_dietary_restrictions("bench_user", ["gluten"])
+    suggester.set_cultural_preferences("bench_user", ["Mediterranean"])
+
+    moods = list(engine.mood_descriptions)
+    names = [rng.choice(engine.meal_data)["meal_name"] for _ in range(64)]
+    queries = [engine.encode_mood_query(rng.choice(MOOD_TEXTS), rng.choice(moods), rng.choice(moods))
+               for _ in range(16)]
+    candidates = []
+    for idx, score in engine.vector_search(queries[0], k=100):
+        meal = engine.meal_data[idx].copy()
+        meal["similarity_score"] = score
+        candidates.append(meal)
+    preferences = {"dietary_restrictions": ["gluten", "dairy"], "cultural_preferences": ["Mediterranean"]}
+
+    ops = {
+        "encode_mood_query": lambda i: engine.encode_mood_query(MOOD_TEXTS[i % len(MOOD_TEXTS)],
+                                                                moods[i % len(moods)], moods[(i + 3) % len(moods)]),
+        "vector_search": lambda i: engine.vector_search(queries[i % len(queries)], k=10),
+        # Fresh dicts each call: the filter adds its preference boost to similarity_score in place
+        "filter_by_preferences": lambda i: engine.filter_by_preferences([dict(m) for m in candidates], preferences),
+        "get_mood_suggestions": lambda i: engine.get_mood_suggestions(PARTIAL_MOODS[i % len(PARTIAL_MOODS)]),
+        "get_similar_meals": lambda i: engine.get_similar_meals(names[i % len(names)], k=5),
+        "suggest_meal": lambda i: suggester.suggest_meal(MOOD_INPUTS[i % len(MOOD_INPUTS)],
+                                                         MOOD_INPUTS[(i + 1) % len(MOOD_INPUTS)], "bench_user"),
+        "find_similar_mood": lambda i: suggester.find_similar_mood(MOOD_INPUTS[i % len(MOOD_INPUTS)]),
+        # Last: positive feedback rewrites embeddings and rebuilds the index
+        "update_meal_feedback": lambda i: engine.update_meal_feedback(names[i % len(names)], 5,
+                                                                      MOOD_TEXTS[i % len(MOOD_TEXTS)])
+    }
+    for name, fn in ops.items():
+        results[name] = time_op(fn, min_time=min_time, min_repeats=3 if name == "update_meal_feedback" else 5)
+        print(f"  {name:<22} median {results[name]['median_ms']:>11.4f} ms  ({results[name]['repeats']} runs)")
+    return results
+
+
+def compare(current: Dict, baseline: Dict, threshold: float) -> List[str]:
+    """Print median ratios against a baseline run; returns the regressions"""
+    regressions = []
+    print(f"\n{'size':>8} {'operation':<22} {'baseline ms':>12} {'current ms':>12} {'ratio':>7}")
+    for size, ops in current["results"].items():
+        for op, stats in ops.items():
+            before = baseline.get("results", {}).get(size, {}).get(op)
+            if not before or "median_ms" not in stats or "median_ms" not in before:
+                continue
+            ratio = stats["median_ms"] / before["median_ms"] if before["median_ms"] else float("inf")
+            flag = " ⚠️" if ratio > threshold else ""
+            print(f"{size:>8} {op:<22} {before['median_ms']:>12.4f} {stats['median_ms']:>12.4f} {ratio:>6.2f}x{flag}")
+            if ratio > threshold:
+                regressions.append(f"{op} @ {size}: {ratio:.2f}x")
+    return regressions
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT,
+                                       stderr=subprocess.DEVNULL, text=True).strip()
+    except Exception:
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark meal engine hot paths at several catalog sizes")
+    parser.add_argument("--sizes", default=DEFAULT_SIZES, help=f"Comma-separated catalog sizes (default: {DEFAULT_SIZES})")
+    parser.add_argument("--min-time", type=float, default=1.0, help="Seconds to spend timing each operation")
+    parser.add_argument("--stub-latency", action="store_true", help="Keep the stubs' simulated model latency")
+    parser.add_argument("--real-models", action="store_true", help="Load the real models instead of stubs")
+    parser.add_argument("--json", default=None, help="Write results to this file")
+    parser.add_argument("--compare", default=None, help="Baseline JSON from an earlier run")
+    parser.add_argument("--threshold", type=float, default=1.25, help="Median ratio that counts as a regression")
+    args = parser.parse_args()
+
+    # Must be set before model_registry is imported
+    if not args.real_models:
+        os.environ["MEAL_MODEL_STUBS"] = "1"
+        if not args.stub_latency:
+            os.environ["MEAL_STUB_LATENCY_SCALE"] = "0"
+
+    import logging
+    logging.disable(logging.INFO)
+
+    sizes = [int(size) for size in args.sizes.split(",")]
+    report = {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "commit": git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "models": "real" if args.real_models else ("stubs" if args.stub_latency else "stubs (no latency)")
+        },
+        "results": {}
+    }
+
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory(prefix="meal_bench_") as workdir:
+        os.chdir(workdir)
+        try:
+            for size in sizes:
+                print(f"📊 Catalog size {size:,}")
+                report["results"][str(size)] = bench_size(size, workdir, args.min_time)
+        finally:
+            os.chdir(cwd)
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"📄 Results written to {args.json}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = compare(report, json.load(f), args.threshold)
+        if regressions:
+            print(f"\n❌ {len(regressions)} regression(s) over {args.threshold}x: {', '.join(regressions)}")
+            sys.exit(1)
+        print("\n✅ No regressions")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+"""
+Benchmark for the streaming (block-wise) acoustic feature extractor.
+
+Encodes synthetic speech-like clips as 44.1 kHz WAV uploads and extracts the
+mood feature vector two ways: decoding the whole upload into an AudioClip and
+running ``mood_feature_vector`` on it, and feeding ``iter_audio_blocks`` into
+``stream_mood_feature_vector``. Reports peak traced memory and time for both
+and the largest relative difference per feature:
+
+    python benchmarks/bench_streaming_features.py --durations 30,120,600 --json streaming.json
+
+Exits with status 1 if any feature differs by more than ``--tolerance`` or
+the tempo estimates differ.
+"""
+import argparse
+import io
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+from typing import Callable, Dict, Tuple
+
+import numpy as np
+import librosa
+import soundfile as sf
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from bench_hot_paths import git_commit
+from bench_audio_features import SAMPLE_RATE, synthetic_speech
+
+from audio_io import AudioClip, TARGET_SAMPLE_RATE, iter_audio_blocks, resample
+from audio_features import mood_feature_vector, stream_mood_feature_vector
+
+UPLOAD_SAMPLE_RATE = 44100
+DEFAULT_DURATIONS = "30,120,600"
+FEATURE_NAMES = [f"mfcc_{i}" for i in range(13)] + [
+    "spectral_centroid", "spectral_rolloff", "zero_crossing_rate", "pitch_mean", "energy", "tempo"]
+
+
+def wav_upload(seconds: float) -> bytes:
+    clip = resample(synthetic_speech(seconds, seed=int(seconds)), SAMPLE_RATE, UPLOAD_SAMPLE_RATE)
+    buffer = io.BytesIO()
+    sf.write(buffer, clip, UPLOAD_SAMPLE_RATE, format="WAV", subtype="PCM_16")
+    return buffer.getvalue()
+
+
+def whole_file(upload: bytes) -> np.ndarray:
+    clip = AudioClip.from_source(upload)
+    return mood_feature_vector(clip.samples, clip.sample_rate)
+
+
+def streaming(upload: bytes) -> np.ndarray:
+    return stream_mood_feature_vector(iter_audio_blocks(upload), TARGET_SAMPLE_RATE)
+
+
+def measure(fn: Callable[[bytes], np.ndarray], upload: bytes) -> Tuple[np.ndarray, Dict]:
+    """Run once under tracemalloc (peak memory) and once untraced (time)"""
+    tracemalloc.start()
+    features = fn(upload)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    start = time.perf_counter()
+    fn(upload)
+    return features, {"peak_mb": round(peak / 2 ** 20, 1), "ms": round(1000 * (time.perf_counter() - start), 1)}
+
+
+def bench_duration(seconds: float) -> Dict:
+    upload = wav_upload(seconds)
+    expected, whole_stats = measure(whole_file, upload)
+    actual, streaming_stats = measure(streaming, upload)
+    relative = np.abs(expected - actual) / np.maximum(np.abs(expected), 1e-9)
+    worst = int(np.argmax(relative[:-1]))
+    return {
+        "upload_mb": round(len(upload) / 2 ** 20, 1),
+        "whole_file": whole_stats,
+        "streaming": streaming_stats,
+        "max_relative_diff": float(relative[worst]),
+        "worst_feature": FEATURE_NAMES[worst],
+        "tempo": [float(expected[-1]), float(actual[-1])]
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the streaming audio feature extractor")
+    parser.add_argument("--durations", default=DEFAULT_DURATIONS,
+                        help=f"Comma-separated clip lengths in seconds (default: {DEFAULT_DURATIONS})")
+    parser.add_argument("--tolerance", type=float, default=1e-3,
+                        help="Largest accepted relative difference per feature (default: 1e-3)")
+    parser.add_argument("--json", default=None, help="Write results to this file")
+    args = parser.parse_args()
+
+    report = {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "commit": git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "librosa": librosa.__version__
+        },
+        "results": {}
+    }
+
+    print(f"{'clip':>6} {'upload MB':>10} {'whole MB':>9} {'stream MB':>10} {'whole ms':>9} {'stream ms':>10}  max diff")
+    print("-" * 80)
+    failures = []
+    for seconds in [float(d) for d in args.durations.split(",")]:
+        results = bench_duration(seconds)
+        report["results"][f"{seconds:g}s"] = results
+        ok = results["max_relative_diff"] <= args.tolerance and results["tempo"][0] == results["tempo"][1]
+        status = "✅" if ok else f"❌ (tempo {results['tempo'][0]:g} vs {results['tempo'][1]:g})"
+        print(f"{seconds:>5g}s {results['upload_mb']:>10.1f} {results['whole_file']['peak_mb']:>9.1f} "
+              f"{results['streaming']['peak_mb']:>10.1f} {results['whole_file']['ms']:>9.1f} "
+              f"{results['streaming']['ms']:>10.1f}  {results['max_relative_diff']:.1e} "
+              f"({results['worst_feature']}) {status}")
+        if not ok:
+            failures.append(f"{seconds:g}s")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"📄 Results written to {args.json}")
+
+    if failures:
+        print(f"\n❌ Streaming features differ beyond tolerance for: {', '.join(failures)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
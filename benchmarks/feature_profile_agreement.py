@@ -0,0 +1,178 @@
+"""
+Agreement check for the "fast" acoustic feature profile.
+
+Runs ``EnhancedMoodDetector.detect_mood_from_audio_features`` on vectors from
+both profiles and reports how often the fast profile lands on the same mood
+(and on the same side of every rule threshold) as the full profile, plus the
+extraction speedup. The default corpus is a grid of synthetic speech-like
+clips labelled by the full profile; ``--corpus`` adds recordings labelled by
+hand (CSV with ``path,primary,secondary`` columns):
+
+    python benchmarks/feature_profile_agreement.py --min-agreement 0.9 --json agreement.json
+
+Exits with status 1 if mood agreement is below ``--min-agreement``.
+"""
+import argparse
+import csv
+import itertools
+import json
+import os
+import platform
+import sys
+import time
+from typing import Dict, List, Tuple
+
+import numpy as np
+import librosa
+
+os.environ.setdefault("MEAL_MODEL_STUBS", "1")  # the rule-based classifier needs no models
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from bench_hot_paths import git_commit
+from bench_audio_features import SAMPLE_RATE, synthetic_speech
+
+from audio_io import AudioClip
+from audio_features import extract_mood_features
+from enhanced_mood_detector import EnhancedMoodDetector
+from state_store import InMemoryStateStore
+
+# Synthetic corpus: every combination, one clip each
+F0S = (90.0, 140.0, 200.0, 280.0)
+SYLLABLE_RATES = (1.5, 3.0, 5.0, 8.0)
+LEVELS = (0.02, 0.1, 0.4)
+SEEDS = (0, 1)
+DEFAULT_DURATION = 5.0
+
+# The comparisons detect_mood_from_audio_features makes, on the slots it reads
+THRESHOLDS = {
+    "energy>0.7": lambda f: min(f[-3] * 1000, 1.0) > 0.7,
+    "energy<0.3": lambda f: min(f[-3] * 1000, 1.0) < 0.3,
+    "energy>0.5": lambda f: min(f[-3] * 1000, 1.0) > 0.5,
+    "tempo>0.6": lambda f: min(f[-1] / 200, 1.0) > 0.6,
+    "tempo<0.4": lambda f: min(f[-1] / 200, 1.0) < 0.4,
+    "tempo>0.5": lambda f: min(f[-1] / 200, 1.0) > 0.5,
+    "zcr>0.6": lambda f: min(f[-5] * 10, 1.0) > 0.6,
+    "pitch>0.7": lambda f: f[-4] > 0 and min(f[-4] / 200, 1.0) > 0.7,
+    "pitch<0.2": lambda f: not (f[-4] > 0 and min(f[-4] / 200, 1.0) >= 0.2),
+}
+
+
+def synthetic_corpus(duration: float) -> List[Tuple[str, np.ndarray]]:
+    corpus = []
+    for f0, rate, level, seed in itertools.product(F0S, SYLLABLE_RATES, LEVELS, SEEDS):
+        name = f"f0={f0:g} rate={rate:g} level={level:g} seed={seed}"
+        corpus.append((name, synthetic_speech(duration, seed=seed, f0=f0, syllable_rate=rate, level=level)))
+    return corpus
+
+
+def labelled_corpus(path: str) -> List[Tuple[str, np.ndarray, Tuple[str, str]]]:
+    base = os.path.dirname(os.path.abspath(path))
+    corpus = []
+    with open(path, newline="") as f:
+        for row in csv.DictReader(f):
+            clip = AudioClip.from_source(os.path.join(base, row["path"]))
+            corpus.append((row["path"], np.asarray(clip.samples), (row["primary"], row["secondary"])))
+    return corpus
+
+
+def extract(samples: np.ndarray, profile: str) -> Tuple[np.ndarray, float]:
+    start = time.perf_counter()
+    features = extract_mood_features(samples, SAMPLE_RATE, profile)
+    return features, time.perf_counter() - start
+
+
+def compare(detector: EnhancedMoodDetector, corpus) -> Dict:
+    rows = []
+    threshold_hits = {name: 0 for name in THRESHOLDS}
+    times = {"full": 0.0, "fast": 0.0}
+    for entry in corpus:
+        name, samples = entry[0], entry[1]
+        full, full_time = extract(samples, "full")
+        fast, fast_time = extract(samples, "fast")
+        times["full"] += full_time
+        times["fast"] += fast_time
+        for threshold, test in THRESHOLDS.items():
+            threshold_hits[threshold] += test(full) == test(fast)
+        row = {
+            "clip": name,
+            "full": detector.detect_mood_from_audio_features(full),
+            "fast": detector.detect_mood_from_audio_features(fast),
+            "tempo": [round(float(full[-1]), 1), round(float(fast[-1]), 1)]
+        }
+        if len(entry) > 2:
+            row["label"] = entry[2]
+        rows.append(row)
+
+    n = len(rows)
+    summary = {
+        "clips": n,
+        "mood_agreement": sum(r["full"] == r["fast"] for r in rows) / n,
+        "primary_agreement": sum(r["full"][0] == r["fast"][0] for r in rows) / n,
+        "threshold_agreement": {k: v / n for k, v in threshold_hits.items()},
+        "full_ms_per_clip": 1000 * times["full"] / n,
+        "fast_ms_per_clip": 1000 * times["fast"] / n,
+        "speedup": round(times["full"] / times["fast"], 2)
+    }
+    if all("label" in r for r in rows):
+        summary["full_label_accuracy"] = sum(tuple(r["full"]) == tuple(r["label"]) for r in rows) / n
+        summary["fast_label_accuracy"] = sum(tuple(r["fast"]) == tuple(r["label"]) for r in rows) / n
+    return {"summary": summary, "clips": rows}
+
+
+def print_summary(title: str, summary: Dict):
+    print(f"\n{title} ({summary['clips']} clips)")
+    print("-" * 50)
+    print(f"Mood agreement:     {summary['mood_agreement']:.1%}")
+    print(f"Primary agreement:  {summary['primary_agreement']:.1%}")
+    for threshold, agreement in summary["threshold_agreement"].items():
+        print(f"  {threshold:<12} {agreement:.1%}")
+    if "full_label_accuracy" in summary:
+        print(f"Label accuracy:     full {summary['full_label_accuracy']:.1%}, "
+              f"fast {summary['fast_label_accuracy']:.1%}")
+    print(f"Extraction:         full {summary['full_ms_per_clip']:.1f} ms, fast {summary['fast_ms_per_clip']:.1f} ms "
+          f"({summary['speedup']:.2f}x)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check fast-profile audio features against the full profile")
+    parser.add_argument("--duration", type=float, default=DEFAULT_DURATION,
+                        help=f"Synthetic clip length in seconds (default: {DEFAULT_DURATION:g})")
+    parser.add_argument("--corpus", default=None, help="CSV of labelled recordings (path,primary,secondary)")
+    parser.add_argument("--min-agreement", type=float, default=None,
+                        help="Fail if mood agreement on any corpus is below this fraction")
+    parser.add_argument("--json", default=None, help="Write per-clip results to this file")
+    args = parser.parse_args()
+
+    detector = EnhancedMoodDetector(store=InMemoryStateStore())
+    report = {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "commit": git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "librosa": librosa.__version__
+        },
+        "results": {}
+    }
+
+    report["results"]["synthetic"] = compare(detector, synthetic_corpus(args.duration))
+    print_summary("Synthetic corpus", report["results"]["synthetic"]["summary"])
+    if args.corpus:
+        report["results"]["labelled"] = compare(detector, labelled_corpus(args.corpus))
+        print_summary(f"Labelled corpus {args.corpus}", report["results"]["labelled"]["summary"])
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2, default=str)
+        print(f"\n📄 Results written to {args.json}")
+
+    if args.min_agreement is not None:
+        failing = [name for name, result in report["results"].items()
+                   if result["summary"]["mood_agreement"] < args.min_agreement]
+        if failing:
+            print(f"\n❌ Mood agreement below {args.min_agreement:.0%} for: {', '.join(failing)}")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
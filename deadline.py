@@ -0,0 +1,109 @@
+"""
+Latency budgets for the recommendation pipeline.
+
+A request may carry a latency budget (``latency_budget_ms`` in the body or the
+``X-Latency-Budget-Ms`` header). It becomes a ``Deadline`` that the handlers and
+``VectorMealEngine`` check before each expensive stage. ``stage_timings``
+keeps an EWMA of every stage's duration, so a stage that would not finish in
+the remaining time is skipped or swapped for its cheap fallback (rule-based
+explanation instead of distilgpt2, text-only mood instead of audio features,
+no spoken explanation). The response then arrives on time, just a little plainer.
+
+A skipped stage records no new duration, so each skip decays its estimate back
+toward the starting guess; one slow outlier cannot switch a stage off for good,
+it only keeps it off until the estimate fits again and the stage is re-measured.
+"""
+import math
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Optional
+
+LATENCY_BUDGET_HEADER = "X-Latency-Budget-Ms"
+
+
+class Deadline:
+    """Point in time by which the response should be ready (None = no deadline)"""
+
+    def __init__(self, budget_seconds: Optional[float] = None):
+        self.budget = budget_seconds
+        self.expires_at = time.perf_counter() + budget_seconds if budget_seconds is not None else None
+
+    @classmethod
+    def from_ms(cls, budget_ms: Optional[float]) -> "Deadline":
+        return cls(budget_ms / 1000.0 if budget_ms and budget_ms > 0 else None)
+
+    @property
+    def bounded(self) -> bool:
+        return self.expires_at is not None
+
+    def remaining(self) -> float:
+        """Seconds left (infinite when there is no deadline)"""
+        if self.expires_at is None:
+            return math.inf
+        return max(0.0, self.expires_at - time.perf_counter())
+
+    def expired(self) -> bool:
+        return self.remaining() <= 0
+
+    def fits(self, estimated_seconds: float) -> bool:
+        """Whether a stage expected to take estimated_seconds still fits"""
+        return self.remaining() >= estimated_seconds
+
+
+class StageTimings:
+    """EWMA of how long each pipeline stage takes in this process"""
+
+    def __init__(self, defaults: Dict[str, float], alpha: float = 0.2, skip_decay: float = 0.05):
+        self.alpha = alpha
+        self.skip_decay = skip_decay
+        self._defaults = dict(defaults)
+        self._estimates = dict(defaults)
+        self._lock = threading.Lock()
+
+    def estimate(self, stage: str) -> float:
+        return self._estimates.get(stage, 0.0)
+
+    def record(self, stage: str, seconds: float) -> None:
+        with self._lock:
+            previous = self._estimates.get(stage)
+            self._estimates[stage] = seconds if previous is None else previous + self.alpha * (seconds - previous)
+
+    def skipped(self, stage: str) -> None:
+        """Note that a stage was skipped for its estimate: move the estimate back toward the default"""
+        with self._lock:
+            previous = self._estimates.get(stage)
+            default = self._defaults.get(stage)
+            if previous is not None and default is not None and previous > default:
+                self._estimates[stage] = previous + self.skip_decay * (default - previous)
+
+    def fits(self, deadline: Deadline, stage: str, reserve: float = 0.0) -> bool:
+        """Whether stage still fits the deadline with reserve seconds left for later stages"""
+        if deadline.fits(self.estimate(stage) + reserve):
+            return True
+        self.skipped(stage)
+        return False
+
+    @contextmanager
+    def measure(self, stage: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(stage, time.perf_counter() - start)
+
+    def snapshot(self) -> Dict[str, float]:
+        return {stage: round(seconds, 4) for stage, seconds in self._estimates.items()}
+
+
+# Starting guesses (CPU); replaced by measurements after a few requests
+stage_timings = StageTimings({
+    "asr": 1.5,
+    "text_mood": 0.1,
+    "audio_features": 2.0,
+    "audio_features_fast": 0.5,
+    "encode_query": 0.05,
+    "vector_search": 0.005,
+    "generate_explanation": 1.5,
+    "tts": 1.0
+})
@@ -354,6 +354,125 @@ if __name__ == "__main__":
     print("✅ Created simple_backend.py")
     print("You can test with: python -m uvicorn simple_backend:app --host 0.0.0.0 --port 8000")
 
+# Heavy modules imported by enhanced_backend, in import order
+HEAVY_MODULES = ['numpy', 'torch', 'transformers', 'sentence_transformers', 'faiss', 'sklearn', 'librosa']
+
+# Components in the order enhanced_backend loads them (registry names)
+MEMORY_COMPONENTS = ['emotion_classifier', 'wav2vec2', 'whisper_asr', 'sentence_encoder', 'text_generator', 'dialogpt']
+
+def profile_imports():
+    """Time each heavy import and the RSS it adds"""
+    from memory_profile import rss_bytes, to_mb
+    import time
+    
+    print("\n⏱️ Heavy Module Imports")
+    print("-" * 30)
+    results = {}
+    for module in HEAVY_MODULES:
+        rss_before = rss_bytes()
+        start = time.perf_counter()
+        try:
+            importlib.import_module(module)
+            error = None
+        except Exception as e:
+            error = str(e)
+        seconds = time.perf_counter() - start
+        rss_delta = rss_bytes() - rss_before if rss_before is not None else None
+        results[module] = {"seconds": round(seconds, 3), "rss_delta_mb": to_mb(rss_delta), "error": error}
+        if error:
+            print(f"❌ {module:<22} {error}")
+        else:
+            print(f"✅ {module:<22} {seconds:>7.2f}s  +{to_mb(rss_delta)} MB RSS")
+    return results
+
+def profile_components():
+    """Load each backend component in order; report the RSS and tracemalloc delta it adds"""
+    from memory_profile import rss_bytes, to_mb, weights_bytes
+    import gc
+    import time
+    import tracemalloc
+    
+    print("\n🧠 Component Memory (loaded in backend order)")
+    print("-" * 30)
+    sys.path.insert(0, os.getcwd())
+    from model_registry import registry
+    
+    def measure(name, load):
+        gc.collect()
+        rss_before = rss_bytes()
+        traced_before = tracemalloc.get_traced_memory()[0]
+        start = time.perf_counter()
+        try:
+            obj = load()
+            error = None
+        except Exception as e:
+            obj, error = None, str(e)
+        seconds = time.perf_counter() - start
+        gc.collect()
+        rss_delta = rss_bytes() - rss_before if rss_before is not None else None
+        traced_delta = tracemalloc.get_traced_memory()[0] - traced_before
+        result = {
+            "seconds": round(seconds, 2),
+            "rss_delta_mb": to_mb(rss_delta),
+            "tracemalloc_delta_mb": to_mb(traced_delta),
+            "weights_mb": to_mb(weights_bytes(obj)),
+            "error": error
+        }
+        if error:
+            print(f"❌ {name:<20} {error}")
+        else:
+            print(f"✅ {name:<20} +{result['rss_delta_mb']!s:>8} MB RSS  +{result['tracemalloc_delta_mb']!s:>7} MB traced  "
+                  f"{result['weights_mb']!s:>8} MB weights  ({seconds:.1f}s)")
+        return obj, result
+    
+    # tracemalloc only sees Python-level allocations; tensor storage shows up in RSS
+    tracemalloc.start()
+    results = {}
+    for name in MEMORY_COMPONENTS:
+        _, results[name] = measure(name, lambda: registry.get(name))
+    
+    def load_faiss_index():
+        from vector_meal_engine import VectorMealEngine
+        engine = VectorMealEngine()
+        return [engine.faiss_index, engine.meal_embeddings]
+    
+    _, results['faiss_index'] = measure('faiss_index', load_faiss_index)
+    tracemalloc.stop()
+    return results
+
+def profile_memory(json_path=None):
+    """Startup memory report: import costs, then what each component adds"""
+    from memory_profile import rss_bytes, to_mb
+    
+    print("🔍 AI Mood Meal Assistant - Memory Profile")
+    print("=" * 50)
+    baseline = rss_bytes()
+    print(f"Baseline RSS: {to_mb(baseline)} MB")
+    
+    report = {
+        "baseline_rss_mb": to_mb(baseline),
+        "imports": profile_imports(),
+        "components": profile_components()
+    }
+    report["final_rss_mb"] = to_mb(rss_bytes())
+    
+    ranked = sorted(
+        ((name, c["rss_delta_mb"] or 0) for name, c in report["components"].items() if not c["error"]),
+        key=lambda item: item[1], reverse=True
+    )
+    print("\n📋 Memory Summary")
+    print("-" * 30)
+    print(f"Final RSS: {report['final_rss_mb']} MB (per worker)")
+    for name, delta in ranked:
+        print(f"  {name:<20} {delta:>8} MB")
+    
+    if json_path:
+        import json
+        with open(json_path, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"📄 Report written to {json_path}")
+    return report
+
 def main():
     """Main diagnostic function"""
     print("🔍 AI Mood Meal Assistant - Backend Diagnostics")
@@ -411,4 +530,13 @@ def main():
         print("Try the simplified backend instead")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    import argparse
+    parser = argparse.ArgumentParser(description="AI Mood Meal Assistant backend diagnostics")
+    parser.add_argument("--memory", action="store_true", help="Profile import and per-component memory instead")
+    parser.add_argument("--json", default=None, help="With --memory, also write the report to this file")
+    args = parser.parse_args()
+    
+    if args.memory:
+        profile_memory(args.json)
+    else:
+        main()
\ No newline at end of file
@@ -3,8 +3,11 @@ import requests
 import base64
 import json
 import time
+import threading
+from collections import deque
 from datetime import datetime, timedelta
 from components.preferences import save_dietary_preferences
+from http_client import get_session
 from components.voice_input import detect_mood_from_voice, get_meal_suggestions
 
 # Guard clause for pandas import
@@ -241,6 +244,10 @@ def initialize_session_state():
         st.session_state.api_errors = 0
     if 'last_request_time' not in st.session_state:
         st.session_state.last_request_time = 0
+    if 'pending_reminders' not in st.session_state:
+        st.session_state.pending_reminders = []
+    if 'last_suggestion' not in st.session_state:
+        st.session_state.last_suggestion = None
 
 # Input validation functions
 def validate_text_input(text):
@@ -289,6 +296,11 @@ def rate_limit_check():
     st.session_state.last_request_time = current_time
     return True, "Rate limit OK"
 
+# Latency budget sent to the backend, kept below the client timeout so the
+# backend returns a plainer answer in time instead of the request timing out
+REQUEST_TIMEOUT = 30
+LATENCY_BUDGET_MS = 20000
+
 def safe_api_request(url, method='POST', **kwargs):
     """Make API requests with proper error handling and timeout"""
     try:
@@ -297,18 +309,23 @@ def safe_api_request(url, method='POST', **kwargs):
         if not rate_ok:
             return None, rate_msg
         
-        # Set timeout and make request
-        kwargs['timeout'] = 30  # 30 second timeout
+        # Set timeout and latency budget, then make request
+        kwargs['timeout'] = REQUEST_TIMEOUT
+        kwargs.setdefault('headers', {}).setdefault('X-Latency-Budget-Ms', str(LATENCY_BUDGET_MS))
         
+        # Pooled keep-alive session shared across reruns (see http_client.py)
         if method == 'POST':
-            response = requests.post(url, **kwargs)
+            response = get_session().post(url, **kwargs)
         else:
-            response = requests.get(url, **kwargs)
+            response = get_session().get(url, **kwargs)
         
         # Reset error counter on success
         if response.status_code == 200:
             st.session_state.api_errors = 0
             return response, "Success"
+        elif response.status_code == 503 and "Retry-After" in response.headers:
+            # Backend is shedding load; not counted as an error
+            return None, f"The server is busy right now. Please try again in {response.headers['Retry-After']} seconds."
         else:
             st.session_state.api_errors += 1
             return None, f"Server error: {response.status_code}"
@@ -323,6 +340,158 @@ def safe_api_request(url, method='POST', **kwargs):
         st.session_state.api_errors += 1
         return None, f"Unexpected error: {str(e)}"
 
+def render_text_suggestion(data):
+    """Display the latest text suggestion and its rating form"""
+    meal_name = str(data.get('meal', 'Unknown Meal'))[:100]  # Limit length
+    moods = data.get('mood_detected', ['Unknown', 'Unknown'])
+    reason = str(data.get('reason', 'No reason provided'))[:500]
+    benefit = str(data.get('benefit', 'No benefits listed'))[:500]
+    
+    st.markdown(f""" 
+    <div class="meal-suggestion">
+        <div class="mood-emoji">🍽️</div>
+        <h3>Recommended: {meal_name}</h3>
+    
+        <div class="meal-info">
+            <strong>🎭 Detected Moods:</strong> {moods[0]} & {moods[1]}
+        </div>
+    
+        <div class="meal-info">
+            <strong>🎯 Why this meal:</strong> {reason}
+        </div>
+    
+        <div class="meal-info">
+            <strong>💪 Health Benefits:</strong> {benefit}
+        </div>
+    
+        <div class="meal-info">
+            <strong>🔥 Calories:</strong> {data.get('calories', 'N/A')} kcal
+        </div>
+    
+        <div class="meal-info">
+            <strong>🌍 Cuisine:</strong> {data.get('cultural_theme', 'Mixed')}
+        </div>
+    </div>
+    """, unsafe_allow_html=True)
+    
+    # AI explanation with length limit
+    if 'explanation' in data and data['explanation']:
+        explanation = str(data['explanation'])[:1000]  # Limit length
+        st.markdown("### 🤖 AI Nutritionist Says:")
+        st.info(explanation)
+    
+    # Rating lives in a form so moving the slider does not rerun the script
+    st.markdown("### ⭐ Rate this suggestion:")
+    with st.form("rating_form"):
+        rating = st.slider("How helpful was this recommendation?", 1, 5, 3)
+        submitted = st.form_submit_button("📝 Submit Rating")
+    
+    if submitted:
+        rating_response, rating_error = safe_api_request(
+            "http://localhost:8000/rate-meal",
+            json={
+                "user_id": st.session_state.user_id,
+                "mood_combo": moods,
+                "meal_name": meal_name,
+                "rating": int(rating)
+            }
+        )
+        
+        if rating_response:
+            st.success("Thank you for your feedback! 🙏")
+        else:
+            st.warning(f"Could not save rating: {rating_error}")
+
+class ReminderListener:
+    """Background client for the backend's /reminders/stream (Server-Sent Events).
+
+    The thread stops once no session has collected events for idle_timeout
+    seconds (e.g. the user closed the tab); the next pop_events restarts it.
+    """
+    
+    def __init__(self, user_id, base_url="http://localhost:8000", idle_timeout=600):
+        self.user_id = user_id
+        self.url = f"{base_url}/reminders/stream"
+        self.idle_timeout = idle_timeout
+        self.last_event_id = None
+        self.events = deque(maxlen=20)  # bounded: old reminders are dropped, not piled up
+        self.last_used = time.time()
+        self.stopped = threading.Event()
+        self.lock = threading.Lock()
+        self.thread = None
+        self.start()
+    
+    def start(self):
+        with self.lock:
+            if self.thread is not None and self.thread.is_alive():
+                return
+            self.stopped.clear()
+            self.thread = threading.Thread(target=self.run, name=f"reminders-{self.user_id}", daemon=True)
+            self.thread.start()
+    
+    def stop(self):
+        self.stopped.set()
+    
+    def idle(self):
+        return time.time() - self.last_used > self.idle_timeout
+    
+    def run(self):
+        """Keep one stream open, reconnecting with backoff and resuming from the last event"""
+        backoff = 1
+        while not self.stopped.is_set() and not self.idle():
+            try:
+                headers = {"Accept": "text/event-stream"}
+                if self.last_event_id:
+                    headers["Last-Event-ID"] = self.last_event_id
+                # Read timeout well above the server's 15s heartbeat
+                with requests.get(self.url, params={"user_id": self.user_id}, headers=headers,
+                                  stream=True, timeout=(5, 60)) as response:
+                    response.raise_for_status()
+                    backoff = 1
+                    self.consume(response.iter_lines(decode_unicode=True))
+            except Exception:
+                pass
+            if self.stopped.wait(backoff):
+                break
+            backoff = min(backoff * 2, 60)
+    
+    def consume(self, lines):
+        """Parse SSE lines into reminder events until the stream ends or the listener stops"""
+        event_id, data = None, []
+        for line in lines:
+            # Heartbeats arrive every 15s, so a stop or idle timeout is noticed promptly
+            if self.stopped.is_set() or self.idle():
+                return
+            if line is None or line.startswith(":"):
+                continue  # heartbeat comment
+            if not line:
+                if data:
+                    try:
+                        self.events.append(json.loads("\n".join(data)))
+                    except ValueError:
+                        pass
+                    if event_id:
+                        self.last_event_id = event_id
+                event_id, data = None, []
+            elif line.startswith("id:"):
+                event_id = line[3:].strip()
+            elif line.startswith("data:"):
+                data.append(line[5:].strip())
+    
+    def pop_events(self):
+        """Take all reminders received since the last call (restarting the stream if it went idle)"""
+        self.last_used = time.time()
+        self.start()
+        events = []
+        while self.events:
+            events.append(self.events.popleft())
+        return events
+
+@st.cache_resource(max_entries=100)
+def get_reminder_listener(user_id):
+    """One reminder stream per user, shared across reruns; evicted listeners stop once idle"""
+    return ReminderListener(user_id)
+
 # Initialize session state
 initialize_session_state()
 
@@ -358,11 +527,11 @@ with st.sidebar:
         if st.button("💾 Save Preferences"):
             # Save preferences via API
             try:
-                requests.post("http://localhost:8000/set-preferences", json={
+                get_session().post("http://localhost:8000/set-preferences", json={
                     "user_id": st.session_state.user_id,
                     "dietary_restrictions": dietary_restrictions,
                     "cultural_preferences": cultural_preferences
-                })
+                }, timeout=REQUEST_TIMEOUT)
                 st.session_state.preferences_set = True
                 st.success("✅ Preferences saved!")
             except:
@@ -470,64 +639,10 @@ with col1:
                         if not all(key in data for key in ['meal', 'mood_detected', 'reason', 'benefit']):
                             st.error("❌ Invalid response from server")
                         else:
-                            # Display meal suggestion with beautiful styling
-                            meal_name = str(data.get('meal', 'Unknown Meal'))[:100]  # Limit length
+                            # Kept in session state so the suggestion survives reruns (e.g. rating it)
+                            st.session_state.last_suggestion = data
+                            meal_name = str(data.get('meal', 'Unknown Meal'))[:100]
                             moods = data.get('mood_detected', ['Unknown', 'Unknown'])
-                            reason = str(data.get('reason', 'No reason provided'))[:500]
-                            benefit = str(data.get('benefit', 'No benefits listed'))[:500]
-                            
-                            st.markdown(f""" 
-                            <div class="meal-suggestion">
-                                <div class="mood-emoji">🍽️</div>
-                                <h3>Recommended: {meal_name}</h3>
-                                
-                                <div class="meal-info">
-                                    <strong>🎭 Detected Moods:</strong> {moods[0]} & {moods[1]}
-                                </div>
-                                
-                                <div class="meal-info">
-                                    <strong>🎯 Why this meal:</strong> {reason}
-                                </div>
-                                
-                                <div class="meal-info">
-                                    <strong>💪 Health Benefits:</strong> {benefit}
-                                </div>
-                                
-                                <div class="meal-info">
-                                    <strong>🔥 Calories:</strong> {data.get('calories', 'N/A')} kcal
-                                </div>
-                                
-                                <div class="meal-info">
-                                    <strong>🌍 Cuisine:</strong> {data.get('cultural_theme', 'Mixed')}
-                                </div>
-                            </div>
-                            """, unsafe_allow_html=True)
-                            
-                            # AI explanation with length limit
-                            if 'explanation' in data and data['explanation']:
-                                explanation = str(data['explanation'])[:1000]  # Limit length
-                                st.markdown("### 🤖 AI Nutritionist Says:")
-                                st.info(explanation)
-                            
-                            # Rating system
-                            st.markdown("### ⭐ Rate this suggestion:")
-                            rating = st.slider("How helpful was this recommendation?", 1, 5, 3)
-                            
-                            if st.button("📝 Submit Rating"):
-                                rating_response, rating_error = safe_api_request(
-                                    "http://localhost:8000/rate-meal",
-                                    json={
-                                        "user_id": st.session_state.user_id,
-                                        "mood_combo": moods,
-                                        "meal_name": meal_name,
-                                        "rating": int(rating)
-                                    }
-                                )
-                                
-                                if rating_response:
-                                    st.success("Thank you for your feedback! 🙏")
-                                else:
-                                    st.warning(f"Could not save rating: {rating_error}")
                             
                             # Update session state with validation
                             try:
@@ -558,6 +673,9 @@ with col1:
                         
                 else:
                     st.error(f"😔 {error_msg}")
+    
+    if st.session_state.last_suggestion:
+        render_text_suggestion(st.session_state.last_suggestion)
 
 with col2:
     # Quick mood selector
@@ -742,9 +860,32 @@ with reminder_col1:
     if st.button("💾 Save Reminder Settings"):
         st.success("✅ Reminder settings saved!")
 
-with reminder_col2:
+# Reruns on its own every few seconds, so a reminder pushed by the backend shows up
+# without the user having to interact with the page first
+@st.fragment(run_every=5)
+def show_reminders(reminder_enabled):
+    # Reminders are pushed by the backend; the listener collects them between reruns
+    if reminder_enabled:
+        listener = get_reminder_listener(st.session_state.user_id)
+        st.session_state.pending_reminders.extend(listener.pop_events())
+        st.session_state.pending_reminders = st.session_state.pending_reminders[-5:]
+    
+    if st.session_state.pending_reminders:
+        reminder = st.session_state.pending_reminders[-1]
+        st.markdown(f"""
+        <div class="notification">
+            <h4>🍽️ Meal Reminder</h4>
+            <p>{reminder.get('message', '')}</p>
+            <p><strong>Try:</strong> {reminder.get('suggested_meal', 'a nutritious meal')}</p>
+        </div>
+        """, unsafe_allow_html=True)
+        
+        if st.button("✅ Got it"):
+            st.session_state.pending_reminders = []
+            st.rerun()
+    
     # Check for missed meals
-    if st.session_state.meal_history:
+    elif st.session_state.meal_history:
         last_meal_time = datetime.strptime(st.session_state.meal_history[-1]['timestamp'], "%Y-%m-%d %H:%M")
         time_since_last_meal = datetime.now() - last_meal_time
         
@@ -759,6 +900,9 @@ with reminder_col2:
             if st.button("🍽️ Get Meal Suggestion Now"):
                 st.rerun()
 
+with reminder_col2:
+    show_reminders(reminder_enabled)
+
 # Footer with tips
 st.markdown("---")
 st.markdown("""
@@ -1,17 +1,33 @@
-from fastapi import FastAPI, File, UploadFile, HTTPException
+from fastapi import FastAPI, File, UploadFile, HTTPException, BackgroundTasks, Header
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, StreamingResponse
 from pydantic import BaseModel
 from typing import List, Dict, Optional
 import uvicorn
-import tempfile
 import os
 import base64
 from datetime import datetime, timedelta
+from contextlib import asynccontextmanager
 import asyncio
 import logging
+from concurrent.futures import ThreadPoolExecutor
 
 # Import our enhanced components
-#from vector_meal_engine import VectorMealEngine
+from vector_meal_engine import VectorMealEngine
+from model_registry import registry
+from state_store import get_default_store
+from reminder_suggestions import ReminderSuggestionCache
+from reminder_scheduler import ReminderScheduler
+from reminder_stream import ReminderBroadcaster
+from admission_control import AdmissionController, AdmissionControlMiddleware
+from deadline import Deadline, stage_timings
+from model_stubs import StubAgenticCore, stubs_enabled
+from memory_profile import rss_bytes, to_mb, weights_bytes
+from fast_responses import CompressionMiddleware, FastJSONResponse, negotiated_response
+from audio_io import AudioClip, AudioDecodeError
+from audio_features import resolve_profile
+from audio_feature_pool import AudioFeaturePool
 
 # Import your new AgenticCore
 from agentic_core import AgenticCore
@@ -35,11 +51,51 @@ class MealSuggestion(BaseModel):
     name: str
     reason: str
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Start model loading in the background so the server accepts traffic immediately"""
+    logger.info("🚀 AI Mood Meal Assistant API started successfully!")
+    logger.info("Available endpoints:")
+    logger.info("  - POST /agentic-meal-suggestion")
+    logger.info("  - POST /suggest-meal-from-text")
+    logger.info("  - POST /suggest-meal-from-moods")
+    logger.info("  - POST /suggest-meal-from-audio")
+    logger.info("  - POST /suggest-meal-batch")
+    logger.info("  - POST /set-preferences")
+    logger.info("  - POST /rate-meal")
+    logger.info("  - GET /mood-suggestions")
+    logger.info("  - GET /similar-meals/{meal_name}")
+    logger.info("  - GET /check-reminders/{user_id}")
+    logger.info("  - GET /reminders/stream")
+    logger.info("  - GET /stats")
+    logger.info("  - GET /health")
+    logger.info("  - GET /ready")
+    
+    loader_task = asyncio.create_task(run_in_threadpool(load_components))
+    # Per serving process: a pre-fork master never runs the lifespan, so each worker
+    # spawns its own pool (sized by prefork_server.py) instead of inheriting a dead one
+    feature_pool_task = asyncio.create_task(run_in_threadpool(start_feature_pool))
+    reminder_task = asyncio.create_task(reminder_scheduler.run())
+    reminder_stream_task = asyncio.create_task(reminder_broadcaster.run())
+    yield
+    reminder_task.cancel()
+    reminder_stream_task.cancel()
+    asr_executor.shutdown(wait=False)
+    audio_features_executor.shutdown(wait=False)
+    if not feature_pool_task.done():
+        logger.info("Shutting down while the audio feature pool is still starting")
+    feature_pool.shutdown()
+    if not loader_task.done():
+        logger.info("Shutting down while AI components are still loading")
+    state_store.flush()
+
 # Initialize FastAPI app
 app = FastAPI(
     title="🧠 AI Mood Meal Assistant API",
     description="Advanced AI-powered meal recommendations based on mood analysis with vector search and small language models",
-    version="2.0.0"
+    version="2.0.0",
+    lifespan=lifespan,
+    default_response_class=FastJSONResponse
 )
 
 
@@ -47,12 +103,24 @@ app = FastAPI(
 class MoodText(BaseModel):
     text: str
 
-# Create an instance of your FastAPI app
-app = FastAPI()
-
-# Create an instance of your AgenticCore
-# This will be done once when the server starts, so it's ready to handle requests.
-agentic_core_instance = AgenticCore()
+# Shed load per endpoint class before it queues up behind slow inference.
+# Added before CORS so rejections still carry CORS headers.
+admission = AdmissionController(
+    routes=[
+        ("/agentic-meal-suggestion", "agent"),
+        ("/suggest-meal-from-audio", "audio"),
+        ("/suggest-meal-from-text", "text"),
+        ("/suggest-meal-from-moods", "text"),
+        ("/suggest-meal-batch", "text"),
+        # Lookups and feedback get their own class so they are not shed behind inference
+        ("/rate-meal", "cheap"),
+        ("/mood-suggestions", "cheap")
+    ],
+    exempt=["/reminders/stream", "/health", "/ready"]
+)
+# Innermost: compress large complete responses (base64 audio, batches); streams pass through
+app.add_middleware(CompressionMiddleware, minimum_size=1024, exempt=["/reminders/stream"])
+app.add_middleware(AdmissionControlMiddleware, controller=admission)
 
 # Add CORS middleware
 app.add_middleware(
@@ -63,18 +131,67 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Initialize components
-try:
+# AI components are built by load_components() from the lifespan task; until then
+# endpoints see None and answer 503 or fall back, and /ready reports progress.
+vector_engine = None
+mood_detector = None
+meal_suggester = None
+agentic_core_instance = None
+reminder_suggestions = None
+components_loaded = False
+
+# The audio endpoint runs ASR and acoustic feature extraction side by side; separate
+# pools keep a burst of one from queueing the other behind it (or behind the default threadpool)
+asr_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="asr")
+# librosa holds the GIL, so feature extraction itself runs in worker processes (MEAL_FEATURE_WORKERS);
+# the audio-features threads only hand clips over and wait for the vectors
+feature_pool = AudioFeaturePool()
+audio_features_executor = ThreadPoolExecutor(max_workers=max(2, feature_pool.workers),
+                                              thread_name_prefix="audio-features")
+
+def start_feature_pool() -> None:
+    """Spawn and warm the audio feature processes; fall back to threads if that fails"""
+    try:
+        feature_pool.start()
+    except Exception as e:
+        logger.error(f"Error starting audio feature pool, extracting in threads: {e}")
+        feature_pool.shutdown()
+        feature_pool.workers = 0
+
+def load_components() -> None:
+    """Load and warm up all models once, then build the AI components (blocking)"""
+    global vector_engine, mood_detector, meal_suggester, agentic_core_instance, reminder_suggestions, components_loaded
+    
+    if components_loaded:
+        return
+    
     logger.info("Initializing AI components...")
-    # vector_engine = VectorMealEngine()  # Assuming VectorMealEngine is defined elsewhere
-    mood_detector = EnhancedMoodDetector()
-    meal_suggester = EnhancedMealSuggester()
-    logger.info("All AI components initialized successfully!")
-except Exception as e:
-    logger.error(f"Error initializing AI components: {e}")
-    vector_engine = None
-    mood_detector = None
-    meal_suggester = None
+    registry.load_all()
+    
+    try:
+        mood_detector = EnhancedMoodDetector(feature_pool=feature_pool)
+    except Exception as e:
+        logger.error(f"Error initializing mood detector: {e}")
+    
+    try:
+        meal_suggester = EnhancedMealSuggester()
+    except Exception as e:
+        logger.error(f"Error initializing meal suggester: {e}")
+    
+    try:
+        vector_engine = VectorMealEngine()
+        reminder_suggestions = ReminderSuggestionCache(vector_engine)
+        reminder_suggestions.refresh()
+    except Exception as e:
+        logger.error(f"Error initializing vector engine: {e}")
+    
+    try:
+        agentic_core_instance = StubAgenticCore() if stubs_enabled() else AgenticCore()
+    except Exception as e:
+        logger.error(f"Error initializing agentic core: {e}")
+    
+    components_loaded = True
+    logger.info("AI component initialization finished")
 
 # Mood-based meal suggestions
 MOOD_MEALS = {
@@ -104,11 +221,13 @@ MOOD_MEALS = {
 class TextMoodRequest(BaseModel):
     text: str
     user_id: str = "default"
+    latency_budget_ms: Optional[int] = None
 
 class MoodRequest(BaseModel):
     mood1: str
     mood2: str
     user_id: str = "default"
+    latency_budget_ms: Optional[int] = None
 
 class PreferencesRequest(BaseModel):
     user_id: str
@@ -125,6 +244,20 @@ class MoodSuggestionRequest(BaseModel):
     mood: str
     user_id: str = "default"
 
+class BatchSuggestionItem(BaseModel):
+    user_id: str = "default"
+    text: Optional[str] = None
+    mood1: Optional[str] = None
+    mood2: Optional[str] = None
+
+class BatchSuggestionRequest(BaseModel):
+    items: List[BatchSuggestionItem]
+    include_explanation: bool = True
+    latency_budget_ms: Optional[int] = None
+
+# Upper bound on items per batch request; larger jobs should be chunked by the client
+MAX_BATCH_ITEMS = 1000
+
 @app.post("/api/suggest/meals")
 async def suggest_meals(request: MoodRequest):
     """Suggest meals based on the detected mood"""
@@ -141,9 +274,57 @@ async def suggest_meals(request: MoodRequest):
     partial_text: str
     limit: int = 10
 
-# In-memory storage for reminders (in production, use a database)
-meal_reminders = {}
-user_last_meal = {}
+# Per-user state lives in the shared state store (in-process or SQLite, see
+# state_store.py) so every worker sees the same data and entries expire.
+state_store = get_default_store()
+meal_reminders = state_store.namespace("meal_reminders", ttl=24 * 3600)
+user_last_meal = state_store.namespace("last_meal", ttl=7 * 24 * 3600)
+
+REMINDER_INTERVAL = timedelta(hours=3)
+
+async def deliver_reminders(user_ids: List[str]) -> None:
+    """Push due reminders to connected clients and schedule the next ones"""
+    now = datetime.now()
+    with state_store.batch():
+        for user_id in user_ids:
+            last_meal = user_last_meal.get(user_id)
+            if not last_meal:
+                reminder_scheduler.cancel(user_id)
+                continue
+            
+            hours_since_meal = (now - datetime.fromisoformat(last_meal)).total_seconds() / 3600
+            meal = None
+            if reminder_suggestions:
+                meal = reminder_suggestions.lookup(mood_detector.get_user_preferences(user_id) if mood_detector else {})
+            
+            reminder_broadcaster.publish(user_id, {
+                "user_id": user_id,
+                "hours_since_last_meal": hours_since_meal,
+                "message": f"It's been {int(hours_since_meal)} hours since your last meal. Time to nourish your body!",
+                "suggested_meal": meal["meal_name"] if meal else "a nutritious meal",
+                "reminder_type": "overdue",
+                "timestamp": now.isoformat()
+            })
+            meal_reminders[user_id] = now.isoformat()
+            reminder_scheduler.schedule(user_id, now + REMINDER_INTERVAL)
+
+def pending_reminders():
+    """Next reminder of every user with a recorded meal (backfills the scheduler)"""
+    for user_id, last_meal in user_last_meal.items():
+        last_event = max(last_meal, meal_reminders.get(user_id) or last_meal)
+        yield user_id, datetime.fromisoformat(last_event) + REMINDER_INTERVAL
+
+# Reminders fire from a due-time heap and are pushed over /reminders/stream;
+# each due reminder is claimed in the shared store, so only one worker fires it,
+# and the event log in the store carries it to streams open on other workers
+reminder_scheduler = ReminderScheduler(state_store, deliver_reminders, backfill=pending_reminders)
+reminder_broadcaster = ReminderBroadcaster(state_store)
+
+def record_meal(user_id: str) -> None:
+    """Remember when a user was last given a meal and schedule their next reminder"""
+    now = datetime.now()
+    user_last_meal[user_id] = now.isoformat()
+    reminder_scheduler.schedule(user_id, now + REMINDER_INTERVAL)
 
 
 
@@ -159,12 +340,17 @@ async def get_agentic_suggestion(payload: MoodText):
     The agent will analyze the text, determine the mood, and find a suitable meal.
     """
     try:
+        if agentic_core_instance is None:
+            raise HTTPException(status_code=503, detail="Agentic core not available")
+        
         # Call the run_agent method on your AgenticCore instance
         result = agentic_core_instance.run_agent(payload.text)
         
         # The agent's output is a dictionary, so we return it directly
         return result
         
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -187,34 +373,70 @@ async def root():
         "endpoints": {
             "text_analysis": "/suggest-meal-from-text",
             "mood_selection": "/suggest-meal-from-moods", 
+            "batch": "/suggest-meal-batch",
             "audio_analysis": "/suggest-meal-from-audio",
             "preferences": "/set-preferences",
             "rating": "/rate-meal",
             "reminders": "/check-reminders",
-            "stats": "/stats"
+            "reminder_stream": "/reminders/stream",
+            "stats": "/stats",
+            "health": "/health",
+            "ready": "/ready"
         }
     }
 
+def request_deadline(budget_ms: Optional[int], header_budget_ms: Optional[int]) -> Deadline:
+    """Deadline from the request's latency_budget_ms, else the X-Latency-Budget-Ms header"""
+    return Deadline.from_ms(budget_ms if budget_ms is not None else header_budget_ms)
+
+def run_stage(stage: str, fn, *args):
+    """Call fn(*args), recording its duration under stage in stage_timings"""
+    with stage_timings.measure(stage):
+        return fn(*args)
+
+def speak_explanation(explanation: str, deadline: Deadline, degraded: List[str]) -> Optional[str]:
+    """Base64 speech for the explanation, skipped if it would not fit the deadline"""
+    if not stage_timings.fits(deadline, "tts"):
+        degraded.append("explanation_audio")
+        return None
+    try:
+        with stage_timings.measure("tts"):
+            audio_bytes = convert_text_to_speech(explanation)
+        if audio_bytes:
+            return base64.b64encode(audio_bytes).decode('utf-8')
+    except Exception as e:
+        logger.warning(f"Could not generate audio: {e}")
+    return None
+
 @app.post("/suggest-meal-from-text")
-async def suggest_meal_from_text(request: TextMoodRequest):
+async def suggest_meal_from_text(request: TextMoodRequest, x_latency_budget_ms: Optional[int] = Header(None)):
     """Get meal suggestion based on text description of mood"""
     try:
+        deadline = request_deadline(request.latency_budget_ms, x_latency_budget_ms)
+        degraded = []
+        
         if not vector_engine:
             raise HTTPException(status_code=503, detail="Vector engine not available")
         
-        # Detect mood from text using enhanced detector
-        mood1, mood2 = mood_detector.detect_mood_from_text(request.text) if mood_detector else ("Calm", "Neutral")
+        # Detect mood from text using enhanced detector (inference runs off the event loop)
+        if mood_detector:
+            mood1, mood2 = await run_in_threadpool(run_stage, "text_mood", mood_detector.detect_mood_from_text,
+                                                   request.text)
+        else:
+            mood1, mood2 = "Calm", "Neutral"
         
         # Get user preferences
         user_prefs = mood_detector.get_user_preferences(request.user_id) if mood_detector else {}
         
-        # Get recommendations using vector search
-        recommendations = vector_engine.recommend_meals(
+        # Get recommendations using vector search (encoding and explanation generation block)
+        recommendations = await run_in_threadpool(
+            vector_engine.recommend_meals,
             mood_text=request.text,
             mood1=mood1,
             mood2=mood2,
             user_preferences=user_prefs,
-            k=1
+            k=1,
+            deadline=deadline
         )
         
         if not recommendations:
@@ -224,18 +446,14 @@ async def suggest_meal_from_text(request: TextMoodRequest):
         
         # Generate enhanced explanation using small language model
         explanation = meal.get('explanation', 'This meal is recommended based on your current mood and nutritional needs.')
+        if meal.get('explanation_degraded'):
+            degraded.append("explanation")
         
         # Convert explanation to speech
-        explanation_audio = None
-        try:
-            audio_bytes = convert_text_to_speech(explanation)
-            if audio_bytes:
-                explanation_audio = base64.b64encode(audio_bytes).decode('utf-8')
-        except Exception as e:
-            logger.warning(f"Could not generate audio: {e}")
+        explanation_audio = await run_in_threadpool(speak_explanation, explanation, deadline, degraded)
         
         # Update last meal time
-        user_last_meal[request.user_id] = datetime.now()
+        record_meal(request.user_id)
         
         response = {
             "meal": meal["meal_name"],
@@ -252,8 +470,10 @@ async def suggest_meal_from_text(request: TextMoodRequest):
         
         if explanation_audio:
             response["explanation_audio"] = explanation_audio
+        if degraded:
+            response["degraded"] = degraded
         
-        return response
+        return FastJSONResponse(response)
         
     except HTTPException:
         raise
@@ -262,16 +482,19 @@ async def suggest_meal_from_text(request: TextMoodRequest):
         raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
 
 @app.post("/suggest-meal-from-moods")
-async def suggest_meal_from_moods(request: MoodRequest):
+async def suggest_meal_from_moods(request: MoodRequest, x_latency_budget_ms: Optional[int] = Header(None)):
     """Get meal suggestion based on selected moods"""
     try:
+        deadline = request_deadline(request.latency_budget_ms, x_latency_budget_ms)
+        
         if not vector_engine:
             # Fallback to enhanced meal suggester
             if meal_suggester:
-                result = meal_suggester.suggest_meal(request.mood1, request.mood2, request.user_id)
+                result = await run_in_threadpool(meal_suggester.suggest_meal, request.mood1, request.mood2,
+                                                 request.user_id)
                 if "error" not in result:
-                    user_last_meal[request.user_id] = datetime.now()
-                return result
+                    record_meal(request.user_id)
+                return FastJSONResponse(result)
             else:
                 raise HTTPException(status_code=503, detail="Meal suggestion service not available")
         
@@ -281,13 +504,15 @@ async def suggest_meal_from_moods(request: MoodRequest):
         # Create mood text for vector search
         mood_text = f"feeling {request.mood1.lower()} and {request.mood2.lower()}"
         
-        # Get recommendations using vector search
-        recommendations = vector_engine.recommend_meals(
+        # Get recommendations using vector search (encoding and explanation generation block)
+        recommendations = await run_in_threadpool(
+            vector_engine.recommend_meals,
             mood_text=mood_text,
             mood1=request.mood1,
             mood2=request.mood2,
             user_preferences=user_prefs,
-            k=1
+            k=1,
+            deadline=deadline
         )
         
         if not recommendations:
@@ -296,9 +521,9 @@ async def suggest_meal_from_moods(request: MoodRequest):
         meal = recommendations[0]
         
         # Update last meal time
-        user_last_meal[request.user_id] = datetime.now()
+        record_meal(request.user_id)
         
-        return {
+        response = {
             "meal": meal["meal_name"],
             "mood_detected": [request.mood1, request.mood2],
             "reason": meal["reason"],
@@ -310,6 +535,10 @@ async def suggest_meal_from_moods(request: MoodRequest):
             "explanation": meal.get("explanation", "This meal is recommended based on your selected moods."),
             "confidence": "High"
         }
+        if meal.get('explanation_degraded'):
+            response["degraded"] = ["explanation"]
+        
+        return FastJSONResponse(response)
         
     except HTTPException:
         raise
@@ -318,91 +547,237 @@ async def suggest_meal_from_moods(request: MoodRequest):
         raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
 
 @app.post("/suggest-meal-from-audio")
-async def suggest_meal_from_audio(audio: UploadFile = File(...), user_id: str = "default"):
+async def suggest_meal_from_audio(audio: UploadFile = File(...), user_id: str = "default",
+                                  latency_budget_ms: Optional[int] = None,
+                                  feature_profile: Optional[str] = None,
+                                  x_latency_budget_ms: Optional[int] = Header(None)):
     """Get meal suggestion based on audio mood analysis"""
     try:
+        deadline = request_deadline(latency_budget_ms, x_latency_budget_ms)
+        degraded = []
+        
         if not vector_engine or not mood_detector:
             raise HTTPException(status_code=503, detail="Audio analysis service not available")
         
-        # Save uploaded audio to temporary file
-        with tempfile.NamedTemporaryFile(delete=False, suffix=".wav") as temp_audio:
-            content = await audio.read()
-            temp_audio.write(content)
-            temp_audio_path = temp_audio.name
+        # "full" or "fast" acoustic features (default: MEAL_AUDIO_FEATURE_PROFILE)
+        try:
+            feature_profile = resolve_profile(feature_profile)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        features_stage = "audio_features" if feature_profile == "full" else f"audio_features_{feature_profile}"
         
+        # Decoded once, in memory, to a 16 kHz mono buffer shared by ASR and feature extraction
+        content = await audio.read()
         try:
-            # Transcribe audio to text
-            transcribed_text = transcribe_audio(temp_audio_path)
-            
-            # Detect mood from audio and text
-            mood1, mood2 = mood_detector.detect_mood_from_audio(temp_audio_path, transcribed_text)
-            
-            # Get user preferences
-            user_prefs = mood_detector.get_user_preferences(user_id)
-            
-            # Create comprehensive mood text
-            mood_text = f"{transcribed_text} feeling {mood1.lower()} and {mood2.lower()}"
-            
-            # Get recommendations using vector search
-            recommendations = vector_engine.recommend_meals(
-                mood_text=mood_text,
-                mood1=mood1,
-                mood2=mood2,
-                user_preferences=user_prefs,
-                k=1
-            )
+            clip = await run_in_threadpool(AudioClip.from_source, content)
+        except AudioDecodeError as e:
+            raise HTTPException(status_code=400, detail=f"Could not decode audio: {e}")
+        
+        # ASR and acoustic features are independent until fusion, so they run in parallel:
+        #   clip -> ASR -> text mood --\
+        #   clip -> audio features -----> fuse -> search -> explanation
+        # Features only have to fit alongside the stages that must still run, not after ASR
+        loop = asyncio.get_running_loop()
+        asr_future = loop.run_in_executor(asr_executor, run_stage, "asr", transcribe_audio, clip)
+        must_run = sum(stage_timings.estimate(stage) for stage in ("text_mood", "encode_query", "vector_search"))
+        use_audio_features = stage_timings.fits(deadline, features_stage, reserve=must_run)
+        features_future = None
+        if use_audio_features:
+            features_future = loop.run_in_executor(audio_features_executor, run_stage, features_stage,
+                                                   mood_detector.extract_audio_features, clip, feature_profile)
+        
+        # Transcribe audio to text, then detect its mood while features may still be running
+        transcribed_text = await asr_future
+        has_text = bool(transcribed_text and transcribed_text.strip())
+        text_moods = None
+        if has_text:
+            text_moods = await run_in_threadpool(run_stage, "text_mood", mood_detector.detect_mood_from_text,
+                                                 transcribed_text)
+        elif features_future is None:
+            # No transcript: the audio features are all there is, budget or not
+            features_future = loop.run_in_executor(audio_features_executor, run_stage, features_stage,
+                                                   mood_detector.extract_audio_features, clip, feature_profile)
+        if not use_audio_features and has_text:
+            degraded.append("audio_features")
+        
+        # Fuse audio and text moods
+        audio_moods = None
+        if features_future is not None:
+            audio_moods = mood_detector.detect_mood_from_audio_features(await features_future)
+        mood1, mood2 = mood_detector.combine_moods(text_moods, audio_moods)
+        
+        # Get user preferences
+        user_prefs = mood_detector.get_user_preferences(user_id)
+        
+        # Create comprehensive mood text
+        mood_text = f"{transcribed_text} feeling {mood1.lower()} and {mood2.lower()}"
+        
+        # Get recommendations using vector search (encoding and explanation generation block)
+        recommendations = await run_in_threadpool(
+            vector_engine.recommend_meals,
+            mood_text=mood_text,
+            mood1=mood1,
+            mood2=mood2,
+            user_preferences=user_prefs,
+            k=1,
+            deadline=deadline
+        )
+        
+        if not recommendations:
+            raise HTTPException(status_code=404, detail="No suitable meals found")
+        
+        meal = recommendations[0]
+        
+        # Generate enhanced explanation
+        explanation = meal.get('explanation', f"Based on your voice analysis, {meal['meal_name']} is perfect for your current {mood1.lower()} and {mood2.lower()} state.")
+        if meal.get('explanation_degraded'):
+            degraded.append("explanation")
+        
+        # Convert explanation to speech
+        explanation_audio = await run_in_threadpool(speak_explanation, explanation, deadline, degraded)
+        
+        # Update last meal time
+        record_meal(user_id)
+        
+        response = {
+            "meal": meal["meal_name"],
+            "mood_detected": [mood1, mood2],
+            "transcribed_text": transcribed_text,
+            "reason": meal["reason"],
+            "benefit": meal["benefit"],
+            "calories": meal.get("calories", "N/A"),
+            "cultural_theme": meal.get("cultural_theme", "Mixed"),
+            "dietary_theme": meal.get("dietary_theme", "General"),
+            "similarity_score": meal.get("similarity_score", 0.0),
+            "explanation": explanation,
+            "confidence": "High" if meal.get("similarity_score", 0) > 0.7 else "Medium"
+        }
+        
+        if explanation_audio:
+            response["explanation_audio"] = explanation_audio
+        if degraded:
+            response["degraded"] = degraded
+        
+        return FastJSONResponse(response)
             
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error in audio mood analysis: {e}")
+        raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
+
+def build_batch_suggestions(request: BatchSuggestionRequest, deadline: Optional[Deadline] = None) -> List[Dict]:
+    """Resolve moods, search and explain for a whole batch (runs in a worker thread)"""
+    results: List[Optional[Dict]] = [None] * len(request.items)
+    resolved = {}
+    
+    # Batch text classification for every item that only carries free text
+    text_indices = []
+    for i, item in enumerate(request.items):
+        if item.mood1 and item.mood2:
+            resolved[i] = (item.mood1, item.mood2)
+        elif item.text and item.text.strip():
+            text_indices.append(i)
+        else:
+            results[i] = {"user_id": item.user_id, "error": "Each item needs either text or mood1 and mood2"}
+    
+    if text_indices:
+        texts = [request.items[i].text for i in text_indices]
+        if mood_detector:
+            detected = mood_detector.detect_moods_from_texts(texts)
+        else:
+            detected = [("Calm", "Neutral")] * len(texts)
+        resolved.update(zip(text_indices, detected))
+    
+    order = sorted(resolved)
+    
+    if not vector_engine:
+        # Fallback to enhanced meal suggester, which is cheap enough to run per item
+        for i in order:
+            item = request.items[i]
+            mood1, mood2 = resolved[i]
+            result = meal_suggester.suggest_meal(mood1, mood2, item.user_id)
+            results[i] = {"user_id": item.user_id, **result}
+        return results
+    
+    queries = []
+    for i in order:
+        item = request.items[i]
+        mood1, mood2 = resolved[i]
+        mood_text = item.text if item.text else f"feeling {mood1.lower()} and {mood2.lower()}"
+        queries.append({
+            "mood_text": mood_text,
+            "mood1": mood1,
+            "mood2": mood2,
+            "user_preferences": mood_detector.get_user_preferences(item.user_id) if mood_detector else {}
+        })
+    
+    # One encode + one FAISS search for the whole batch; explanations only for final picks
+    batch_recommendations = vector_engine.recommend_meals_batch(
+        queries, k=1, include_explanation=request.include_explanation, deadline=deadline
+    )
+    
+    # One buffered write for the whole batch when the store batches writes
+    with state_store.batch():
+        for i, recommendations in zip(order, batch_recommendations):
+            item = request.items[i]
+            mood1, mood2 = resolved[i]
             if not recommendations:
-                raise HTTPException(status_code=404, detail="No suitable meals found")
+                results[i] = {"user_id": item.user_id, "mood_detected": [mood1, mood2], "error": "No suitable meals found"}
+                continue
             
             meal = recommendations[0]
-            
-            # Generate enhanced explanation
-            explanation = meal.get('explanation', f"Based on your voice analysis, {meal['meal_name']} is perfect for your current {mood1.lower()} and {mood2.lower()} state.")
-            
-            # Convert explanation to speech
-            explanation_audio = None
-            try:
-                audio_bytes = convert_text_to_speech(explanation)
-                if audio_bytes:
-                    explanation_audio = base64.b64encode(audio_bytes).decode('utf-8')
-            except Exception as e:
-                logger.warning(f"Could not generate audio response: {e}")
-            
-            # Update last meal time
-            user_last_meal[user_id] = datetime.now()
-            
-            response = {
+            record_meal(item.user_id)
+            results[i] = {
+                "user_id": item.user_id,
                 "meal": meal["meal_name"],
                 "mood_detected": [mood1, mood2],
-                "transcribed_text": transcribed_text,
                 "reason": meal["reason"],
                 "benefit": meal["benefit"],
                 "calories": meal.get("calories", "N/A"),
                 "cultural_theme": meal.get("cultural_theme", "Mixed"),
                 "dietary_theme": meal.get("dietary_theme", "General"),
                 "similarity_score": meal.get("similarity_score", 0.0),
-                "explanation": explanation,
-                "confidence": "High" if meal.get("similarity_score", 0) > 0.7 else "Medium"
+                "explanation": meal.get("explanation"),
+                "confidence": "High" if meal.get("similarity_score", 0) > 0.8 else "Medium"
             }
-            
-            if explanation_audio:
-                response["explanation_audio"] = explanation_audio
-            
-            return response
-            
-        finally:
-            # Clean up temporary file
-            os.unlink(temp_audio_path)
-            
+    
+    return results
+
+@app.post("/suggest-meal-batch")
+async def suggest_meal_batch(request: BatchSuggestionRequest, x_latency_budget_ms: Optional[int] = Header(None),
+                             accept: Optional[str] = Header(None)):
+    """Get meal suggestions for many users in one request (results are returned in input order)
+
+    Internal clients may send ``Accept: application/msgpack`` to get msgpack instead of JSON.
+    """
+    try:
+        deadline = request_deadline(request.latency_budget_ms, x_latency_budget_ms)
+        
+        if len(request.items) > MAX_BATCH_ITEMS:
+            raise HTTPException(
+                status_code=413,
+                detail=f"Batch too large: {len(request.items)} items (max {MAX_BATCH_ITEMS})"
+            )
+        
+        if not vector_engine and not meal_suggester:
+            raise HTTPException(status_code=503, detail="Meal suggestion service not available")
+        
+        results = await run_in_threadpool(build_batch_suggestions, request, deadline)
+        
+        return negotiated_response({
+            "count": len(results),
+            "results": results
+        }, accept)
+        
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Error in audio mood analysis: {e}")
+        logger.error(f"Error in batch suggestion: {e}")
         raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
 
 @app.post("/set-preferences")
-async def set_preferences(request: PreferencesRequest):
+async def set_preferences(request: PreferencesRequest, background_tasks: BackgroundTasks):
     """Set user dietary and cultural preferences"""
     try:
         if mood_detector:
@@ -413,6 +788,12 @@ async def set_preferences(request: PreferencesRequest):
             meal_suggester.set_dietary_restrictions(request.user_id, request.dietary_restrictions)
             meal_suggester.set_cultural_preferences(request.user_id, request.cultural_preferences)
         
+        if reminder_suggestions:
+            background_tasks.add_task(reminder_suggestions.update_preferences, {
+                'dietary_restrictions': request.dietary_restrictions,
+                'cultural_preferences': request.cultural_preferences
+            })
+        
         return {
             "message": "Preferences updated successfully",
             "user_id": request.user_id,
@@ -425,7 +806,7 @@ async def set_preferences(request: PreferencesRequest):
         raise HTTPException(status_code=500, detail=f"Could not update preferences: {str(e)}")
 
 @app.post("/rate-meal")
-async def rate_meal(request: RatingRequest):
+async def rate_meal(request: RatingRequest, background_tasks: BackgroundTasks):
     """Rate a meal suggestion for learning"""
     try:
         mood_combo = tuple(request.mood_combo)
@@ -445,7 +826,13 @@ async def rate_meal(request: RatingRequest):
         # Update vector engine with feedback
         if vector_engine:
             mood_context = f"feeling {mood_combo[0].lower()} and {mood_combo[1].lower()}"
-            vector_engine.update_meal_feedback(request.meal_name, request.rating, mood_context)
+            # Re-encodes the meal: keep it off the event loop
+            await run_in_threadpool(vector_engine.update_meal_feedback, request.meal_name, request.rating,
+                                    mood_context)
+            
+            # Embeddings changed: recompute reminder suggestions off the request path
+            if reminder_suggestions and reminder_suggestions.is_stale():
+                background_tasks.add_task(reminder_suggestions.refresh)
         
         return {
             "message": "Rating recorded successfully",
@@ -484,7 +871,7 @@ async def get_similar_meals(meal_name: str, limit: int = 5):
         
         similar_meals = vector_engine.get_similar_meals(meal_name, k=limit)
         
-        return {
+        return FastJSONResponse({
             "meal_name": meal_name,
             "similar_meals": [
                 {
@@ -495,7 +882,7 @@ async def get_similar_meals(meal_name: str, limit: int = 5):
                 }
                 for meal in similar_meals
             ]
-        }
+        })
         
     except HTTPException:
         raise
@@ -504,28 +891,26 @@ async def get_similar_meals(meal_name: str, limit: int = 5):
         raise HTTPException(status_code=500, detail=f"Could not find similar meals: {str(e)}")
 
 @app.get("/check-reminders/{user_id}")
-async def check_reminders(user_id: str):
+async def check_reminders(user_id: str, background_tasks: BackgroundTasks):
     """Check if user needs meal reminders"""
     try:
         current_time = datetime.now()
         
         # Check last meal time
-        if user_id in user_last_meal:
-            last_meal_time = user_last_meal[user_id]
+        last_meal = user_last_meal.get(user_id)
+        if last_meal:
+            last_meal_time = datetime.fromisoformat(last_meal)
             time_since_meal = current_time - last_meal_time
             
             if time_since_meal > timedelta(hours=3):
-                # Generate a gentle reminder with meal suggestion
-                if vector_engine:
-                    # Suggest a comfort meal for reminder
-                    recommendations = vector_engine.recommend_meals(
-                        mood_text="need nourishment and energy",
-                        mood1="Tired",
-                        mood2="Hungry",
-                        k=1
-                    )
+                # Generate a gentle reminder with a precomputed meal suggestion
+                if reminder_suggestions:
+                    user_prefs = mood_detector.get_user_preferences(user_id) if mood_detector else {}
+                    meal = reminder_suggestions.lookup(user_prefs)
+                    if reminder_suggestions.is_stale():
+                        background_tasks.add_task(reminder_suggestions.refresh)
                     
-                    suggested_meal = recommendations[0]["meal_name"] if recommendations else "a nutritious meal"
+                    suggested_meal = meal["meal_name"] if meal else "a nutritious meal"
                 else:
                     suggested_meal = "a healthy meal"
                 
@@ -547,6 +932,20 @@ async def check_reminders(user_id: str):
         logger.error(f"Error checking reminders: {e}")
         return {"needs_reminder": False, "error": str(e)}
 
+@app.get("/reminders/stream")
+async def reminder_stream(user_id: str, last_event_id: Optional[str] = Header(None)):
+    """Server-Sent Events stream of meal reminders for one user"""
+    try:
+        resume_from = int(last_event_id) if last_event_id else None
+    except ValueError:
+        resume_from = None
+    
+    return StreamingResponse(
+        reminder_broadcaster.stream(user_id, resume_from),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
 @app.get("/stats")
 async def get_stats():
     """Get system statistics and health"""
@@ -560,23 +959,34 @@ async def get_stats():
                 "meal_suggester": meal_suggester is not None
             },
             "active_users": len(user_last_meal),
-            "total_reminders_sent": len(meal_reminders)
+            "total_reminders_sent": len(meal_reminders),
+            "pending_reminders": reminder_scheduler.pending(),
+            "reminder_stream_connections": reminder_broadcaster.connection_count(),
+            "admission": admission.status(),
+            "stage_timings": stage_timings.snapshot(),
+            "audio_feature_pool": feature_pool.status(),
+            "memory": {
+                "rss_mb": to_mb(rss_bytes()),
+                "models": registry.memory_status()
+            }
         }
         
         # Add vector engine stats if available
         if vector_engine:
             vector_stats = vector_engine.get_stats()
             stats["vector_engine_stats"] = vector_stats
+            stats["memory"]["faiss_index_mb"] = to_mb(weights_bytes(vector_engine.faiss_index))
+            stats["memory"]["meal_embeddings_mb"] = to_mb(weights_bytes(vector_engine.meal_embeddings))
         
-        return stats
+        return FastJSONResponse(stats)
         
     except Exception as e:
         logger.error(f"Error getting stats: {e}")
-        return {"system_status": "error", "error": str(e)}
+        return FastJSONResponse({"system_status": "error", "error": str(e)})
 
 @app.get("/health")
 async def health_check():
-    """Health check endpoint"""
+    """Liveness check endpoint (does not wait for models)"""
     return {
         "status": "healthy",
         "timestamp": datetime.now().isoformat(),
@@ -588,23 +998,25 @@ async def health_check():
         }
     }
 
-# Background task for periodic reminders (in production, use Celery or similar)
-@app.on_event("startup")
-async def startup_event():
-    """Initialize background tasks"""
-    logger.info("🚀 AI Mood Meal Assistant API started successfully!")
-    logger.info("Available endpoints:")
-    logger.info("  - POST /agentic-meal-suggestion")
-    logger.info("  - POST /suggest-meal-from-text")
-    logger.info("  - POST /suggest-meal-from-moods")
-    logger.info("  - POST /suggest-meal-from-audio")
-    logger.info("  - POST /set-preferences")
-    logger.info("  - POST /rate-meal")
-    logger.info("  - GET /mood-suggestions")
-    logger.info("  - GET /similar-meals/{meal_name}")
-    logger.info("  - GET /check-reminders/{user_id}")
-    logger.info("  - GET /stats")
-    logger.info("  - GET /health")
+@app.get("/ready")
+async def readiness_check():
+    """Readiness check: per-model load state, 503 until required models are ready"""
+    ready = components_loaded and registry.is_ready()
+    return JSONResponse(
+        status_code=200 if ready else 503,
+        content={
+            "ready": ready,
+            "timestamp": datetime.now().isoformat(),
+            "components_loaded": components_loaded,
+            "models": registry.status(),
+            "components": {
+                "vector_engine": vector_engine is not None,
+                "mood_detector": mood_detector is not None,
+                "meal_suggester": meal_suggester is not None,
+                "agentic_core": agentic_core_instance is not None
+            }
+        }
+    )
 
 if __name__ == "__main__":
     uvicorn.run(
@@ -1,17 +1,22 @@
 import json
 import numpy as np
-from typing import Dict, List, Tuple, Optional
+from typing import Callable, Dict, List, Tuple, Optional
 from datetime import datetime
 import pickle
 import os
 from sklearn.feature_extraction.text import TfidfVectorizer
 from sklearn.metrics.pairwise import cosine_similarity
 
+from state_store import StateStore, get_default_store
+
 class EnhancedMealSuggester:
-    def __init__(self, meal_data_path: str = "meal.json"):
+    def __init__(self, meal_data_path: str = "meal.json", store: StateStore = None):
         self.meal_data = self.load_meal_data(meal_data_path)
+        # Preferences are shared with EnhancedMoodDetector through the state store
+        self.store = store or get_default_store()
+        self.user_preferences = self.store.namespace("preferences")
         self.preferences_file = "user_preferences.pkl"
-        self.user_preferences = self.load_preferences()
+        self.load_preferences()
         
         # Comprehensive mood categories with similarity mappings
         self.mood_mappings = {
@@ -95,23 +100,28 @@ class EnhancedMealSuggester:
         self._build_mood_vectors()
     
     def load_meal_data(self, filepath: str) -> List[Dict]:
-        """Load meal data from JSON file"""
+        """Load meal data from a JSON (or JSON Lines) file"""
         try:
             with open(filepath, 'r', encoding='utf-8') as f:
+                if filepath.endswith('.jsonl'):
+                    return [json.loads(line) for line in f if line.strip()]
                 return json.load(f)
         except Exception as e:
             print(f"Error loading meal data: {e}")
             return []
     
     def load_preferences(self) -> Dict:
-        """Load user preferences from file"""
+        """Import preferences from the legacy pickle file into the state store (once)"""
         try:
-            if os.path.exists(self.preferences_file):
+            if len(self.user_preferences) == 0 and os.path.exists(self.preferences_file):
                 with open(self.preferences_file, 'rb') as f:
-                    return pickle.load(f)
+                    legacy = pickle.load(f)
+                with self.store.batch():
+                    for user_id, prefs in legacy.items():
+                        self.user_preferences[user_id] = prefs
         except Exception as e:
             print(f"Error loading preferences: {e}")
-        return {}
+        return self.user_preferences
     
     def _build_mood_vectors(self):
         """Build TF-IDF vectors for mood similarity matching"""
@@ -267,76 +277,59 @@ class EnhancedMealSuggester:
         
         return suggestions
     
-    def update_user_preference(self, user_id: str, mood_combo: Tuple[str, str], 
-                             meal_name: str, rating: int):
-        """Update user preferences based on meal rating"""
-        if user_id not in self.user_preferences:
-            self.user_preferences[user_id] = {
+    def _update_preferences(self, user_id: str, change: Callable[[Dict], None]):
+        """Apply change to the user's preferences (created with defaults if missing) as one atomic update"""
+        def apply(prefs: Optional[Dict]) -> Dict:
+            prefs = prefs or {
                 'meal_ratings': {},
                 'mood_preferences': {},
                 'dietary_restrictions': [],
-                'cultural_preferences': [],
-                'last_updated': datetime.now().isoformat()
+                'cultural_preferences': []
             }
+            change(prefs)
+            prefs['last_updated'] = datetime.now().isoformat()
+            return prefs
         
-        # Store meal rating
+        try:
+            self.user_preferences.update(user_id, apply)
+        except Exception as e:
+            print(f"Error saving preferences: {e}")
+    
+    def update_user_preference(self, user_id: str, mood_combo: Tuple[str, str], 
+                             meal_name: str, rating: int):
+        """Update user preferences based on meal rating"""
         mood_key = f"{mood_combo[0]}_{mood_combo[1]}"
-        if mood_key not in self.user_preferences[user_id]['meal_ratings']:
-            self.user_preferences[user_id]['meal_ratings'][mood_key] = {}
-        
-        self.user_preferences[user_id]['meal_ratings'][mood_key][meal_name] = {
-            'rating': rating,
-            'timestamp': datetime.now().isoformat()
-        }
         
-        # Update mood preferences for highly rated meals
-        if mood_key not in self.user_preferences[user_id]['mood_preferences']:
-            self.user_preferences[user_id]['mood_preferences'][mood_key] = []
-        
-        if rating >= 4:  # Good rating
-            if meal_name not in self.user_preferences[user_id]['mood_preferences'][mood_key]:
-                self.user_preferences[user_id]['mood_preferences'][mood_key].append(meal_name)
-        elif rating <= 2:  # Poor rating
-            if meal_name in self.user_preferences[user_id]['mood_preferences'][mood_key]:
-                self.user_preferences[user_id]['mood_preferences'][mood_key].remove(meal_name)
+        def record_rating(prefs: Dict):
+            # Store meal rating
+            prefs['meal_ratings'].setdefault(mood_key, {})[meal_name] = {
+                'rating': rating,
+                'timestamp': datetime.now().isoformat()
+            }
+            
+            # Update mood preferences for highly rated meals
+            liked_meals = prefs['mood_preferences'].setdefault(mood_key, [])
+            if rating >= 4:  # Good rating
+                if meal_name not in liked_meals:
+                    liked_meals.append(meal_name)
+            elif rating <= 2:  # Poor rating
+                if meal_name in liked_meals:
+                    liked_meals.remove(meal_name)
         
-        self.user_preferences[user_id]['last_updated'] = datetime.now().isoformat()
-        self.save_preferences()
+        self._update_preferences(user_id, record_rating)
     
-    def save_preferences(self):
-        """Save user preferences to file"""
+    def save_preferences(self, user_id: str, prefs: Dict):
+        """Save one user's preferences to the state store"""
         try:
-            with open(self.preferences_file, 'wb') as f:
-                pickle.dump(self.user_preferences, f)
+            prefs['last_updated'] = datetime.now().isoformat()
+            self.user_preferences[user_id] = prefs
         except Exception as e:
             print(f"Error saving preferences: {e}")
     
     def set_dietary_restrictions(self, user_id: str, restrictions: List[str]):
         """Set dietary restrictions for user"""
-        if user_id not in self.user_preferences:
-            self.user_preferences[user_id] = {
-                'meal_ratings': {},
-                'mood_preferences': {},
-                'dietary_restrictions': [],
-                'cultural_preferences': [],
-                'last_updated': datetime.now().isoformat()
-            }
-        
-        self.user_preferences[user_id]['dietary_restrictions'] = restrictions
-        self.user_preferences[user_id]['last_updated'] = datetime.now().isoformat()
-        self.save_preferences()
+        self._update_preferences(user_id, lambda prefs: prefs.update(dietary_restrictions=restrictions))
     
     def set_cultural_preferences(self, user_id: str, preferences: List[str]):
         """Set cultural food preferences for user"""
-        if user_id not in self.user_preferences:
-            self.user_preferences[user_id] = {
-                'meal_ratings': {},
-                'mood_preferences': {},
-                'dietary_restrictions': [],
-                'cultural_preferences': [],
-                'last_updated': datetime.now().isoformat()
-            }
-        
-        self.user_preferences[user_id]['cultural_preferences'] = preferences
-        self.user_preferences[user_id]['last_updated'] = datetime.now().isoformat()
-        self.save_preferences()
+        self._update_preferences(user_id, lambda prefs: prefs.update(cultural_preferences=preferences))
@@ -1,29 +1,28 @@
 import numpy as np
-import librosa
-from transformers import pipeline, Wav2Vec2Processor, Wav2Vec2ForSequenceClassification
-import torch
 import pickle
 import os
 from datetime import datetime
-from typing import Tuple, Dict, List
+from typing import Callable, Tuple, Dict, List, Optional
+
+from audio_io import AudioClip, TARGET_SAMPLE_RATE, iter_audio_blocks
+from audio_features import extract_mood_features, resolve_profile, stream_mood_feature_vector
+from audio_feature_pool import AudioFeaturePool, FeaturePoolUnavailable
+from model_registry import registry
+from state_store import StateStore, get_default_store
+from deadline import stage_timings
 
 class EnhancedMoodDetector:
-    def __init__(self):
-        # Load emotion detection models
-        self.text_classifier = pipeline(
-            "text-classification", 
-            model="j-hartmann/emotion-english-distilroberta-base", 
-            return_all_scores=True
-        )
+    def __init__(self, store: StateStore = None, feature_pool: Optional[AudioFeaturePool] = None):
+        # Emotion detection models are shared process-wide through the model registry
+        self.text_classifier = registry.get("emotion_classifier")
+        
+        # Acoustic features run in this thread unless a process pool is given (and still enabled)
+        self.feature_pool = feature_pool
         
         # Load audio emotion detection model
         try:
-            self.audio_processor = Wav2Vec2Processor.from_pretrained("facebook/wav2vec2-base")
-            self.audio_model = Wav2Vec2ForSequenceClassification.from_pretrained(
-                "facebook/wav2vec2-base", 
-                num_labels=7  # 7 basic emotions
-            )
-        except:
+            self.audio_processor, self.audio_model = registry.get("wav2vec2")
+        except Exception:
             print("Audio emotion model not available, using text-only detection")
             self.audio_processor = None
             self.audio_model = None
@@ -46,40 +45,30 @@ class EnhancedMoodDetector:
             'calm': 'Calm'
         }
         
-        # Load user preferences
+        # User preferences live in the shared state store (one record per user)
+        self.store = store or get_default_store()
+        self.user_preferences = self.store.namespace("preferences")
         self.preferences_file = "user_preferences.pkl"
-        self.user_preferences = self.load_preferences()
+        self.load_preferences()
     
-    def extract_audio_features(self, audio_path: str) -> np.ndarray:
-        """Extract audio features for emotion detection"""
+    def extract_audio_features(self, audio, profile: Optional[str] = None) -> np.ndarray:
+        """Extract audio features for emotion detection (AudioClip, bytes, file-like or path)"""
         try:
-            # Load audio file
-            audio, sr = librosa.load(audio_path, sr=16000)
-            
-            # Extract features
-            features = {}
-            
-            # Spectral features
-            features['mfcc'] = np.mean(librosa.feature.mfcc(y=audio, sr=sr, n_mfcc=13), axis=1)
-            features['spectral_centroid'] = np.mean(librosa.feature.spectral_centroid(y=audio, sr=sr))
-            features['spectral_rolloff'] = np.mean(librosa.feature.spectral_rolloff(y=audio, sr=sr))
-            features['zero_crossing_rate'] = np.mean(librosa.feature.zero_crossing_rate(audio))
-            
-            # Pitch and energy
-            pitches, magnitudes = librosa.piptrack(y=audio, sr=sr)
-            features['pitch_mean'] = np.mean(pitches[pitches > 0]) if len(pitches[pitches > 0]) > 0 else 0
-            features['energy'] = np.mean(librosa.feature.rms(y=audio))
-            
-            # Tempo
-            tempo, _ = librosa.beat.beat_track(y=audio, sr=sr)
-            features['tempo'] = tempo
-            
-            return np.concatenate([
-                features['mfcc'],
-                [features['spectral_centroid'], features['spectral_rolloff'], 
-                 features['zero_crossing_rate'], features['pitch_mean'], 
-                 features['energy'], features['tempo']]
-            ])
+            # Raw upload: decode and summarize it block by block, memory independent of duration
+            if not isinstance(audio, AudioClip) and resolve_profile(profile) == "full":
+                return stream_mood_feature_vector(iter_audio_blocks(audio), TARGET_SAMPLE_RATE)
+            
+            # Shared 16 kHz mono buffer (clips past STREAMING_MIN_SECONDS are streamed too)
+            clip = AudioClip.from_source(audio)
+            audio, sr = clip.samples, clip.sample_rate
+            
+            # "full": one STFT/mel spectrogram shared by every feature; "fast": cheap pitch/tempo estimators
+            if self.feature_pool is not None and self.feature_pool.enabled:
+                try:  # in a worker process, off this process's GIL
+                    return self.feature_pool.mood_features(audio, sr, profile)
+                except FeaturePoolUnavailable:
+                    pass  # the pool failed to start: extract in this thread
+            return extract_mood_features(audio, sr, profile)
             
         except Exception as e:
             print(f"Error extracting audio features: {e}")
@@ -126,93 +115,131 @@ class EnhancedMoodDetector:
             print(f"Error in audio mood detection: {e}")
             return "Calm", "Neutral"
     
+    def map_emotion_scores(self, results: List[Dict]) -> Tuple[str, str]:
+        """Map the top two classifier emotions to our mood categories"""
+        sorted_results = sorted(results, key=lambda x: x['score'], reverse=True)
+        
+        primary = self.emotion_mapping.get(sorted_results[0]['label'].lower(), sorted_results[0]['label'])
+        secondary = self.emotion_mapping.get(sorted_results[1]['label'].lower(), sorted_results[1]['label'])
+        
+        return primary, secondary
+    
     def detect_mood_from_text(self, text: str) -> Tuple[str, str]:
         """Enhanced text-based mood detection"""
         try:
             results = self.text_classifier(text)[0]
-            sorted_results = sorted(results, key=lambda x: x['score'], reverse=True)
-            
-            # Map emotions to our mood categories
-            primary = self.emotion_mapping.get(sorted_results[0]['label'].lower(), sorted_results[0]['label'])
-            secondary = self.emotion_mapping.get(sorted_results[1]['label'].lower(), sorted_results[1]['label'])
-            
-            return primary, secondary
+            return self.map_emotion_scores(results)
             
         except Exception as e:
             print(f"Error in text mood detection: {e}")
             return "Calm", "Neutral"
     
-    def detect_mood_from_audio(self, audio_path: str, transcribed_text: str = None) -> Tuple[str, str]:
-        """Combined audio and text mood detection"""
+    def detect_moods_from_texts(self, texts: List[str], batch_size: int = 32) -> List[Tuple[str, str]]:
+        """Batched text mood detection using a single classifier call"""
+        if not texts:
+            return []
+        
+        try:
+            batch_results = self.text_classifier(texts, batch_size=batch_size)
+            return [self.map_emotion_scores(results) for results in batch_results]
+            
+        except Exception as e:
+            print(f"Error in batched text mood detection: {e}")
+            return [("Calm", "Neutral")] * len(texts)
+    
+    def detect_mood_from_audio(self, audio, transcribed_text: str = None,
+                               use_audio_features: bool = True, profile: Optional[str] = None) -> Tuple[str, str]:
+        """Combined audio and text mood detection (text-only when use_audio_features is False)"""
         try:
+            has_text = transcribed_text and len(transcribed_text.strip()) > 0
+            if has_text and not use_audio_features:
+                with stage_timings.measure("text_mood"):
+                    return self.detect_mood_from_text(transcribed_text)
+            
             # Extract audio features
-            audio_features = self.extract_audio_features(audio_path)
-            audio_mood1, audio_mood2 = self.detect_mood_from_audio_features(audio_features)
+            with stage_timings.measure("audio_features"):
+                audio_features = self.extract_audio_features(audio, profile)
+            audio_moods = self.detect_mood_from_audio_features(audio_features)
             
             # If we have transcribed text, combine with text analysis
-            if transcribed_text and len(transcribed_text.strip()) > 0:
-                text_mood1, text_mood2 = self.detect_mood_from_text(transcribed_text)
-                
-                # Combine audio and text moods (prioritize text for primary, audio for secondary)
-                return text_mood1, audio_mood2
+            text_moods = None
+            if has_text:
+                with stage_timings.measure("text_mood"):
+                    text_moods = self.detect_mood_from_text(transcribed_text)
             
-            return audio_mood1, audio_mood2
+            return self.combine_moods(text_moods, audio_moods)
             
         except Exception as e:
             print(f"Error in combined mood detection: {e}")
             return "Calm", "Neutral"
     
+    def combine_moods(self, text_moods: Optional[Tuple[str, str]],
+                      audio_moods: Optional[Tuple[str, str]]) -> Tuple[str, str]:
+        """Fuse text and audio moods (text for primary, audio for secondary)"""
+        if text_moods and audio_moods:
+            return text_moods[0], audio_moods[1]
+        return text_moods or audio_moods or ("Calm", "Neutral")
+    
     def load_preferences(self) -> Dict:
-        """Load user preferences from file"""
+        """Import preferences from the legacy pickle file into the state store (once)"""
         try:
-            if os.path.exists(self.preferences_file):
+            if len(self.user_preferences) == 0 and os.path.exists(self.preferences_file):
                 with open(self.preferences_file, 'rb') as f:
-                    return pickle.load(f)
+                    legacy = pickle.load(f)
+                with self.store.batch():
+                    for user_id, prefs in legacy.items():
+                        self.user_preferences[user_id] = prefs
+                print(f"Migrated preferences for {len(legacy)} users from {self.preferences_file}")
         except Exception as e:
             print(f"Error loading preferences: {e}")
         
-        return {}
+        return self.user_preferences
     
-    def save_preferences(self):
-        """Save user preferences to file"""
+    def save_preferences(self, user_id: str, prefs: Dict):
+        """Save one user's preferences to the state store"""
         try:
-            with open(self.preferences_file, 'wb') as f:
-                pickle.dump(self.user_preferences, f)
+            prefs['last_updated'] = datetime.now().isoformat()
+            self.user_preferences[user_id] = prefs
         except Exception as e:
             print(f"Error saving preferences: {e}")
     
-    def update_user_preference(self, user_id: str, mood_combo: Tuple[str, str], 
-                             meal_name: str, rating: int):
-        """Update user preferences based on meal rating"""
-        if user_id not in self.user_preferences:
-            self.user_preferences[user_id] = {
+    def _update_preferences(self, user_id: str, change: Callable[[Dict], None]):
+        """Apply change to the user's preferences (created with defaults if missing) as one atomic update"""
+        def apply(prefs: Optional[Dict]) -> Dict:
+            prefs = prefs or {
                 'meal_ratings': {},
                 'mood_preferences': {},
                 'dietary_restrictions': [],
-                'cultural_preferences': [],
-                'last_updated': datetime.now().isoformat()
+                'cultural_preferences': []
             }
+            change(prefs)
+            prefs['last_updated'] = datetime.now().isoformat()
+            return prefs
         
-        # Store meal rating
+        try:
+            self.user_preferences.update(user_id, apply)
+        except Exception as e:
+            print(f"Error saving preferences: {e}")
+    
+    def update_user_preference(self, user_id: str, mood_combo: Tuple[str, str], 
+                             meal_name: str, rating: int):
+        """Update user preferences based on meal rating"""
         mood_key = f"{mood_combo[0]}_{mood_combo[1]}"
-        if mood_key not in self.user_preferences[user_id]['meal_ratings']:
-            self.user_preferences[user_id]['meal_ratings'][mood_key] = {}
-        
-        self.user_preferences[user_id]['meal_ratings'][mood_key][meal_name] = {
-            'rating': rating,
-            'timestamp': datetime.now().isoformat()
-        }
         
-        # Update mood preferences
-        if mood_key not in self.user_preferences[user_id]['mood_preferences']:
-            self.user_preferences[user_id]['mood_preferences'][mood_key] = []
-        
-        if rating >= 4:  # Good rating
-            if meal_name not in self.user_preferences[user_id]['mood_preferences'][mood_key]:
-                self.user_preferences[user_id]['mood_preferences'][mood_key].append(meal_name)
+        def record_rating(prefs: Dict):
+            # Store meal rating
+            prefs['meal_ratings'].setdefault(mood_key, {})[meal_name] = {
+                'rating': rating,
+                'timestamp': datetime.now().isoformat()
+            }
+            
+            # Update mood preferences
+            liked_meals = prefs['mood_preferences'].setdefault(mood_key, [])
+            if rating >= 4:  # Good rating
+                if meal_name not in liked_meals:
+                    liked_meals.append(meal_name)
         
-        self.user_preferences[user_id]['last_updated'] = datetime.now().isoformat()
-        self.save_preferences()
+        self._update_preferences(user_id, record_rating)
     
     def get_user_preferences(self, user_id: str) -> Dict:
         """Get user preferences"""
@@ -220,30 +247,8 @@ class EnhancedMoodDetector:
     
     def set_dietary_restrictions(self, user_id: str, restrictions: List[str]):
         """Set dietary restrictions for user"""
-        if user_id not in self.user_preferences:
-            self.user_preferences[user_id] = {
-                'meal_ratings': {},
-                'mood_preferences': {},
-                'dietary_restrictions': [],
-                'cultural_preferences': [],
-                'last_updated': datetime.now().isoformat()
-            }
-        
-        self.user_preferences[user_id]['dietary_restrictions'] = restrictions
-        self.user_preferences[user_id]['last_updated'] = datetime.now().isoformat()
-        self.save_preferences()
+        self._update_preferences(user_id, lambda prefs: prefs.update(dietary_restrictions=restrictions))
     
     def set_cultural_preferences(self, user_id: str, preferences: List[str]):
         """Set cultural food preferences for user"""
-        if user_id not in self.user_preferences:
-            self.user_preferences[user_id] = {
-                'meal_ratings': {},
-                'mood_preferences': {},
-                'dietary_restrictions': [],
-                'cultural_preferences': [],
-                'last_updated': datetime.now().isoformat()
-            }
-        
-        self.user_preferences[user_id]['cultural_preferences'] = preferences
-        self.user_preferences[user_id]['last_updated'] = datetime.now().isoformat()
-        self.save_preferences()
+        self._update_preferences(user_id, lambda prefs: prefs.update(cultural_preferences=preferences))
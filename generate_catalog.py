@@ -0,0 +1,130 @@
+"""
+Synthetic meal catalog generator for scale testing.
+
+Produces meal.json-compatible catalogs of any size by sampling from the shipped
+meal.json: ``mood_1``/``mood_2`` pairs follow their joint frequencies,
+``cultural_theme``/``dietary_theme`` follow their joint frequencies, and
+calories follow the real distribution for the chosen dietary theme (with
+small jitter). ``reason``/``benefit`` come from a real meal with the same mood
+pair, and every ``meal_name`` is unique. Rows are written as they are
+generated, so memory stays flat even for 10M rows.
+
+    python generate_catalog.py 100000 -o meal_100k.json
+    python generate_catalog.py 10000000 -o meal_10m.jsonl --format jsonl
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import time
+from bisect import bisect
+from collections import Counter, defaultdict
+from itertools import accumulate
+from typing import Dict, Iterator, List, Optional, Tuple
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+
+NAME_MODIFIERS = [
+    "Classic", "Spiced", "Herbed", "Roasted", "Smoky", "Zesty", "Hearty", "Light",
+    "Rustic", "Golden", "Garden", "Slow-Cooked", "Crispy", "Creamy", "Tangy", "Homestyle"
+]
+
+
+class WeightedSampler:
+    """Draws values with probability proportional to their counts"""
+
+    def __init__(self, counts: Counter):
+        self.values = list(counts)
+        self.cumulative = list(accumulate(counts[value] for value in self.values))
+
+    def sample(self, rng: random.Random):
+        return self.values[bisect(self.cumulative, rng.random() * self.cumulative[-1])]
+
+
+class CatalogModel:
+    """Empirical distributions learned from a real catalog"""
+
+    def __init__(self, meals: List[Dict]):
+        if not meals:
+            raise ValueError("Source catalog is empty")
+        self.mood_pairs = WeightedSampler(Counter((m["mood_1"], m["mood_2"]) for m in meals))
+        self.themes = WeightedSampler(Counter((m["cultural_theme"], m["dietary_theme"]) for m in meals))
+
+        self.calories: Dict[str, List[int]] = defaultdict(list)
+        self.texts: Dict[Tuple[str, str], List[Tuple[str, str]]] = defaultdict(list)
+        self.names: Dict[str, List[str]] = defaultdict(list)
+        for meal in meals:
+            self.calories[meal["dietary_theme"]].append(meal["calories"])
+            self.texts[(meal["mood_1"], meal["mood_2"])].append((meal["reason"], meal["benefit"]))
+            self.names[meal["cultural_theme"]].append(meal["meal_name"])
+
+    @classmethod
+    def from_file(cls, path: str) -> "CatalogModel":
+        with open(path, "r", encoding="utf-8") as f:
+            return cls(json.load(f))
+
+    def meal(self, rng: random.Random, index: int) -> Dict:
+        mood_1, mood_2 = self.mood_pairs.sample(rng)
+        cultural_theme, dietary_theme = self.themes.sample(rng)
+        reason, benefit = rng.choice(self.texts[(mood_1, mood_2)])
+        calories = rng.choice(self.calories[dietary_theme]) * rng.uniform(0.9, 1.1)
+        return {
+            "mood_1": mood_1,
+            "mood_2": mood_2,
+            "meal_name": f"{rng.choice(NAME_MODIFIERS)} {rng.choice(self.names[cultural_theme])} No. {index}",
+            "calories": int(round(calories / 10) * 10),
+            "benefit": benefit,
+            "reason": reason,
+            "cultural_theme": cultural_theme,
+            "dietary_theme": dietary_theme
+        }
+
+
+def generate_meals(count: int, seed: int = 42, source: Optional[str] = None) -> Iterator[Dict]:
+    """Yield count synthetic meals, one at a time"""
+    model = CatalogModel.from_file(source or os.path.join(ROOT, "meal.json"))
+    rng = random.Random(seed)
+    for index in range(1, count + 1):
+        yield model.meal(rng, index)
+
+
+def write_catalog(path: str, count: int, fmt: Optional[str] = None, seed: int = 42,
+                  source: Optional[str] = None) -> None:
+    """Stream a catalog to path ('-' for stdout) as a JSON array or JSONL"""
+    fmt = fmt or ("jsonl" if path.endswith(".jsonl") else "json")
+    out = sys.stdout if path == "-" else open(path, "w", encoding="utf-8")
+    try:
+        if fmt == "json":
+            out.write("[\n")
+        for i, meal in enumerate(generate_meals(count, seed, source)):
+            line = json.dumps(meal, ensure_ascii=False)
+            if fmt == "json":
+                out.write(line if i == 0 else ",\n" + line)
+            else:
+                out.write(line + "\n")
+        if fmt == "json":
+            out.write("\n]\n")
+    finally:
+        if out is not sys.stdout:
+            out.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a synthetic meal.json-compatible catalog")
+    parser.add_argument("count", type=int, help="Number of meals to generate")
+    parser.add_argument("-o", "--output", default="-", help="Output file (default: stdout)")
+    parser.add_argument("--format", choices=["json", "jsonl"], default=None,
+                        help="Output format (default: from the file extension, else json)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--source", default=None, help="Catalog to learn distributions from (default: meal.json)")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    write_catalog(args.output, args.count, args.format, args.seed, args.source)
+    if args.output != "-":
+        print(f"✅ Wrote {args.count:,} meals to {args.output} in {time.perf_counter() - start:.1f}s", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
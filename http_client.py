@@ -0,0 +1,62 @@
+"""
+Shared HTTP client for the Streamlit frontends (enhanced_app.py and src/frontend).
+
+Streamlit reruns the whole script on every interaction, and calling
+``requests.get``/``requests.post`` directly opened a new TCP connection for
+every backend call. ``get_session`` returns one keep-alive ``requests.Session``
+per Streamlit server process (``st.cache_resource``), with a connection pool
+sized for concurrent sessions and retries for connection errors and 502/504
+on idempotent requests. ``submit`` / ``run_concurrently`` run independent calls
+in parallel on a small shared thread pool.
+"""
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, List
+
+import requests
+import streamlit as st
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+POOL_SIZE = 20
+MAX_CONCURRENT_CALLS = 8
+
+
+def create_session(pool_size: int = POOL_SIZE, retries: int = 2) -> requests.Session:
+    """Session with a keep-alive pool; POSTs are only retried when the connection failed"""
+    retry = Retry(
+        total=retries,
+        connect=retries,
+        read=0,
+        status=retries,
+        backoff_factor=0.3,
+        status_forcelist=(502, 504),
+        allowed_methods=frozenset(["GET", "HEAD", "OPTIONS"]),
+        raise_on_status=False
+    )
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=pool_size, max_retries=retry)
+    session = requests.Session()
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+@st.cache_resource
+def get_session() -> requests.Session:
+    """One pooled session per Streamlit server process, shared by all users and reruns"""
+    return create_session()
+
+
+@st.cache_resource
+def _get_executor() -> ThreadPoolExecutor:
+    return ThreadPoolExecutor(max_workers=MAX_CONCURRENT_CALLS, thread_name_prefix="frontend-http")
+
+
+def submit(fn: Callable, *args, **kwargs) -> Future:
+    """Start a backend call in the background; call .result() when it is needed"""
+    return _get_executor().submit(fn, *args, **kwargs)
+
+
+def run_concurrently(*calls: Callable[[], Any]) -> List[Any]:
+    """Run independent zero-argument calls in parallel; results come back in order"""
+    futures = [submit(call) for call in calls]
+    return [future.result() for future in futures]
@@ -0,0 +1,338 @@
+"""
+Local load generator for the FastAPI backends.
+
+Drives an open-loop mix of endpoints at a target request rate (arrivals do not
+wait for earlier responses, so a slow server shows up as growing latency and
+503s rather than as a politely lower rate) and reports throughput plus p50, p95
+and p99 latency per endpoint.
+
+Examples:
+    # Start enhanced_backend with offline model stubs and run a 60 s test at 20 RPS
+    python load_test.py --target enhanced --spawn --rps 20 --duration 60
+
+    # Against an already running server, custom mix, JSON report for later comparison
+    python load_test.py --url http://localhost:8000 --mix text=6,moods=2,audio=1,rate=1 --json report.json
+
+With ``--spawn`` the server runs with ``MEAL_MODEL_STUBS=1``: HuggingFace and
+OpenAI models are replaced by deterministic, latency-calibrated stand-ins
+(see model_stubs.py), so no network or model download is needed.
+"""
+import argparse
+import asyncio
+import io
+import json
+import math
+import os
+import random
+import subprocess
+import sys
+import time
+import wave
+from collections import Counter, defaultdict
+from typing import Callable, Dict, List, Optional
+
+import httpx
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+
+SAMPLE_TEXTS = [
+    "I feel tired after a long day at work",
+    "I'm stressed about my exams tomorrow",
+    "Feeling happy and full of energy today",
+    "I'm a bit sad and lonely tonight",
+    "So anxious I can't focus on anything",
+    "Relaxed and calm after a nice walk",
+    "I'm bored and want something exciting",
+    "Excited for the weekend with friends"
+]
+SAMPLE_MOODS = ["Happy", "Sad", "Tired", "Stressed", "Anxious", "Excited", "Calm", "Bored", "Energized", "Lonely"]
+SAMPLE_MEALS = ["Chicken Soup", "Vegetable Curry", "Greek Salad", "Pasta Carbonara", "Spicy Ramen"]
+
+
+def make_wav(seconds: float = 3.0, sample_rate: int = 16000, seed: int = 0) -> bytes:
+    """Small in-memory WAV clip (voiced-like tone plus noise)"""
+    rng = random.Random(seed)
+    frequency = rng.uniform(110, 220)
+    frames = bytearray()
+    for i in range(int(seconds * sample_rate)):
+        t = i / sample_rate
+        envelope = 0.5 + 0.5 * math.sin(2 * math.pi * 3 * t)
+        value = 0.3 * envelope * math.sin(2 * math.pi * frequency * t) + 0.02 * rng.uniform(-1, 1)
+        frames += int(max(-1.0, min(1.0, value)) * 32767).to_bytes(2, "little", signed=True)
+
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(sample_rate)
+        wav.writeframes(bytes(frames))
+    return buffer.getvalue()
+
+
+# --- Request builders: (rng, user_id, audio clips) -> httpx.request kwargs ---
+
+def _text(path: str) -> Callable:
+    return lambda rng, user, clips: {"method": "POST", "url": path,
+                                     "json": {"text": rng.choice(SAMPLE_TEXTS), "user_id": user}}
+
+
+def _moods(rng, user, clips):
+    mood1, mood2 = rng.sample(SAMPLE_MOODS, 2)
+    return {"method": "POST", "url": "/suggest-meal-from-moods",
+            "json": {"mood1": mood1, "mood2": mood2, "user_id": user}}
+
+
+def _audio(path: str) -> Callable:
+    return lambda rng, user, clips: {"method": "POST", "url": path, "params": {"user_id": user},
+                                     "files": {"audio": ("clip.wav", rng.choice(clips), "audio/wav")}}
+
+
+def _rate(rng, user, clips):
+    return {"method": "POST", "url": "/rate-meal",
+            "json": {"user_id": user, "mood_combo": rng.sample(SAMPLE_MOODS, 2),
+                     "meal_name": rng.choice(SAMPLE_MEALS), "rating": rng.randint(1, 5)}}
+
+
+def _mood_suggestions(rng, user, clips):
+    prefix = rng.choice(SAMPLE_MOODS)[:rng.randint(1, 3)].lower()
+    return {"method": "GET", "url": "/mood-suggestions", "params": {"partial_text": prefix, "limit": 10}}
+
+
+# Endpoint names accepted in --mix, per backend; missing names are not served by that backend
+TARGETS = {
+    "enhanced": {
+        "app": "enhanced_backend:app",
+        "cwd": ROOT,
+        "ready_path": "/ready",
+        "endpoints": {
+            "text": _text("/suggest-meal-from-text"),
+            "moods": _moods,
+            "audio": _audio("/suggest-meal-from-audio"),
+            "rate": _rate,
+            "suggest": _mood_suggestions
+        }
+    },
+    "simple": {
+        "app": "simple_backend:app",
+        "cwd": ROOT,
+        "ready_path": "/health",
+        "endpoints": {
+            "text": _text("/suggest-meal-from-text"),
+            "moods": _moods
+        }
+    },
+    "src": {
+        "app": "backend.main:app",
+        "cwd": os.path.join(ROOT, "src"),
+        "ready_path": "/ready",
+        "endpoints": {
+            "text": _text("/api/mood/text"),
+            "audio": _audio("/api/voice/analyze-voice")
+        }
+    }
+}
+
+DEFAULT_MIX = "text=50,moods=25,audio=5,rate=10,suggest=10"
+
+
+def parse_mix(spec: str, available: Dict[str, Callable]) -> Dict[str, float]:
+    """'text=50,moods=25' -> normalized weights for the endpoints the target serves"""
+    weights = {}
+    for part in spec.split(","):
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if name not in available:
+            print(f"⚠️ Skipping '{name}': not served by this backend")
+            continue
+        weights[name] = float(weight or 1)
+    total = sum(weights.values())
+    if total <= 0:
+        raise SystemExit("Mix has no endpoints this backend serves")
+    return {name: weight / total for name, weight in weights.items()}
+
+
+def percentile(sorted_values: List[float], q: float) -> Optional[float]:
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return None
+    rank = max(1, math.ceil(q / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+class Results:
+    def __init__(self):
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+        self.statuses: Dict[str, Counter] = defaultdict(Counter)
+        self.dropped = 0  # arrivals skipped because the client hit --max-in-flight
+
+    def record(self, endpoint: str, status: str, seconds: float) -> None:
+        self.statuses[endpoint][status] += 1
+        if status == "200":
+            self.latencies[endpoint].append(seconds)
+
+    def summary(self, elapsed: float) -> Dict:
+        endpoints = {}
+        for endpoint in sorted(self.statuses):
+            latencies = sorted(self.latencies[endpoint])
+            total = sum(self.statuses[endpoint].values())
+            endpoints[endpoint] = {
+                "requests": total,
+                "ok": len(latencies),
+                "errors": total - len(latencies),
+                "statuses": dict(self.statuses[endpoint]),
+                "throughput_rps": round(len(latencies) / elapsed, 2),
+                "p50_ms": _ms(percentile(latencies, 50)),
+                "p95_ms": _ms(percentile(latencies, 95)),
+                "p99_ms": _ms(percentile(latencies, 99)),
+                "max_ms": _ms(latencies[-1] if latencies else None)
+            }
+        ok = sum(e["ok"] for e in endpoints.values())
+        total = sum(e["requests"] for e in endpoints.values())
+        return {
+            "elapsed_s": round(elapsed, 2),
+            "requests": total,
+            "ok": ok,
+            "error_rate": round((total - ok) / total, 4) if total else 0.0,
+            "throughput_rps": round(ok / elapsed, 2),
+            "client_dropped": self.dropped,
+            "endpoints": endpoints
+        }
+
+
+def _ms(seconds: Optional[float]) -> Optional[float]:
+    return round(seconds * 1000, 1) if seconds is not None else None
+
+
+async def run_load(base_url: str, target: str, mix: Dict[str, float], rps: float, duration: float,
+                   warmup: float = 5.0, users: int = 100, max_in_flight: int = 500,
+                   timeout: float = 60.0, seed: int = 42) -> Dict:
+    """Open-loop load: Poisson arrivals at rps for warmup + duration seconds"""
+    builders = TARGETS[target]["endpoints"]
+    names, weights = list(mix), list(mix.values())
+    rng = random.Random(seed)
+    clips = [make_wav(seconds=rng.uniform(2, 5), seed=i) for i in range(4)] if "audio" in mix else []
+    results = Results()
+    in_flight = set()
+
+    limits = httpx.Limits(max_connections=max_in_flight, max_keepalive_connections=max_in_flight)
+    async with httpx.AsyncClient(base_url=base_url, timeout=timeout, limits=limits) as client:
+
+        async def fire(endpoint: str, request: Dict, measured: bool):
+            start = time.perf_counter()
+            try:
+                response = await client.request(**request)
+                status = str(response.status_code)
+            except httpx.TimeoutException:
+                status = "timeout"
+            except httpx.HTTPError as e:
+                status = type(e).__name__
+            if measured:
+                results.record(endpoint, status, time.perf_counter() - start)
+
+        start = time.perf_counter()
+        measure_from = start + warmup
+        end = measure_from + duration
+        next_arrival = start
+        while next_arrival < end:
+            delay = next_arrival - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            measured = next_arrival >= measure_from
+            if len(in_flight) >= max_in_flight:
+                if measured:
+                    results.dropped += 1
+            else:
+                endpoint = rng.choices(names, weights)[0]
+                request = builders[endpoint](rng, f"load_user_{rng.randrange(users):04d}", clips)
+                task = asyncio.ensure_future(fire(endpoint, request, measured))
+                in_flight.add(task)
+                task.add_done_callback(in_flight.discard)
+            next_arrival += rng.expovariate(rps)
+
+        if in_flight:
+            await asyncio.wait(in_flight, timeout=timeout)
+        elapsed = max(time.perf_counter() - measure_from, 1e-9)
+
+    return results.summary(elapsed)
+
+
+def print_report(report: Dict) -> None:
+    print(f"\n{'endpoint':<10} {'reqs':>7} {'ok':>7} {'err':>6} {'rps':>8} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+    for name, e in report["endpoints"].items():
+        cells = [f"{e[k]:>9}" if e[k] is not None else f"{'-':>9}" for k in ("p50_ms", "p95_ms", "p99_ms")]
+        print(f"{name:<10} {e['requests']:>7} {e['ok']:>7} {e['errors']:>6} {e['throughput_rps']:>8} {' '.join(cells)}")
+        failures = {status: count for status, count in e["statuses"].items() if status != "200"}
+        if failures:
+            print(f"{'':<10} failures: {failures}")
+    print(f"\nTotal: {report['requests']} requests in {report['elapsed_s']}s, "
+          f"{report['throughput_rps']} ok/s, error rate {report['error_rate']:.2%}, "
+          f"client-dropped {report['client_dropped']}")
+
+
+def spawn_server(target: str, port: int, workers: int, ready_timeout: float) -> subprocess.Popen:
+    """Start the backend under uvicorn with model stubs and wait until it is ready"""
+    config = TARGETS[target]
+    env = dict(os.environ, MEAL_MODEL_STUBS="1")
+    env.setdefault("MEAL_STATE_STORE", "memory" if workers == 1 else "sqlite:///load_test_state.db")
+    command = [sys.executable, "-m", "uvicorn", config["app"], "--host", "127.0.0.1",
+               "--port", str(port), "--workers", str(workers), "--log-level", "warning"]
+    process = subprocess.Popen(command, cwd=config["cwd"], env=env)
+
+    url = f"http://127.0.0.1:{port}{config['ready_path']}"
+    deadline = time.time() + ready_timeout
+    while time.time() < deadline:
+        if process.poll() is not None:
+            raise SystemExit(f"Server exited with code {process.returncode}")
+        try:
+            if httpx.get(url, timeout=2).status_code == 200:
+                print(f"✅ {target} backend ready on port {port}")
+                return process
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.5)
+    process.terminate()
+    raise SystemExit(f"Server not ready after {ready_timeout}s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test the Mood Meal Planner backends")
+    parser.add_argument("--target", choices=sorted(TARGETS), default="enhanced", help="Backend under test")
+    parser.add_argument("--url", default=None, help="Base URL of a running server (default: local --port)")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--spawn", action="store_true", help="Start the backend with MEAL_MODEL_STUBS=1")
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn workers when spawning")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help=f"Endpoint weights (default: {DEFAULT_MIX})")
+    parser.add_argument("--rps", type=float, default=10.0, help="Target arrival rate")
+    parser.add_argument("--duration", type=float, default=30.0, help="Measured seconds")
+    parser.add_argument("--warmup", type=float, default=5.0, help="Unmeasured seconds before the test")
+    parser.add_argument("--users", type=int, default=100, help="Distinct user ids to spread requests over")
+    parser.add_argument("--max-in-flight", type=int, default=500)
+    parser.add_argument("--timeout", type=float, default=60.0, help="Per-request timeout in seconds")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--json", default=None, help="Write the report to this file")
+    args = parser.parse_args()
+
+    mix = parse_mix(args.mix, TARGETS[args.target]["endpoints"])
+    process = spawn_server(args.target, args.port, args.workers, ready_timeout=120) if args.spawn else None
+    base_url = args.url or f"http://127.0.0.1:{args.port}"
+
+    try:
+        print(f"🚀 {args.rps} RPS for {args.duration}s (+{args.warmup}s warm-up) against {base_url}")
+        report = asyncio.run(run_load(base_url, args.target, mix, args.rps, args.duration, args.warmup,
+                                      args.users, args.max_in_flight, args.timeout, args.seed))
+    finally:
+        if process is not None:
+            process.terminate()
+            process.wait(10)
+
+    report.update({"target": args.target, "rps_target": args.rps, "mix": mix,
+                   "stubs": bool(args.spawn or os.environ.get("MEAL_MODEL_STUBS"))})
+    print_report(report)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"📄 Report written to {args.json}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,7 @@
 from fastapi import FastAPI, UploadFile, File
 from pydantic import BaseModel
 from datetime import datetime, timedelta
-import requests
 import base64
-import io
 import soundfile as sf
 
 # Custom Modules
@@ -13,10 +11,15 @@ from meal_loader import load_meals
 from meal_agent import explain_meal
 from meal_logger import log_meal, get_last_meal
 from text_to_speech import convert_text_to_speech
+from webhook_dispatcher import WebhookDispatcher
 
 app = FastAPI()
 meals = load_meals()
 
+# n8n notifications are delivered in the background so a slow or down n8n
+# instance never delays the suggestion response
+tired_webhook = WebhookDispatcher("http://localhost:5678/webhook-tired")
+
 # Input model for text
 class MoodText(BaseModel):
     text: str
@@ -45,14 +48,11 @@ def get_meal_suggestion_logic(text: str):
     if "Tired" in [mood_1, mood_2]:
         last_meal = get_last_meal(user)
         if not last_meal or datetime.utcnow() - datetime.fromisoformat(last_meal["timestamp"]) > timedelta(hours=4):
-            try:
-                requests.post("http://localhost:5678/webhook-tired", json={
-                    "user": user,
-                    "mood": [mood_1, mood_2],
-                    "meal": best_meal["meal_name"]
-                })
-            except Exception as e:
-                print(f"Failed to send to n8n: {e}")
+            tired_webhook.submit({
+                "user": user,
+                "mood": [mood_1, mood_2],
+                "meal": best_meal["meal_name"]
+            })
 
     return {
         "mood_detected": [mood_1, mood_2],
@@ -68,17 +68,11 @@ def suggest_meal_from_text_endpoint(payload: MoodText):
 
 @app.post("/suggest-meal-from-audio")
 async def suggest_meal_from_audio_endpoint(audio: UploadFile = File(...)):
-    # Read audio file into an in-memory buffer
+    # Read audio file into memory; it is decoded there without touching disk
     audio_bytes = await audio.read()
-    buffer = io.BytesIO(audio_bytes)
-    
-    # Save buffer to a temporary file path for transcription
-    temp_path = f"temp_{audio.filename}"
-    with open(temp_path, "wb") as f:
-        f.write(buffer.getvalue())
 
     # Transcribe audio to text
-    transcribed_text = transcribe_audio(temp_path)
+    transcribed_text = transcribe_audio(audio_bytes)
 
     if not transcribed_text or "Could not process" in transcribed_text:
         return {"error": "Could not understand the audio."}
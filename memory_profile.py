@@ -0,0 +1,59 @@
+"""
+Memory accounting helpers for the backend.
+
+``rss_bytes`` reads the process resident set size (psutil if installed, else
+/proc, else the peak from ``resource``). ``weights_bytes`` estimates how much
+memory a loaded model holds by summing its torch parameters and buffers (or
+numpy arrays / FAISS vectors), which is cheap enough to call from ``/stats``.
+``diagnostic.py --memory`` uses both to report what each component adds.
+"""
+import os
+import sys
+from typing import Any, Optional
+
+MB = 1024 * 1024
+
+
+def rss_bytes() -> Optional[int]:
+    """Current resident set size of this process, or None if it cannot be read"""
+    try:
+        import psutil
+        return psutil.Process().memory_info().rss
+    except ImportError:
+        pass
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        pass
+    try:
+        import resource
+        # Peak, not current; kilobytes on Linux, bytes on macOS
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == "darwin" else peak * 1024
+    except ImportError:
+        return None
+
+
+def weights_bytes(obj: Any, _seen: Optional[set] = None) -> int:
+    """Approximate bytes held by a model, pipeline, array or FAISS index"""
+    seen = _seen if _seen is not None else set()
+    if obj is None or id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+
+    if isinstance(obj, (tuple, list)):
+        return sum(weights_bytes(item, seen) for item in obj)
+    if hasattr(obj, "nbytes") and hasattr(obj, "dtype"):  # numpy array
+        return int(obj.nbytes)
+    if hasattr(obj, "ntotal") and hasattr(obj, "d"):  # FAISS flat index (float32 vectors)
+        return int(obj.ntotal) * int(obj.d) * 4
+    if callable(getattr(obj, "parameters", None)) and callable(getattr(obj, "buffers", None)):  # torch module
+        tensors = {id(t): t for t in list(obj.parameters()) + list(obj.buffers())}
+        return sum(t.numel() * t.element_size() for t in tensors.values())
+    # HuggingFace pipelines wrap the model in .model
+    return weights_bytes(getattr(obj, "model", None), seen)
+
+
+def to_mb(num_bytes: Optional[int]) -> Optional[float]:
+    return round(num_bytes / MB, 1) if num_bytes is not None else None
@@ -0,0 +1,236 @@
+"""
+Process-wide model registry.
+
+Each heavy model (emotion classifier, Wav2Vec2, Whisper, sentence transformer,
+distilgpt2, DialoGPT) is registered here with a loader and an optional warm-up.
+Registering is free; the model is loaded the first time it is requested (or by
+``load_all`` from a background task) and then shared by every component in the
+process, so EnhancedMoodDetector, VectorMealEngine, mood_detector and
+speech_to_text no longer each build their own copy.
+"""
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+from memory_profile import rss_bytes, to_mb, weights_bytes
+from model_stubs import register_stubs, stubs_enabled
+
+logger = logging.getLogger(__name__)
+
+# Model lifecycle states reported by /ready
+PENDING = "pending"
+LOADING = "loading"
+WARMING = "warming"
+READY = "ready"
+FAILED = "failed"
+
+
+class ModelEntry:
+    """Book-keeping for a single registered model"""
+
+    def __init__(self, name: str, loader: Callable[[], Any],
+                 warmup: Optional[Callable[[Any], Any]] = None, required: bool = True):
+        self.name = name
+        self.loader = loader
+        self.warmup = warmup
+        self.required = required
+        self.state = PENDING
+        self.model = None
+        self.error: Optional[str] = None
+        self.load_seconds: Optional[float] = None
+        self.warmup_seconds: Optional[float] = None
+        self.rss_delta_bytes: Optional[int] = None  # Process RSS growth while loading (approximate)
+        self.lock = threading.Lock()
+
+
+class ModelRegistry:
+    def __init__(self):
+        self._entries: Dict[str, ModelEntry] = {}
+        self._lock = threading.Lock()
+
+    def register(self, name: str, loader: Callable[[], Any],
+                 warmup: Optional[Callable[[Any], Any]] = None, required: bool = True) -> None:
+        """Register a model loader (the first registration for a name wins)"""
+        with self._lock:
+            if name not in self._entries:
+                self._entries[name] = ModelEntry(name, loader, warmup, required)
+
+    def names(self) -> List[str]:
+        """Names of all registered models, in registration order"""
+        return list(self._entries)
+
+    def get(self, name: str) -> Any:
+        """Return the shared model instance, loading it on first use"""
+        entry = self._entries.get(name)
+        if entry is None:
+            raise KeyError(f"Model '{name}' is not registered")
+
+        if entry.state != READY:
+            with entry.lock:
+                if entry.state not in (READY, FAILED):
+                    self._load(entry)
+
+        if entry.state == FAILED:
+            raise RuntimeError(f"Model '{name}' failed to load: {entry.error}")
+        return entry.model
+
+    def _load(self, entry: ModelEntry) -> None:
+        """Load and warm up a model (caller holds the entry lock)"""
+        try:
+            entry.state = LOADING
+            logger.info(f"Loading model '{entry.name}'...")
+            rss_before = rss_bytes()
+            start = time.perf_counter()
+            model = entry.loader()
+            entry.load_seconds = time.perf_counter() - start
+            rss_after = rss_bytes()
+            if rss_before is not None and rss_after is not None:
+                entry.rss_delta_bytes = rss_after - rss_before
+
+            if entry.warmup is not None:
+                entry.state = WARMING
+                start = time.perf_counter()
+                try:
+                    entry.warmup(model)
+                except Exception as e:
+                    # A failed warm-up only costs latency on the first real request
+                    logger.warning(f"Warm-up failed for model '{entry.name}': {e}")
+                entry.warmup_seconds = time.perf_counter() - start
+
+            entry.model = model
+            entry.state = READY
+            logger.info(f"Model '{entry.name}' ready in {entry.load_seconds:.1f}s")
+        except Exception as e:
+            entry.state = FAILED
+            entry.error = str(e)
+            logger.error(f"Error loading model '{entry.name}': {e}")
+
+    def load_all(self, names: Optional[List[str]] = None) -> None:
+        """Load (and warm up) every registered model; failures are recorded, not raised"""
+        for name in names or self.names():
+            try:
+                self.get(name)
+            except Exception:
+                pass
+
+    def is_loaded(self, name: str) -> bool:
+        """Whether a model is loaded and ready to serve"""
+        entry = self._entries.get(name)
+        return entry is not None and entry.state == READY
+
+    def is_ready(self) -> bool:
+        """True once every required model is ready"""
+        return all(entry.state == READY for entry in self._entries.values() if entry.required)
+
+    def status(self) -> Dict[str, Dict]:
+        """Per-model state for readiness reporting"""
+        return {
+            name: {
+                "state": entry.state,
+                "required": entry.required,
+                "load_seconds": round(entry.load_seconds, 3) if entry.load_seconds is not None else None,
+                "warmup_seconds": round(entry.warmup_seconds, 3) if entry.warmup_seconds is not None else None,
+                "error": entry.error
+            }
+            for name, entry in self._entries.items()
+        }
+
+    def memory_status(self) -> Dict[str, Dict]:
+        """Per-model memory: RSS added while loading and current weight size"""
+        return {
+            name: {
+                "state": entry.state,
+                "load_rss_delta_mb": to_mb(entry.rss_delta_bytes),
+                "weights_mb": to_mb(weights_bytes(entry.model)) if entry.state == READY else None
+            }
+            for name, entry in self._entries.items()
+        }
+
+
+# Shared registry for this process
+registry = ModelRegistry()
+
+
+# --- Model catalog ---
+# Heavy libraries are imported inside the loaders so importing this module stays cheap.
+
+EMOTION_MODEL = "j-hartmann/emotion-english-distilroberta-base"
+WAV2VEC2_MODEL = "facebook/wav2vec2-base"
+WHISPER_MODEL = "openai/whisper-base.en"
+SENTENCE_MODEL = "all-MiniLM-L6-v2"
+GENERATOR_MODEL = "distilgpt2"
+DIALOGPT_MODEL = "microsoft/DialoGPT-small"
+
+
+def _load_emotion_classifier():
+    from transformers import pipeline
+    return pipeline("text-classification", model=EMOTION_MODEL, return_all_scores=True)
+
+
+def _load_wav2vec2():
+    from transformers import Wav2Vec2Processor, Wav2Vec2ForSequenceClassification
+    processor = Wav2Vec2Processor.from_pretrained(WAV2VEC2_MODEL)
+    model = Wav2Vec2ForSequenceClassification.from_pretrained(WAV2VEC2_MODEL, num_labels=7)  # 7 basic emotions
+    return processor, model
+
+
+def _warmup_wav2vec2(processor_and_model):
+    import numpy as np
+    import torch
+    processor, model = processor_and_model
+    inputs = processor(np.zeros(16000, dtype=np.float32), sampling_rate=16000, return_tensors="pt")
+    with torch.no_grad():
+        model(**inputs)
+
+
+def _load_whisper():
+    from transformers import pipeline
+    return pipeline("automatic-speech-recognition", model=WHISPER_MODEL)
+
+
+def _warmup_whisper(asr):
+    import numpy as np
+    asr({"raw": np.zeros(16000, dtype=np.float32), "sampling_rate": 16000})
+
+
+def _load_sentence_encoder():
+    from sentence_transformers import SentenceTransformer
+    return SentenceTransformer(SENTENCE_MODEL)
+
+
+def _load_text_generator():
+    from transformers import pipeline
+    return pipeline(
+        "text-generation",
+        model=GENERATOR_MODEL,
+        tokenizer=GENERATOR_MODEL,
+        max_length=150,
+        num_return_sequences=1,
+        temperature=0.7,
+        do_sample=True,
+        pad_token_id=50256
+    )
+
+
+def _load_dialogpt():
+    from transformers import AutoTokenizer, AutoModelForCausalLM
+    tokenizer = AutoTokenizer.from_pretrained(DIALOGPT_MODEL)
+    model = AutoModelForCausalLM.from_pretrained(DIALOGPT_MODEL)
+    return tokenizer, model
+
+
+# MEAL_MODEL_STUBS=1 swaps in offline stand-ins (load tests, benchmarks); first registration wins
+if stubs_enabled():
+    register_stubs(registry, ["emotion_classifier", "sentence_encoder", "text_generator",
+                              "whisper_asr", "wav2vec2", "dialogpt"])
+
+registry.register("emotion_classifier", _load_emotion_classifier,
+                  warmup=lambda classifier: classifier("warming up"))
+registry.register("sentence_encoder", _load_sentence_encoder,
+                  warmup=lambda encoder: encoder.encode(["warming up"]))
+registry.register("text_generator", _load_text_generator,
+                  warmup=lambda generator: generator("Warming up", max_new_tokens=1), required=False)
+registry.register("whisper_asr", _load_whisper, warmup=_warmup_whisper)
+registry.register("wav2vec2", _load_wav2vec2, warmup=_warmup_wav2vec2, required=False)
+registry.register("dialogpt", _load_dialogpt, required=False)
@@ -0,0 +1,181 @@
+"""
+Deterministic, latency-calibrated stand-ins for the HuggingFace models.
+
+Enabled with ``MEAL_MODEL_STUBS=1``: both model registries (top-level and
+``src/ai_modules``) then register these stubs instead of the real loaders,
+so the backends start in seconds with no downloads or network. Outputs are
+derived from a hash of the input (same input -> same output) and each call
+takes roughly as long as the real model on a laptop CPU, which makes
+load tests and benchmarks meaningful without the models.
+
+- ``MEAL_STUB_LATENCY_SCALE``: multiply the simulated latencies (0 disables them)
+- ``MEAL_STUB_BURN_CPU=1``: busy-wait instead of sleeping, to model CPU contention
+"""
+import hashlib
+import os
+import time
+from typing import Any, Dict, List, Optional, Union
+
+import numpy as np
+
+EMBEDDING_DIM = 384
+EMOTION_LABELS = ["anger", "disgust", "fear", "joy", "neutral", "sadness", "surprise"]
+
+# Seconds per call (base) and per additional item, measured on a 4-core laptop CPU
+LATENCIES = {
+    "emotion_classifier": (0.030, 0.008),
+    "sentiment_analyzer": (0.020, 0.006),
+    "sentence_encoder": (0.010, 0.002),
+    "text_generator": (1.200, 0.0),
+    "whisper_asr": (0.800, 0.0),
+    "wav2vec2": (0.150, 0.0),
+    "dialogpt": (0.0, 0.0),
+    "openai_agent": (3.000, 0.0)
+}
+
+
+def stubs_enabled() -> bool:
+    return os.environ.get("MEAL_MODEL_STUBS", "").lower() in ("1", "true", "yes")
+
+
+def simulate_latency(model: str, items: int = 1, cap: Optional[float] = None) -> None:
+    """Spend the calibrated time for one call on ``items`` inputs"""
+    base, per_item = LATENCIES.get(model, (0.0, 0.0))
+    seconds = (base + per_item * max(items - 1, 0)) * float(os.environ.get("MEAL_STUB_LATENCY_SCALE", "1"))
+    if cap is not None:
+        seconds = min(seconds, cap)
+    if seconds <= 0:
+        return
+    if os.environ.get("MEAL_STUB_BURN_CPU") == "1":
+        end = time.perf_counter() + seconds
+        while time.perf_counter() < end:
+            pass
+    else:
+        time.sleep(seconds)
+
+
+def _seed(text: str) -> int:
+    return int.from_bytes(hashlib.blake2b(text.encode("utf-8"), digest_size=8).digest(), "little")
+
+
+class _StubTensor(np.ndarray):
+    """ndarray that also answers .numpy(), for callers that ask for tensors"""
+
+    def numpy(self):
+        return np.asarray(self)
+
+
+class StubSentenceEncoder:
+    def encode(self, sentences: Union[str, List[str]], batch_size: int = 32,
+               convert_to_tensor: bool = False, normalize_embeddings: bool = False, **kwargs) -> np.ndarray:
+        single = isinstance(sentences, str)
+        texts = [sentences] if single else list(sentences)
+        simulate_latency("sentence_encoder", len(texts))
+
+        embeddings = np.empty((len(texts), EMBEDDING_DIM), dtype=np.float32)
+        for i, text in enumerate(texts):
+            embeddings[i] = np.random.default_rng(_seed(text)).standard_normal(EMBEDDING_DIM)
+        if normalize_embeddings:
+            embeddings /= np.linalg.norm(embeddings, axis=1, keepdims=True)
+
+        result = embeddings[0] if single else embeddings
+        return result.view(_StubTensor) if convert_to_tensor else result
+
+
+class StubTextClassifier:
+    """text-classification pipeline returning scores for all emotion labels"""
+
+    def __init__(self, labels: List[str] = EMOTION_LABELS, model: str = "emotion_classifier"):
+        self.labels = labels
+        self.model = model
+
+    def _scores(self, text: str) -> List[Dict]:
+        weights = np.random.default_rng(_seed(text)).random(len(self.labels))
+        weights /= weights.sum()
+        return [{"label": label, "score": float(score)} for label, score in zip(self.labels, weights)]
+
+    def __call__(self, inputs: Union[str, List[str]], **kwargs) -> List[List[Dict]]:
+        texts = [inputs] if isinstance(inputs, str) else list(inputs)
+        simulate_latency(self.model, len(texts))
+        return [self._scores(text) for text in texts]
+
+
+class StubSentimentAnalyzer(StubTextClassifier):
+    """sentiment-analysis pipeline returning the top label only"""
+
+    def __init__(self):
+        super().__init__(["NEGATIVE", "POSITIVE"], model="sentiment_analyzer")
+
+    def __call__(self, inputs: Union[str, List[str]], **kwargs) -> List[Dict]:
+        return [max(scores, key=lambda s: s["score"]) for scores in super().__call__(inputs, **kwargs)]
+
+
+class StubTextGenerator:
+    SENTENCES = [
+        "It balances comforting flavours with steady energy for the rest of your day.",
+        "The mix of nutrients supports a calmer, more focused mood.",
+        "Warm, simple ingredients make it easy on both body and mind."
+    ]
+
+    def __call__(self, prompt: str, max_time: Optional[float] = None, **kwargs) -> List[Dict[str, str]]:
+        simulate_latency("text_generator", cap=max_time)
+        rng = np.random.default_rng(_seed(prompt))
+        continuation = " ".join(rng.permutation(self.SENTENCES)[:2])
+        return [{"generated_text": f"{prompt} {continuation}"}]
+
+
+class StubSpeechRecognizer:
+    PHRASES = [
+        "I feel tired after a long day at work",
+        "I'm pretty anxious about tomorrow",
+        "Today was great and I'm full of energy",
+        "I feel a bit sad and lonely tonight"
+    ]
+
+    def __call__(self, inputs: Any, **kwargs) -> Dict[str, str]:
+        simulate_latency("whisper_asr")
+        if isinstance(inputs, dict):
+            raw = np.asarray(inputs.get("raw", []), dtype=np.float32)
+            key = f"{raw.size}:{float(np.abs(raw).sum()):.3f}"
+        else:
+            key = str(inputs)
+            if os.path.exists(key):
+                key = f"{key}:{os.path.getsize(key)}"
+        return {"text": self.PHRASES[_seed(key) % len(self.PHRASES)]}
+
+
+class StubWav2Vec2:
+    """Placeholder (processor, model) pair; the backends only use the pair's presence"""
+
+    def __call__(self, *args, **kwargs):
+        simulate_latency("wav2vec2")
+        return None
+
+
+class StubAgenticCore:
+    """Stands in for AgenticCore (OpenAI function-calling agent)"""
+
+    MEALS = ["Spicy Ramen", "Vegetable Curry", "Greek Salad", "Chicken Soup"]
+
+    def run_agent(self, user_input: str) -> Dict[str, str]:
+        simulate_latency("openai_agent")
+        meal = self.MEALS[_seed(user_input) % len(self.MEALS)]
+        return {"input": user_input, "output": f"Based on how you feel, try {meal}."}
+
+
+STUB_LOADERS = {
+    "emotion_classifier": StubTextClassifier,
+    "sentiment_analyzer": StubSentimentAnalyzer,
+    "sentence_encoder": StubSentenceEncoder,
+    "text_generator": StubTextGenerator,
+    "explanation_generator": StubTextGenerator,
+    "whisper_asr": StubSpeechRecognizer,
+    "wav2vec2": lambda: (StubWav2Vec2(), StubWav2Vec2()),
+    "dialogpt": lambda: (None, None)
+}
+
+
+def register_stubs(registry, names: List[str]) -> None:
+    """Register stubs for these model names (call before the real registrations)"""
+    for name in names:
+        registry.register(name, STUB_LOADERS[name])
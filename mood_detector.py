@@ -1,8 +1,8 @@
-from transformers import pipeline
-
-classifier = pipeline("text-classification", model="j-hartmann/emotion-english-distilroberta-base", return_all_scores=True)
+from model_registry import registry
 
 def detect_mood_from_text(text: str):
+    # Shares the emotion classifier with EnhancedMoodDetector via the model registry
+    classifier = registry.get("emotion_classifier")
     results = classifier(text)[0]
     sorted_results = sorted(results, key=lambda x: x['score'], reverse=True)
     return sorted_results[0]['label'], sorted_results[1]['label']
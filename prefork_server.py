@@ -0,0 +1,212 @@
+#!/usr/bin/env python3
+"""
+AI Mood Meal Assistant - Pre-fork Server
+
+Serves enhanced_backend.py with N worker processes that share the model
+weights copy-on-write. The master process loads every model and the FAISS
+index once, moves all live objects out of the garbage collector's reach with
+gc.freeze() (so the collector never writes to their pages), and then forks the
+workers. Each worker gets its own torch/FAISS intra-op thread budget so that
+workers x threads does not oversubscribe the CPU.
+
+Per-process services start in each worker's lifespan, not in the master:
+
+- Audio feature pool: every worker spawns its own ``AudioFeaturePool``
+  (spawned processes cannot be inherited across fork). Unless
+  ``MEAL_FEATURE_WORKERS`` is set, each worker gets ``cores // workers - 1``
+  feature processes, so workers plus feature processes add up to about one
+  per core; with as many workers as cores that is 0 and each worker extracts
+  in its own threads, which already runs extractions on every core.
+- Reminder scheduler and reminder stream: every worker runs both. A due
+  reminder fires only in the worker that claims it in the shared state
+  store, and reminder events reach /reminders/stream connections on any
+  worker through the store, so running one per worker does not duplicate
+  reminders. This needs a store shared by the workers (the default SQLite
+  file); with ``MEAL_STATE_STORE=memory`` each worker has its own reminders.
+
+Usage:
+    python prefork_server.py --workers 4 --port 8000
+"""
+
+import argparse
+import gc
+import logging
+import os
+import signal
+import socket
+import sys
+import time
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger("prefork_server")
+
+
+def configure_thread_env(threads: int) -> None:
+    """Pin BLAS/OpenMP thread pools before torch, numpy or faiss are imported"""
+    for var in ("OMP_NUM_THREADS", "MKL_NUM_THREADS", "OPENBLAS_NUM_THREADS"):
+        os.environ[var] = str(threads)
+    # HuggingFace tokenizers spawn their own threads and warn after fork
+    os.environ.setdefault("TOKENIZERS_PARALLELISM", "false")
+
+
+def configure_feature_workers(workers: int) -> None:
+    """Split the cores between serving workers and their audio feature processes (before import)"""
+    cores = os.cpu_count() or 1
+    os.environ.setdefault("MEAL_FEATURE_WORKERS", str(max(0, cores // workers - 1)))
+
+
+def set_compute_threads(threads: int) -> None:
+    """Set torch and FAISS intra-op thread counts for the current process"""
+    try:
+        import torch
+        torch.set_num_threads(threads)
+    except ImportError:
+        pass
+
+    try:
+        import faiss
+        faiss.omp_set_num_threads(threads)
+    except (ImportError, AttributeError):
+        pass
+
+
+def create_listen_socket(host: str, port: int, backlog: int = 2048) -> socket.socket:
+    """Bind the shared listening socket that every worker accepts from"""
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(backlog)
+    sock.set_inheritable(True)
+    return sock
+
+
+class PreforkServer:
+    def __init__(self, workers: int, host: str = "0.0.0.0", port: int = 8000,
+                 threads_per_worker: int = None, log_level: str = "info"):
+        self.workers = max(1, workers)
+        self.host = host
+        self.port = port
+        self.threads_per_worker = threads_per_worker or max(1, (os.cpu_count() or 1) // self.workers)
+        self.log_level = log_level
+        self.children = {}  # pid -> worker slot
+        self.stopping = False
+        self.sock = None
+
+    def load_models(self):
+        """Load all models and the FAISS index in the master, then freeze the heap"""
+        # The master only ever runs single-threaded inference (warm-up), so no
+        # OpenMP thread team exists at fork time; forked children can then start
+        # their own pools safely.
+        set_compute_threads(1)
+
+        import enhanced_backend
+        start = time.perf_counter()
+        enhanced_backend.load_components()
+        logger.info(f"Master loaded AI components in {time.perf_counter() - start:.1f}s")
+
+        # Collect garbage once, then move every surviving object to the permanent
+        # generation so later collections in the workers don't touch (and copy)
+        # the pages holding model objects.
+        gc.collect()
+        gc.freeze()
+        logger.info(f"Frozen {gc.get_freeze_count()} objects before forking")
+
+    def run_worker(self, slot: int):
+        """Entry point of a forked worker process (never returns)"""
+        # Restore default signal handling; uvicorn installs its own handlers
+        signal.signal(signal.SIGTERM, signal.SIG_DFL)
+        signal.signal(signal.SIGINT, signal.SIG_DFL)
+        exit_code = 0
+        try:
+            set_compute_threads(self.threads_per_worker)
+
+            import uvicorn
+            import enhanced_backend
+
+            config = uvicorn.Config(enhanced_backend.app, log_level=self.log_level, lifespan="on")
+            server = uvicorn.Server(config)
+            logger.info(f"Worker {slot} (pid {os.getpid()}) serving with {self.threads_per_worker} threads")
+            server.run(sockets=[self.sock])
+        except Exception as e:
+            logger.error(f"Worker {slot} crashed: {e}")
+            exit_code = 1
+        finally:
+            os._exit(exit_code)
+
+    def spawn(self, slot: int):
+        pid = os.fork()
+        if pid == 0:
+            self.run_worker(slot)
+        self.children[pid] = slot
+
+    def handle_signal(self, signum, frame):
+        logger.info(f"Received signal {signum}, stopping workers...")
+        self.stopping = True
+        for pid in list(self.children):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    def run(self):
+        """Bind, load models, fork workers and supervise them until stopped"""
+        self.sock = create_listen_socket(self.host, self.port)
+        logger.info(f"Listening on http://{self.host}:{self.port}")
+
+        self.load_models()
+
+        signal.signal(signal.SIGTERM, self.handle_signal)
+        signal.signal(signal.SIGINT, self.handle_signal)
+
+        for slot in range(self.workers):
+            self.spawn(slot)
+        logger.info(f"Started {self.workers} workers x {self.threads_per_worker} threads, "
+                    f"{os.environ.get('MEAL_FEATURE_WORKERS')} audio feature processes each")
+
+        while self.children:
+            try:
+                pid, status = os.waitpid(-1, 0)
+            except ChildProcessError:
+                break
+            except InterruptedError:
+                continue
+
+            slot = self.children.pop(pid, None)
+            if slot is None or self.stopping:
+                continue
+
+            logger.warning(f"Worker {slot} (pid {pid}) exited with status {status}, restarting")
+            time.sleep(1)  # avoid a tight crash loop
+            self.spawn(slot)
+
+        self.sock.close()
+        logger.info("All workers stopped")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pre-fork multi-worker server for enhanced_backend")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Number of worker processes")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--threads-per-worker", type=int, default=None,
+                        help="torch/FAISS intra-op threads per worker (default: cores // workers)")
+    parser.add_argument("--log-level", default="info")
+    args = parser.parse_args()
+
+    server = PreforkServer(
+        workers=args.workers,
+        host=args.host,
+        port=args.port,
+        threads_per_worker=args.threads_per_worker,
+        log_level=args.log_level
+    )
+    configure_thread_env(server.threads_per_worker)
+    configure_feature_workers(server.workers)
+    server.run()
+
+
+if __name__ == "__main__":
+    if not hasattr(os, "fork"):
+        print("❌ Pre-fork serving requires a platform with os.fork (Linux/macOS)")
+        sys.exit(1)
+    main()
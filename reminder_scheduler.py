@@ -0,0 +1,198 @@
+"""
+Reminder scheduler keyed on next-due time.
+
+Keeps a min-heap of ``(due_timestamp, user_id)`` so each wake-up only touches
+users that are actually due, instead of scanning every user. Rescheduling
+pushes a new heap entry in O(log n); superseded entries are skipped lazily when
+they reach the top (``_due`` holds the current due time per user). Due times
+are mirrored to the state store, which is the source of truth.
+
+The heap only holds reminders due within ``horizon`` seconds. Every
+``resync_interval`` seconds each worker asks the store for the entries due
+before ``now + horizon`` (an indexed range query, so a sync costs O(users due
+soon), not O(users)); that is how a reminder scheduled on another worker is
+picked up. A due entry fires only in the worker whose ``claim`` removes it from
+the store, so every reminder is delivered once. Store queries and claims run in
+a thread, off the event loop.
+"""
+import asyncio
+import heapq
+import logging
+import threading
+import time
+from datetime import datetime
+from typing import Awaitable, Callable, Dict, Iterable, List, Optional, Tuple, Union
+
+from state_store import StateStore
+
+logger = logging.getLogger(__name__)
+
+MIGRATIONS_NAMESPACE = "migrations"
+
+
+class ReminderScheduler:
+    def __init__(
+        self,
+        store: StateStore,
+        on_due: Callable[[List[str]], Awaitable[None]],
+        namespace: str = "reminder_due",
+        batch_size: int = 500,
+        max_sleep: float = 300.0,
+        resync_interval: float = 60.0,
+        horizon: Optional[float] = None,
+        sync_limit: int = 10_000,
+        backfill: Optional[Callable[[], Iterable[Tuple[str, Union[datetime, float]]]]] = None
+    ):
+        self.store = store
+        self.namespace = namespace
+        self.on_due = on_due
+        self.batch_size = batch_size
+        self.max_sleep = max_sleep
+        self.resync_interval = resync_interval
+        # Longer than the sync interval, so nothing comes due between two syncs unseen
+        self.horizon = horizon if horizon is not None else 2 * resync_interval
+        self.sync_limit = sync_limit
+        # Yields (user_id, due_at) for every user who should have a reminder; run once per
+        # store (a marker records it) for records written before due times were mirrored
+        self.backfill = backfill
+        self._due: Dict[str, float] = {}
+        self._heap: List[Tuple[float, str]] = []
+        self._lock = threading.Lock()
+        self._next_sync = 0.0
+        self._page_full = False
+        self._wakeup: Optional[asyncio.Event] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def load(self) -> int:
+        """Backfill once per store, then sync; returns the number of reminders due within the horizon"""
+        if self.backfill is not None:
+            self._backfill()
+        return self.sync()
+
+    def sync(self) -> int:
+        """Merge the store's entries due within the horizon into the heap (blocking)"""
+        now = time.time()
+        rows = list(self.store.range_by_score(self.namespace, upto=now + self.horizon, limit=self.sync_limit))
+        with self._lock:
+            for user_id, ts, _ in rows:
+                ts = float(ts)
+                if self._due.get(user_id) != ts:
+                    self._due[user_id] = ts
+                    heapq.heappush(self._heap, (ts, user_id))
+            self._maybe_compact()
+        # A full page means more entries follow; they are not due before the last one
+        self._next_sync = now + self.resync_interval
+        self._page_full = len(rows) >= self.sync_limit
+        if self._page_full:
+            self._next_sync = min(self._next_sync, rows[-1][2])
+        return len(rows)
+
+    def _backfill(self):
+        marker = f"{self.namespace}:backfill"
+        if self.store.get(MIGRATIONS_NAMESPACE, marker) is not None:
+            return
+        added = 0
+        with self.store.batch():
+            for user_id, due_at in self.backfill():
+                if self.store.get(self.namespace, user_id) is None:
+                    ts = due_at.timestamp() if isinstance(due_at, datetime) else float(due_at)
+                    self.store.set(self.namespace, user_id, ts)
+                    added += 1
+            self.store.set(MIGRATIONS_NAMESPACE, marker, time.time())
+        logger.info(f"Backfilled {added} reminders from existing records")
+
+    def schedule(self, user_id: str, due_at: Union[datetime, float]) -> None:
+        """Schedule (or reschedule) the next reminder for a user"""
+        ts = due_at.timestamp() if isinstance(due_at, datetime) else float(due_at)
+        is_next = False
+        with self._lock:
+            if ts <= time.time() + self.horizon:
+                self._due[user_id] = ts
+                heapq.heappush(self._heap, (ts, user_id))
+                is_next = self._heap[0] == (ts, user_id)
+                self._maybe_compact()
+            else:
+                # Later than the horizon: only the store keeps it until a sync brings it in
+                self._due.pop(user_id, None)
+            self.store.set(self.namespace, user_id, ts)
+        if is_next:
+            self._notify()
+
+    def cancel(self, user_id: str) -> None:
+        """Drop a user's pending reminder (its heap entry is discarded lazily)"""
+        with self._lock:
+            self._due.pop(user_id, None)
+            self.store.delete(self.namespace, user_id)
+
+    def next_due(self) -> Optional[float]:
+        with self._lock:
+            self._drop_stale()
+            return self._heap[0][0] if self._heap else None
+
+    def pending(self) -> int:
+        """Reminders scheduled across all workers"""
+        return self.store.count(self.namespace)
+
+    def pop_due(self, now: Optional[float] = None) -> List[str]:
+        """Remove and return up to batch_size due users whose store entry this process claimed (blocking)"""
+        now = time.time() if now is None else now
+        candidates = []
+        with self._lock:
+            while self._heap and self._heap[0][0] <= now and len(candidates) < self.batch_size:
+                ts, user_id = heapq.heappop(self._heap)
+                if self._due.get(user_id) == ts:
+                    del self._due[user_id]
+                    candidates.append((user_id, ts))
+        # Another worker may have fired (or rescheduled) it already
+        return [user_id for user_id, ts in candidates if self.store.claim(self.namespace, user_id, ts)]
+
+    def _drop_stale(self):
+        while self._heap and self._due.get(self._heap[0][1]) != self._heap[0][0]:
+            heapq.heappop(self._heap)
+
+    def _maybe_compact(self):
+        # Frequent rescheduling leaves superseded entries behind; rebuild when
+        # they outnumber live ones so memory stays O(users due soon)
+        if len(self._heap) > 2 * len(self._due) + 1024:
+            self._heap = [(ts, user_id) for user_id, ts in self._due.items()]
+            heapq.heapify(self._heap)
+
+    def _notify(self):
+        if self._loop is not None and self._wakeup is not None:
+            self._loop.call_soon_threadsafe(self._wakeup.set)
+
+    async def run(self):
+        """Sleep until the earliest due time or the next sync, then hand due users to on_due in batches"""
+        loop = asyncio.get_running_loop()
+        self._loop = loop
+        self._wakeup = asyncio.Event()
+        loaded = await loop.run_in_executor(None, self.load)
+        logger.info(f"Reminder scheduler loaded {loaded} reminders due in the next {self.horizon:.0f}s")
+
+        while True:
+            self._wakeup.clear()
+            next_due = self.next_due()
+            backlog = next_due is not None and next_due <= time.time()
+            # After a full page, fetch the next one once this one's due entries are handled
+            if time.time() >= self._next_sync and not (self._page_full and backlog):
+                try:
+                    await loop.run_in_executor(None, self.sync)
+                except Exception as e:
+                    logger.error(f"Error syncing reminders: {e}")
+                    self._next_sync = time.time() + self.resync_interval
+
+            batch = await loop.run_in_executor(None, self.pop_due)
+            if batch:
+                try:
+                    await self.on_due(batch)
+                except Exception as e:
+                    logger.error(f"Error delivering reminders: {e}")
+                continue
+
+            next_due = self.next_due()
+            wake_at = self._next_sync if next_due is None else min(next_due, self._next_sync)
+            timeout = min(max(wake_at - time.time(), 0), self.max_sleep)
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
@@ -0,0 +1,187 @@
+"""
+Push delivery of reminder events over Server-Sent Events.
+
+When the reminder scheduler fires, ``ReminderBroadcaster.publish`` fans the
+event out to every open ``/reminders/stream`` connection for that user, so
+frontends no longer need to poll ``/check-reminders``. Each connection gets a
+bounded queue (the oldest event is dropped when a slow client falls behind).
+
+The last few events per user are kept in the state store (capped at
+``history_size`` and expiring after ``history_ttl``), not in process memory,
+so a reconnecting client can resume from its ``Last-Event-ID`` on any worker.
+
+A reminder fires in whichever worker claimed it. When the store is shared
+between processes, ``publish`` also appends the event to a short-lived log
+namespace keyed by event ID, and every worker's ``run`` loop reads that log
+past the last ID it has seen -- one range query per tick, whatever the number
+of connected users, run in a thread off the event loop -- and forwards the
+entries for users connected to it.
+"""
+import asyncio
+import json
+import logging
+import threading
+import time
+from typing import Any, AsyncIterator, Dict, List, Optional, Set, Tuple
+
+from fastapi.concurrency import run_in_threadpool
+
+from state_store import InMemoryStateStore, StateStore
+
+logger = logging.getLogger(__name__)
+
+
+class ReminderBroadcaster:
+    def __init__(self, store: Optional[StateStore] = None, namespace: str = "reminder_events",
+                 queue_size: int = 100, history_size: int = 50, history_ttl: float = 24 * 3600,
+                 heartbeat_interval: float = 15.0, poll_interval: float = 1.0,
+                 log_ttl: float = 300.0, poll_lag: float = 5.0, poll_limit: int = 1000):
+        self.store = store or InMemoryStateStore()
+        self.namespace = namespace
+        self.log_namespace = f"{namespace}:log"
+        self.queue_size = queue_size
+        self.history_size = history_size
+        self.history_ttl = history_ttl
+        self.heartbeat_interval = heartbeat_interval
+        self.poll_interval = poll_interval
+        self.log_ttl = log_ttl
+        # Each poll re-reads this far behind the newest ID seen, for events another
+        # worker stamped earlier but committed after that read
+        self.poll_lag = poll_lag
+        self.poll_limit = poll_limit
+        self._subscribers: Dict[str, Set[asyncio.Queue]] = {}
+        # Newest log ID read, and log keys inside the lag window already queued (or replayed) here
+        self._cursor = 0.0
+        self._seen: Dict[str, int] = {}
+        self._last_id = 0
+        self._lock = threading.Lock()
+
+    def _next_id(self) -> int:
+        # Millisecond timestamps keep IDs roughly comparable across worker processes
+        with self._lock:
+            self._last_id = max(self._last_id + 1, int(time.time() * 1000))
+            return self._last_id
+
+    def connection_count(self) -> int:
+        return sum(len(queues) for queues in self._subscribers.values())
+
+    def history(self, user_id: str) -> List[Tuple[int, str]]:
+        return [(event_id, data) for event_id, data in self.store.get(self.namespace, user_id, [])]
+
+    @staticmethod
+    def _log_key(user_id: str, event_id: int) -> str:
+        return f"{event_id}:{user_id}"
+
+    def publish(self, user_id: str, event: Dict) -> int:
+        """Record an event and queue it for this process's connections of a user; returns the event ID"""
+        event_id = self._next_id()
+        data = json.dumps(event)
+        history = self.history(user_id)
+        history.append((event_id, data))
+        self.store.set(self.namespace, user_id, history[-self.history_size:], ttl=self.history_ttl)
+        if self.store.shared:
+            key = self._log_key(user_id, event_id)
+            self._seen[key] = event_id
+            self.store.set(self.log_namespace, key, {"user_id": user_id, "id": event_id, "data": data},
+                           ttl=self.log_ttl, score=event_id)
+            # Make it visible to the other workers now rather than at the next buffered flush
+            self.store.flush()
+        self._deliver(user_id, event_id, data)
+        return event_id
+
+    def _deliver(self, user_id: str, event_id: int, data: str):
+        for queue in list(self._subscribers.get(user_id, ())):
+            if queue.full():
+                # Slow client: drop its oldest event rather than grow without bound
+                try:
+                    queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    pass
+            queue.put_nowait((event_id, data))
+
+    def read_log(self, after: float) -> List[Tuple[str, Any, float]]:
+        """Log entries with an ID above `after`, oldest first (blocking)"""
+        return list(self.store.range_by_score(self.log_namespace, above=after, limit=self.poll_limit))
+
+    async def poll(self) -> int:
+        """Forward events published by other workers to connections on this one; returns how many"""
+        if not self._subscribers:
+            # Nobody here to forward to: skip the query; a later connection starts from its history
+            self._cursor = max(self._cursor, time.time() * 1000)
+            self._prune_seen()
+            return 0
+
+        forwarded = 0
+        after = self._cursor - self.poll_lag * 1000
+        while True:
+            rows = await run_in_threadpool(self.read_log, after)
+            for key, entry, event_id in rows:
+                self._cursor = max(self._cursor, event_id)
+                if key in self._seen:
+                    continue
+                self._seen[key] = entry["id"]
+                if entry["user_id"] in self._subscribers:
+                    self._deliver(entry["user_id"], entry["id"], entry["data"])
+                    forwarded += 1
+            if len(rows) < self.poll_limit:
+                break
+            # A full page: read on from its last ID
+            after = rows[-1][2]
+        self._prune_seen()
+        return forwarded
+
+    def _prune_seen(self):
+        # Keys below the lag window are never read again
+        oldest = self._cursor - self.poll_lag * 1000
+        self._seen = {key: event_id for key, event_id in self._seen.items() if event_id > oldest}
+
+    async def run(self):
+        """Read the shared event log for events fired in other worker processes"""
+        if not self.store.shared:
+            # Process-local store: every event is published in this process
+            return
+        self._cursor = time.time() * 1000
+        while True:
+            await asyncio.sleep(self.poll_interval)
+            try:
+                await self.poll()
+            except Exception as e:
+                logger.error(f"Error polling reminder events: {e}")
+
+    def replay(self, user_id: str, last_event_id: Optional[int]) -> List[Tuple[int, str]]:
+        """Events a reconnecting client missed since last_event_id"""
+        if last_event_id is None:
+            return []
+        return [(event_id, data) for event_id, data in self.history(user_id) if event_id > last_event_id]
+
+    @staticmethod
+    def format_event(event_id: int, data: str, event: str = "reminder") -> str:
+        return f"id: {event_id}\nevent: {event}\ndata: {data}\n\n"
+
+    async def stream(self, user_id: str, last_event_id: Optional[int] = None) -> AsyncIterator[str]:
+        """SSE body for one connection: missed events, then live events and heartbeats"""
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+        if self.store.shared and user_id not in self._subscribers:
+            # Events already in the history are replayed, not pushed as new by the next poll
+            for event_id, _ in self.history(user_id):
+                self._seen[self._log_key(user_id, event_id)] = event_id
+        self._subscribers.setdefault(user_id, set()).add(queue)
+        try:
+            # Tell the client how long to wait before reconnecting
+            yield f"retry: {int(self.heartbeat_interval * 1000)}\n\n"
+            for event_id, data in self.replay(user_id, last_event_id):
+                yield self.format_event(event_id, data)
+
+            while True:
+                try:
+                    event_id, data = await asyncio.wait_for(queue.get(), self.heartbeat_interval)
+                    yield self.format_event(event_id, data)
+                except asyncio.TimeoutError:
+                    # Comment line keeps proxies and the client's read timeout from closing the stream
+                    yield ": heartbeat\n\n"
+        finally:
+            queues = self._subscribers.get(user_id)
+            if queues is not None:
+                queues.discard(queue)
+                if not queues:
+                    del self._subscribers[user_id]
@@ -0,0 +1,98 @@
+"""
+Precomputed meal suggestions for meal reminders.
+
+``/check-reminders`` is polled by every open frontend, so it must not run query
+encoding, vector search and explanation generation per call. The reminder
+query is fixed, so its ranked candidate list only changes when the catalog
+does: it is computed once per ``VectorMealEngine.catalog_version``, and the
+suggestion for each preference signature (dietary restrictions + cultural
+preferences) is derived from it and cached. Lookups are a dict hit; refreshes
+run in the background after preference or catalog changes.
+"""
+import logging
+import threading
+from typing import Dict, FrozenSet, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+REMINDER_MOOD_TEXT = "need nourishment and energy"
+REMINDER_MOODS = ("Tired", "Hungry")
+
+PreferenceSignature = Tuple[FrozenSet[str], FrozenSet[str]]
+
+
+def preference_signature(preferences: Optional[Dict]) -> PreferenceSignature:
+    """Key that identifies every user whose filters give the same suggestion"""
+    preferences = preferences or {}
+    return (
+        frozenset(r.lower() for r in preferences.get('dietary_restrictions', [])),
+        frozenset(p.lower() for p in preferences.get('cultural_preferences', []))
+    )
+
+
+class ReminderSuggestionCache:
+    def __init__(self, vector_engine, candidates: int = 20):
+        self.vector_engine = vector_engine
+        self.candidates = candidates
+        self.catalog_version = None
+        self._ranked: List[Dict] = []
+        self._suggestions: Dict[PreferenceSignature, Optional[Dict]] = {}
+        self._refresh_lock = threading.Lock()
+
+    def is_stale(self) -> bool:
+        """Whether the catalog changed since the candidates were computed"""
+        return self.catalog_version != self.vector_engine.catalog_version
+
+    def refresh(self) -> None:
+        """Recompute the ranked candidates and every cached signature (blocking)"""
+        if not self._refresh_lock.acquire(blocking=False):
+            return  # a refresh is already running
+        try:
+            version = self.vector_engine.catalog_version
+            query_embedding = self.vector_engine.encode_mood_query(REMINDER_MOOD_TEXT, *REMINDER_MOODS)
+            ranked = []
+            for idx, score in self.vector_engine.vector_search(query_embedding, k=self.candidates):
+                if idx < len(self.vector_engine.meal_data):
+                    meal = self.vector_engine.meal_data[idx].copy()
+                    meal['similarity_score'] = score
+                    ranked.append(meal)
+            
+            suggestions = {signature: self._pick(ranked, signature) for signature in list(self._suggestions)}
+            suggestions.setdefault(preference_signature(None), self._pick(ranked, preference_signature(None)))
+            
+            # Swap in the new state in one go so lookups never see a mix
+            self._ranked = ranked
+            self._suggestions = suggestions
+            self.catalog_version = version
+            logger.info(f"Refreshed reminder suggestions for {len(suggestions)} preference signatures")
+        except Exception as e:
+            logger.error(f"Error refreshing reminder suggestions: {e}")
+        finally:
+            self._refresh_lock.release()
+
+    def update_preferences(self, preferences: Dict) -> None:
+        """Compute the suggestion for a (possibly new) preference signature"""
+        signature = preference_signature(preferences)
+        self._suggestions[signature] = self._pick(self._ranked, signature)
+
+    def _pick(self, ranked: List[Dict], signature: PreferenceSignature) -> Optional[Dict]:
+        dietary_restrictions, cultural_preferences = signature
+        meals = self.vector_engine.filter_by_preferences(
+            [meal.copy() for meal in ranked],
+            {
+                'dietary_restrictions': list(dietary_restrictions),
+                'cultural_preferences': list(cultural_preferences)
+            }
+        )
+        return meals[0] if meals else None
+
+    def lookup(self, preferences: Optional[Dict]) -> Optional[Dict]:
+        """Suggested meal for these preferences, or None if not computed yet"""
+        signature = preference_signature(preferences)
+        if signature in self._suggestions:
+            return self._suggestions[signature]
+        if not self._ranked:
+            return None
+        # Unseen signature: filtering the cached candidates is cheap (no model calls)
+        self.update_preferences(preferences)
+        return self._suggestions[signature]
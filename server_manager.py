@@ -18,6 +18,8 @@ class ServerManager:
         self.frontend_process = None
         self.backend_url = "http://localhost:8000"
         self.frontend_url = "http://localhost:8501"
+        # More than one worker switches the backend to pre-fork mode (shared model weights)
+        self.backend_workers = int(os.environ.get("MEAL_BACKEND_WORKERS", "1"))
     
     def check_dependencies(self):
         """Check if required files exist"""
@@ -27,7 +29,8 @@ class ServerManager:
             "meal.json",
             "vector_meal_engine.py",
             "enhanced_mood_detector.py",
-            "enhanced_meal_suggester.py"
+            "enhanced_meal_suggester.py",
+            "model_registry.py"
         ]
         
         missing_files = []
@@ -146,20 +149,34 @@ def convert_text_to_speech(text: str) -> bytes:
                 json.dump(sample_meals, f, indent=2)
             print("✅ Created sample meal.json")
     
-    def start_backend(self):
+    def start_backend(self, workers: int = None):
         """Start the FastAPI backend server"""
+        workers = workers or self.backend_workers
         try:
-            print("🚀 Starting backend server...")
-            self.backend_process = subprocess.Popen([
-                sys.executable, "-m", "uvicorn", 
-                "enhanced_backend:app", 
-                "--host", "0.0.0.0", 
-                "--port", "8000",
-                "--reload"
-            ], stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+            if workers > 1:
+                # Pre-fork mode: models load once in the master and are shared by all workers
+                print(f"🚀 Starting backend server with {workers} pre-forked workers...")
+                self.backend_process = subprocess.Popen([
+                    sys.executable, "prefork_server.py",
+                    "--workers", str(workers),
+                    "--host", "0.0.0.0",
+                    "--port", "8000"
+                ], stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+                # The master loads every model before workers start answering
+                max_wait = 180
+            else:
+                print("🚀 Starting backend server...")
+                self.backend_process = subprocess.Popen([
+                    sys.executable, "-m", "uvicorn", 
+                    "enhanced_backend:app", 
+                    "--host", "0.0.0.0", 
+                    "--port", "8000",
+                    "--reload"
+                ], stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+                max_wait = 30
             
             # Wait for server to start
-            for i in range(30):  # Wait up to 30 seconds
+            for i in range(max_wait):  # Wait up to max_wait seconds
                 try:
                     response = requests.get(f"{self.backend_url}/health", timeout=1)
                     if response.status_code == 200:
@@ -1,18 +1,21 @@
-from transformers import pipeline
-from pydub import AudioSegment
+from audio_io import AudioClip, AudioDecodeError
+from model_registry import registry
 
-# Load HuggingFace Whisper model
-pipe = pipeline("automatic-speech-recognition", model="openai/whisper-base.en")
-
-def transcribe_audio(audio_path: str):
-    # Convert audio to a supported format if necessary
+def transcribe_audio(audio):
+    """Transcribe an AudioClip, uploaded audio bytes, a file-like object or a path"""
+    # HuggingFace Whisper model is loaded once per process by the model registry
+    pipe = registry.get("whisper_asr")
+    # Decoded in memory: no shared temp file, no ffmpeg process for WAV/FLAC/OGG
     try:
-        audio = AudioSegment.from_file(audio_path)
-        # Export to WAV as it's a widely supported format
-        wav_path = "temp.wav"
-        audio.export(wav_path, format="wav")
-        result = pipe(wav_path)
+        clip = AudioClip.from_source(audio)
+        if not clip.has_speech:  # silence: nothing for Whisper to transcribe
+            return ""
+        # Already 16 kHz mono float32, so the pipeline does not resample
+        result = pipe(clip.asr_input())
         return result["text"]
+    except AudioDecodeError as e:
+        print(f"Error decoding audio: {e}")
+        return "Could not process the audio file."
     except Exception as e:
         print(f"Error processing audio file: {e}")
-        return "Could not process the audio file."
\ No newline at end of file
+        return "Could not process the audio file."
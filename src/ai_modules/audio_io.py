@@ -0,0 +1,27 @@
+"""
+Audio decoding for the src backend.
+
+There is one implementation, the top-level ``audio_io`` module (including the
+block-wise ``resample_blocks`` / ``iter_audio_blocks`` used for streaming
+feature extraction). The repository root is appended to ``sys.path`` so it can
+be imported from the ``src`` import root.
+"""
+import os
+import sys
+
+_REPO_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+if _REPO_ROOT not in sys.path:
+    sys.path.append(_REPO_ROOT)
+
+from audio_io import (  # noqa: E402,F401
+    FALLBACK_SAMPLE_RATE,
+    FFMPEG_TIMEOUT,
+    TARGET_SAMPLE_RATE,
+    AudioClip,
+    AudioDecodeError,
+    AudioSource,
+    decode_audio,
+    iter_audio_blocks,
+    resample,
+    resample_blocks
+)
@@ -1,15 +1,11 @@
-from transformers import pipeline
 from typing import Dict, List, Optional
 from .vector_meal_engine import VectorMealEngine
+from .model_registry import registry
 
 class MealSuggester:
     def __init__(self, meal_engine: VectorMealEngine):
         self.meal_engine = meal_engine
-        self.explanation_generator = pipeline(
-            "text-generation",
-            model="distilgpt2",
-            device=-1
-        )
+        self.explanation_generator = registry.get("explanation_generator")
         
         # Mood to meal type mapping
         self.mood_meal_preferences = {
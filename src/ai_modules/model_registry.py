@@ -0,0 +1,71 @@
+"""
+Model registry for the src backend.
+
+``ModelRegistry`` is the top-level ``model_registry`` implementation (load and
+warm-up timings, RSS growth per model, ``memory_status``), so the two backends
+cannot drift apart. Only the registrations differ: the src backend gets its own
+registry with the models it uses. The repository root is appended to
+``sys.path`` so the top-level module can be imported from the ``src`` import root.
+"""
+import os
+import sys
+
+_REPO_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+if _REPO_ROOT not in sys.path:
+    sys.path.append(_REPO_ROOT)
+
+from model_registry import (  # noqa: E402,F401
+    FAILED,
+    LOADING,
+    PENDING,
+    READY,
+    WARMING,
+    ModelEntry,
+    ModelRegistry
+)
+from .model_stubs import register_stubs, stubs_enabled  # noqa: E402
+
+registry = ModelRegistry()
+
+
+def _load_sentiment_analyzer():
+    import torch
+    from transformers import pipeline
+    return pipeline(
+        "sentiment-analysis",
+        model="distilbert-base-uncased-finetuned-sst-2-english",
+        device=0 if torch.cuda.is_available() else -1
+    )
+
+
+def _load_sentence_encoder():
+    from sentence_transformers import SentenceTransformer
+    return SentenceTransformer("all-MiniLM-L6-v2")
+
+
+def _load_explanation_generator():
+    from transformers import pipeline
+    return pipeline("text-generation", model="distilgpt2", device=-1)
+
+
+def _load_whisper():
+    from transformers import pipeline
+    return pipeline("automatic-speech-recognition", model="openai/whisper-base.en")
+
+
+def _warmup_whisper(asr):
+    import numpy as np
+    asr({"raw": np.zeros(16000, dtype=np.float32), "sampling_rate": 16000})
+
+
+# MEAL_MODEL_STUBS=1 swaps in offline stand-ins (load tests, benchmarks); first registration wins
+if stubs_enabled():
+    register_stubs(registry, ["sentiment_analyzer", "sentence_encoder", "explanation_generator", "whisper_asr"])
+
+registry.register("sentiment_analyzer", _load_sentiment_analyzer,
+                  warmup=lambda analyzer: analyzer("warming up"))
+registry.register("sentence_encoder", _load_sentence_encoder,
+                  warmup=lambda encoder: encoder.encode(["warming up"]))
+registry.register("explanation_generator", _load_explanation_generator,
+                  warmup=lambda generator: generator("Warming up", max_new_tokens=1))
+registry.register("whisper_asr", _load_whisper, warmup=_warmup_whisper)
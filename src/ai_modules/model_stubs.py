@@ -0,0 +1,29 @@
+"""
+Offline model stand-ins for the src backend.
+
+There is one implementation, the top-level ``model_stubs`` module, which
+covers the models of both backends. The repository root is appended to
+``sys.path`` so it can be imported from the ``src`` import root.
+"""
+import os
+import sys
+
+_REPO_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+if _REPO_ROOT not in sys.path:
+    sys.path.append(_REPO_ROOT)
+
+from model_stubs import (  # noqa: E402,F401
+    EMBEDDING_DIM,
+    EMOTION_LABELS,
+    LATENCIES,
+    STUB_LOADERS,
+    StubSentenceEncoder,
+    StubSentimentAnalyzer,
+    StubSpeechRecognizer,
+    StubTextClassifier,
+    StubTextGenerator,
+    StubWav2Vec2,
+    register_stubs,
+    simulate_latency,
+    stubs_enabled
+)
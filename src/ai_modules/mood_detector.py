@@ -1,15 +1,10 @@
-from transformers import pipeline
-import torch
 from typing import Dict, List, Optional
+from .model_registry import registry
 
 class EnhancedMoodDetector:
     def __init__(self):
-        # Initialize sentiment analysis pipeline
-        self.sentiment_analyzer = pipeline(
-            "sentiment-analysis",
-            model="distilbert-base-uncased-finetuned-sst-2-english",
-            device=0 if torch.cuda.is_available() else -1
-        )
+        # Sentiment analysis pipeline is shared through the model registry
+        self.sentiment_analyzer = registry.get("sentiment_analyzer")
         
         # Mood categories and their associated terms
         self.mood_categories = {
@@ -1,13 +1,13 @@
-from sentence_transformers import SentenceTransformer
 import faiss
 import numpy as np
 import pickle
 import os
 from typing import Dict, List, Tuple
+from .model_registry import registry
 
 class VectorMealEngine:
-    def __init__(self, model_name: str = "all-MiniLM-L6-v2"):
-        self.model = SentenceTransformer(model_name)
+    def __init__(self):
+        self.model = registry.get("sentence_encoder")
         self.index = None
         self.meals = []
         
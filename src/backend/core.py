@@ -5,17 +5,26 @@ from typing import Dict
 
 from ai_modules.vector_meal_engine import VectorMealEngine
 from ai_modules.meal_suggester import MealSuggester
+from ai_modules.mood_detector import EnhancedMoodDetector
+from ai_modules.model_registry import registry
 
 # Global instances
 _meal_engine = None
 _meal_suggester = None
+_mood_detector = None
 
 def init_ai_components() -> None:
-    """Initialize AI components on server startup"""
-    global _meal_engine, _meal_suggester
+    """Load models once and initialize AI components (run from the lifespan task)"""
+    global _meal_engine, _meal_suggester, _mood_detector
+    
+    if _meal_suggester is not None:
+        return
+    
+    # Load and warm up every registered model
+    registry.load_all()
     
     # Initialize meal engine
-    _meal_engine = VectorMealEngine()
+    meal_engine = VectorMealEngine()
     
     # Load meal data
     # Try looking in the backend/data directory
@@ -29,12 +38,19 @@ def init_ai_components() -> None:
     with open(data_path) as f:
         meals_data = json.load(f)
         if "meals" in meals_data:
-            _meal_engine.load_meals(meals_data["meals"])
+            meal_engine.load_meals(meals_data["meals"])
         else:
-            _meal_engine.load_meals(meals_data)
+            meal_engine.load_meals(meals_data)
+    
+    _mood_detector = EnhancedMoodDetector()
+    _meal_engine = meal_engine
         
     # Initialize meal suggester
     _meal_suggester = MealSuggester(_meal_engine)
+
+def components_ready() -> bool:
+    """Whether init_ai_components() has finished"""
+    return _meal_suggester is not None
     
 def get_meal_suggester() -> MealSuggester:
     """Get the global meal suggester instance"""
@@ -43,3 +59,11 @@ def get_meal_suggester() -> MealSuggester:
             "AI components not initialized. Call init_ai_components() first."
         )
     return _meal_suggester
+
+def get_mood_detector() -> EnhancedMoodDetector:
+    """Get the global mood detector instance"""
+    if _mood_detector is None:
+        raise RuntimeError(
+            "AI components not initialized. Call init_ai_components() first."
+        )
+    return _mood_detector
@@ -1,13 +1,37 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 from backend.routers import mood_router, meal_router, preferences_router, voice_router
-from backend.core import init_ai_components
+from backend.core import init_ai_components, components_ready
+from ai_modules.model_registry import registry
 import asyncio
+import logging
+
+logger = logging.getLogger(__name__)
+
+async def load_ai_components():
+    """Load models in a worker thread so startup does not block on them"""
+    try:
+        await run_in_threadpool(init_ai_components)
+    except Exception as e:
+        logger.error(f"Error initializing AI components: {e}")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Initialize AI components in the background; /ready reports progress
+    asyncio.create_task(load_ai_components())
+    # Start the reminder service
+    asyncio.create_task(preferences_router.reminder_service.start_reminder_service())
+    yield
+    preferences_router.reminder_service.store.flush()
 
 app = FastAPI(
     title="🧠 AI Mood Meal Assistant API",
     description="Advanced AI-powered meal recommendations based on mood analysis with vector search and small language models",
-    version="2.0.0"
+    version="2.0.0",
+    lifespan=lifespan
 )
 
 # Add CORS middleware
@@ -19,19 +43,25 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Initialize AI components
-init_ai_components()
-
 # Include routers
 app.include_router(mood_router.router, prefix="/api/mood", tags=["mood"])
 app.include_router(meal_router.router, prefix="/api/meals", tags=["meals"])
 app.include_router(preferences_router.router, prefix="/api/user", tags=["user"])
 app.include_router(voice_router.router, prefix="/api/voice", tags=["voice"])
 
-@app.on_event("startup")
-async def startup_event():
-    # Start the reminder service
-    asyncio.create_task(preferences_router.reminder_service.start_reminder_service())
+@app.get("/health")
+async def health():
+    """Liveness check (does not wait for models)"""
+    return {"status": "healthy"}
+
+@app.get("/ready")
+async def ready():
+    """Readiness check with per-model load state"""
+    is_ready = components_ready() and registry.is_ready()
+    return JSONResponse(
+        status_code=200 if is_ready else 503,
+        content={"ready": is_ready, "models": registry.status()}
+    )
 
 if __name__ == "__main__":
     import uvicorn
@@ -1,12 +1,11 @@
 from fastapi import APIRouter, HTTPException
+from fastapi.concurrency import run_in_threadpool
 from pydantic import BaseModel
 from typing import Dict
 from datetime import datetime
-from ai_modules.mood_detector import EnhancedMoodDetector
-from backend.core import get_meal_suggester
+from ..core import components_ready, get_meal_suggester, get_mood_detector
 
 router = APIRouter()
-mood_detector = EnhancedMoodDetector()
 
 class MoodText(BaseModel):
     text: str
@@ -14,39 +13,49 @@ class MoodText(BaseModel):
 class AudioData(BaseModel):
     audio_data: str  # Base64 encoded audio data
 
+def recommend_for_text(text: str) -> Dict:
+    """Detect the mood in text and pick a meal with its explanation (blocking; run in a threadpool)"""
+    # Detect mood
+    mood_detector = get_mood_detector()
+    detected_mood = mood_detector.get_primary_mood(
+        text,
+        {"time": datetime.now()}
+    )
+    
+    # Get meal suggestions
+    meal_suggester = get_meal_suggester()
+    meals = meal_suggester.suggest_meals(detected_mood)
+    
+    if not meals:
+        raise HTTPException(
+            status_code=404,
+            detail="No suitable meals found"
+        )
+        
+    # Get first recommendation and explanation
+    recommended_meal = meals[0]
+    explanation = meal_suggester.generate_explanation(
+        detected_mood,
+        recommended_meal
+    )
+    
+    return {
+        "detected_mood": detected_mood,
+        "meal_recommendation": recommended_meal,
+        "explanation": explanation
+    }
+
 @router.post("/text")
 async def analyze_mood_text(mood_input: MoodText) -> Dict:
     """Analyze mood from text and get meal recommendations"""
+    if not components_ready():
+        raise HTTPException(status_code=503, detail="AI components are still loading")
+    
     try:
-        # Detect mood
-        detected_mood = mood_detector.get_primary_mood(
-            mood_input.text,
-            {"time": datetime.now()}
-        )
-        
-        # Get meal suggestions
-        meal_suggester = get_meal_suggester()
-        meals = meal_suggester.suggest_meals(detected_mood)
-        
-        if not meals:
-            raise HTTPException(
-                status_code=404,
-                detail="No suitable meals found"
-            )
-            
-        # Get first recommendation and explanation
-        recommended_meal = meals[0]
-        explanation = meal_suggester.generate_explanation(
-            detected_mood,
-            recommended_meal
-        )
-        
-        return {
-            "detected_mood": detected_mood,
-            "meal_recommendation": recommended_meal,
-            "explanation": explanation
-        }
+        return await run_in_threadpool(recommend_for_text, mood_input.text)
         
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=500,
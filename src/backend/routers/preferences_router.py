@@ -13,9 +13,10 @@ async def set_preferences(preferences: UserPreferences):
 
 @router.get("/preferences/{user_id}")
 async def get_preferences(user_id: str):
-    if user_id not in reminder_service.users:
+    preferences = reminder_service.get_user(user_id)
+    if preferences is None:
         raise HTTPException(status_code=404, detail="User preferences not found")
-    return reminder_service.users[user_id]
+    return preferences
 
 @router.post("/meal-logged/{user_id}")
 async def log_meal(user_id: str):
@@ -1,37 +1,74 @@
-from fastapi import APIRouter, UploadFile, File, HTTPException
+from fastapi import APIRouter, UploadFile, File, HTTPException, Query
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
 from ..services.speech_to_text import transcribe_audio
-import tempfile
-import os
+from ..core import components_ready
+from .mood_router import recommend_for_text
+import json
 
 router = APIRouter()
 
+TRANSCRIPTION_FAILED = "Could not process the audio file."
+
+def transcribe_upload(content: bytes) -> str:
+    """Transcribe the uploaded bytes in memory (blocking; run in a threadpool)"""
+    text = transcribe_audio(content)
+
+    if text == TRANSCRIPTION_FAILED:
+        raise HTTPException(status_code=400, detail="Could not process the audio file")
+    if not text.strip():
+        raise HTTPException(status_code=400, detail="No speech detected in the recording")
+
+    return text
+
 @router.post("/analyze-voice")
 async def analyze_voice(audio: UploadFile = File(...)):
     """
     Analyzes voice recording and returns the transcribed text
     """
     try:
-        # Save the uploaded file temporarily
-        with tempfile.NamedTemporaryFile(delete=False, suffix='.wav') as tmp_file:
-            content = await audio.read()
-            tmp_file.write(content)
-            tmp_path = tmp_file.name
+        content = await audio.read()
+        text = await run_in_threadpool(transcribe_upload, content)
+        return {"text": text}
 
-        try:
-            # Transcribe the audio using our speech to text service
-            text = transcribe_audio(tmp_path)
-            
-            if text == "Could not process the audio file.":
-                raise HTTPException(status_code=400, detail="Could not process the audio file")
-                
-            return {"text": text}
-            
-        finally:
-            # Clean up the temporary file
-            try:
-                os.unlink(tmp_path)
-            except:
-                pass
-                
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+
+@router.post("/recommend")
+async def recommend_from_voice(audio: UploadFile = File(...), stream: bool = Query(False)):
+    """
+    Transcribes a recording, detects the mood and recommends a meal in one round trip.
+    With ?stream=true the response is NDJSON: a "transcript" event as soon as the
+    audio is transcribed, then a "recommendation" (or "error") event.
+    """
+    if not components_ready():
+        raise HTTPException(status_code=503, detail="AI components are still loading")
+
+    content = await audio.read()
+
+    if not stream:
+        try:
+            text = await run_in_threadpool(transcribe_upload, content)
+            result = await run_in_threadpool(recommend_for_text, text)
+            return {"text": text, **result}
+
+        except HTTPException:
+            raise
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=f"Error processing request: {str(e)}")
+
+    async def events():
+        try:
+            text = await run_in_threadpool(transcribe_upload, content)
+            yield json.dumps({"event": "transcript", "text": text}) + "\n"
+            result = await run_in_threadpool(recommend_for_text, text)
+            yield json.dumps({"event": "recommendation", **result}, default=str) + "\n"
+        except HTTPException as e:
+            yield json.dumps({"event": "error", "status_code": e.status_code, "detail": e.detail}) + "\n"
+        except Exception as e:
+            yield json.dumps({"event": "error", "status_code": 500,
+                              "detail": f"Error processing request: {str(e)}"}) + "\n"
+
+    return StreamingResponse(events(), media_type="application/x-ndjson")
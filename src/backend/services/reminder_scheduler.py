@@ -0,0 +1,11 @@
+"""
+The src backend's view of the shared reminder scheduler.
+
+Like ``state_store``, the implementation lives in the top-level
+``reminder_scheduler`` module, so both backends claim due reminders from the
+store the same way. Importing the local ``state_store`` shim first puts the
+repository root on ``sys.path``.
+"""
+from . import state_store  # noqa: F401
+
+from reminder_scheduler import ReminderScheduler  # noqa: E402,F401
@@ -1,34 +1,73 @@
 from datetime import datetime, timedelta
-import asyncio
-from typing import Dict
-from .models.user_preferences import UserPreferences
+from typing import Iterator, List, Optional, Tuple
+from ..models.user_preferences import UserPreferences
+from .reminder_scheduler import ReminderScheduler
+from .state_store import StateStore, get_default_store
 
 class MealReminderService:
-    def __init__(self):
-        self.users: Dict[str, UserPreferences] = {}
+    def __init__(self, store: StateStore = None):
+        # UserPreferences records are stored as JSON so all workers share them
+        self.store = store or get_default_store()
+        self.users = self.store.namespace("reminder_users")
         self.reminder_threshold = timedelta(hours=3)
+        self.scheduler = ReminderScheduler(self.store, self.process_due_reminders, backfill=self.pending_reminders)
         
     async def start_reminder_service(self):
-        while True:
-            current_time = datetime.now()
-            for user_id, preferences in self.users.items():
-                last_meal = preferences.meal_tracking.last_meal_time
-                if last_meal:
-                    time_since_meal = current_time - last_meal
-                    if time_since_meal > self.reminder_threshold:
-                        await self.send_reminder(user_id)
-                        preferences.meal_tracking.missed_meals_count += 1
-            await asyncio.sleep(300)  # Check every 5 minutes
-    
-    async def send_reminder(self, user_id: str):
+        await self.scheduler.run()
+    
+    async def process_due_reminders(self, user_ids: List[str]):
+        """Count a missed meal, schedule the next reminder and deliver one batch"""
+        now = datetime.now()
+        due_users = []
+        with self.store.batch():
+            for user_id in user_ids:
+                preferences = self.get_user(user_id)
+                if preferences is None or preferences.meal_tracking.last_meal_time is None:
+                    self.scheduler.cancel(user_id)
+                    continue
+                preferences.meal_tracking.missed_meals_count += 1
+                self._schedule_next(preferences, now + self.reminder_threshold)
+                due_users.append(user_id)
+        if due_users:
+            await self.send_reminders(due_users)
+    
+    async def send_reminders(self, user_ids: List[str]):
         # TODO: Implement your preferred notification method here
         # This could be email, push notification, SMS, etc.
-        print(f"REMINDER: It's been over 3 hours since your last meal! User: {user_id}")
+        for user_id in user_ids:
+            print(f"REMINDER: It's been over 3 hours since your last meal! User: {user_id}")
+    
+    def pending_reminders(self) -> Iterator[Tuple[str, datetime]]:
+        """Next reminder of every stored user who has logged a meal (backfills the scheduler)"""
+        for user_id, record in self.users.items():
+            tracking = UserPreferences.model_validate(record).meal_tracking
+            if tracking.last_meal_time is not None:
+                yield user_id, tracking.next_meal_reminder or tracking.last_meal_time + self.reminder_threshold
+    
+    def get_user(self, user_id: str) -> Optional[UserPreferences]:
+        record = self.users.get(user_id)
+        return UserPreferences.model_validate(record) if record is not None else None
+    
+    def save_user(self, user_preferences: UserPreferences):
+        self.users[user_preferences.user_id] = user_preferences.model_dump(mode="json")
+    
+    def _schedule_next(self, preferences: UserPreferences, due_at: datetime):
+        preferences.meal_tracking.next_meal_reminder = due_at
+        self.save_user(preferences)
+        self.scheduler.schedule(preferences.user_id, due_at)
     
     def update_meal_time(self, user_id: str):
-        if user_id in self.users:
-            self.users[user_id].meal_tracking.last_meal_time = datetime.now()
-            self.users[user_id].meal_tracking.missed_meals_count = 0
+        preferences = self.get_user(user_id)
+        if preferences is not None:
+            now = datetime.now()
+            preferences.meal_tracking.last_meal_time = now
+            preferences.meal_tracking.missed_meals_count = 0
+            self._schedule_next(preferences, now + self.reminder_threshold)
     
     def add_user(self, user_preferences: UserPreferences):
-        self.users[user_preferences.user_id] = user_preferences
+        last_meal = user_preferences.meal_tracking.last_meal_time
+        if last_meal:
+            self._schedule_next(user_preferences, last_meal + self.reminder_threshold)
+        else:
+            self.save_user(user_preferences)
+            self.scheduler.cancel(user_preferences.user_id)
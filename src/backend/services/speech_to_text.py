@@ -1,36 +1,30 @@
-from transformers import pipeline
-import soundfile as sf
-import numpy as np
+from ai_modules.audio_io import AudioClip
+from ai_modules.model_registry import registry
 
-# Initialize the speech recognition pipeline
-asr_pipeline = pipeline("automatic-speech-recognition", model="openai/whisper-base.en")
-
-def transcribe_audio(audio_path: str) -> str:
+def transcribe_audio(audio) -> str:
     """
-    Transcribes audio file to text using Whisper model
+    Transcribes audio to text using Whisper model
     
     Args:
-        audio_path (str): Path to the audio file
+        audio: An AudioClip, uploaded audio bytes, a file-like object or a path
         
     Returns:
-        str: Transcribed text
+        str: Transcribed text ("" if the recording contains no speech)
     """
     try:
-        # Load audio file
-        audio, sample_rate = sf.read(audio_path)
-        
-        # Convert to mono if stereo
-        if len(audio.shape) > 1:
-            audio = audio.mean(axis=1)
+        # Speech recognition pipeline is loaded once per process by the registry
+        asr_pipeline = registry.get("whisper_asr")
         
-        # Normalize audio
-        audio = audio / np.max(np.abs(audio))
+        # Decoded once to 16 kHz mono float32, so the pipeline does not resample
+        clip = AudioClip.from_source(audio)
+        if not clip.has_speech:
+            return ""
         
-        # Transcribe
-        result = asr_pipeline({"raw": audio, "sampling_rate": sample_rate})
+        # Transcribe (peak-normalized samples)
+        result = asr_pipeline(clip.asr_input())
         
         return result["text"]
-        
+    
     except Exception as e:
         print(f"Error in transcription: {str(e)}")
         return "Could not process the audio file."
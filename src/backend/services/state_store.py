@@ -0,0 +1,24 @@
+"""
+The src backend's view of the shared state store.
+
+There is one implementation, the top-level ``state_store`` module, so both
+backends read and write the same schema (and the same file when pointed at
+one SQLite database). The repository root is appended to ``sys.path`` so it
+can be imported from the ``src`` import root without shadowing src modules.
+"""
+import os
+import sys
+
+_REPO_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+if _REPO_ROOT not in sys.path:
+    sys.path.append(_REPO_ROOT)
+
+from state_store import (  # noqa: E402
+    DEFAULT_STATE_STORE,
+    InMemoryStateStore,
+    SQLiteStateStore,
+    StateStore,
+    StoreNamespace,
+    create_state_store,
+    get_default_store
+)
@@ -0,0 +1,74 @@
+"""
+Cached reads of backend reference data for the Streamlit frontend.
+
+Streamlit reruns the whole script on every widget interaction, so anything
+fetched during rendering is fetched again on every click. Cuisines and dietary
+options rarely change and are cached for an hour; user preferences for a
+minute (and cleared as soon as the user saves new ones). Failed requests are
+not cached: the loaders raise inside ``st.cache_data`` and fall back outside it.
+"""
+from typing import Dict, List, Optional
+
+import requests
+import streamlit as st
+
+from http_client import get_session
+
+API_URL = "http://localhost:8000"
+REFERENCE_TTL = 3600
+PREFERENCES_TTL = 60
+REQUEST_TIMEOUT = 10
+
+
+def _get_json(path: str):
+    response = get_session().get(f"{API_URL}{path}", timeout=REQUEST_TIMEOUT)
+    response.raise_for_status()
+    return response.json()
+
+
+@st.cache_data(ttl=REFERENCE_TTL, show_spinner=False)
+def _cached_cuisines() -> List[str]:
+    return _get_json("/api/meals/cuisines")
+
+
+@st.cache_data(ttl=REFERENCE_TTL, show_spinner=False)
+def _cached_dietary_options() -> List[str]:
+    return _get_json("/api/meals/dietary-options")
+
+
+@st.cache_data(ttl=PREFERENCES_TTL, show_spinner=False)
+def _cached_user_preferences(user_id: str) -> Optional[Dict]:
+    response = get_session().get(f"{API_URL}/api/user/preferences/{user_id}", timeout=REQUEST_TIMEOUT)
+    if response.status_code == 404:  # nothing saved yet; a valid, cacheable answer
+        return None
+    response.raise_for_status()
+    return response.json()
+
+
+def load_cuisines(default: Optional[List[str]] = None) -> List[str]:
+    """Cuisine types offered by the backend (``default`` if it is unreachable)"""
+    try:
+        return _cached_cuisines()
+    except requests.exceptions.RequestException:
+        return list(default or [])
+
+
+def load_dietary_options(default: Optional[List[str]] = None) -> List[str]:
+    """Dietary options offered by the backend (``default`` if it is unreachable)"""
+    try:
+        return _cached_dietary_options()
+    except requests.exceptions.RequestException:
+        return list(default or [])
+
+
+def load_user_preferences(user_id: str = "default_user") -> Optional[Dict]:
+    """Saved dietary preferences for a user (None if unset or the backend is unreachable)"""
+    try:
+        return _cached_user_preferences(user_id)
+    except requests.exceptions.RequestException:
+        return None
+
+
+def clear_user_preferences():
+    """Drop cached preferences after the user saves new ones"""
+    _cached_user_preferences.clear()
@@ -1,9 +1,22 @@
+import os
+import sys
 import streamlit as st
-import requests
 from audio_recorder_streamlit import audio_recorder
 import base64
+import json
 from datetime import datetime
-from components.preferences import save_dietary_preferences
+
+# http_client is shared with enhanced_app.py and lives at the repository root
+# (appended, so modules next to this script still take precedence)
+_REPO_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+if _REPO_ROOT not in sys.path:
+    sys.path.append(_REPO_ROOT)
+
+from components.preferences import save_dietary_preferences  # noqa: E402
+from http_client import get_session, submit  # noqa: E402
+from api_cache import API_URL, load_user_preferences  # noqa: E402
+
+REQUEST_TIMEOUT = 30
 
 # Page configuration
 st.set_page_config(
@@ -314,13 +327,9 @@ def main():
                 if submit_button and user_input:
                     try:
                         with st.spinner("Analyzing your mood and finding the perfect meal..."):
-                            response = requests.post(
-                                "http://localhost:8000/api/mood/text",
-                                json={"text": user_input}
-                            )
+                            response = request_recommendation(user_input)
                             if response.status_code == 200:
-                                result = response.json()
-                                display_recommendation(result)
+                                st.session_state.last_recommendation = response.json()
                             else:
                                 st.error("Error getting recommendation. Please try again.")
                     except Exception as e:
@@ -338,29 +347,29 @@ def main():
                         try:
                             with st.spinner("Analyzing your voice..."):
                                 audio_b64 = base64.b64encode(audio_bytes).decode()
-                                # First convert audio to text
-                                text_response = requests.post(
-                                    "http://localhost:8000/api/voice/analyze-voice",
-                                    files={"audio": ("recording.wav", audio_bytes, "audio/wav")}
-                                )
-                                
-                                if text_response.status_code == 200:
-                                    text_result = text_response.json()
-                                    st.info(f"Transcribed text: {text_result['text']}")
-                                    
-                                    # Now get meal recommendation based on the text
-                                    response = requests.post(
-                                        "http://localhost:8000/api/mood/text",
-                                        json={"text": text_result['text']}
-                                    )
-                                    
-                                    if response.status_code == 200:
-                                        result = response.json()
-                                        display_recommendation(result)
+                                # Transcript, mood and meal in one round trip; the transcript is streamed first
+                                with get_session().post(
+                                    f"{API_URL}/api/voice/recommend",
+                                    params={"stream": "true"},
+                                    files={"audio": ("recording.wav", audio_bytes, "audio/wav")},
+                                    timeout=REQUEST_TIMEOUT,
+                                    stream=True
+                                ) as response:
+                                    if response.status_code != 200:
+                                        st.error("Error analyzing voice. Please try again.")
                                     else:
-                                        st.error("Error getting meal recommendations. Please try again.")
-                                else:
-                                    st.error("Error analyzing voice. Please try again.")
+                                        for line in response.iter_lines():
+                                            if not line:
+                                                continue
+                                            event = json.loads(line)
+                                            if event["event"] == "transcript":
+                                                st.info(f"Transcribed text: {event['text']}")
+                                            elif event["event"] == "recommendation":
+                                                st.session_state.last_recommendation = event
+                                            elif event.get("status_code") == 400:
+                                                st.error("Error analyzing voice. Please try again.")
+                                            else:
+                                                st.error("Error getting meal recommendations. Please try again.")
                         except Exception as e:
                             st.error("Error connecting to the server. Please make sure the backend is running.")
                 st.markdown('</div>', unsafe_allow_html=True)
@@ -377,29 +386,28 @@ def main():
             if st.button(mood, key=mood):
                 try:
                     with st.spinner("Finding the perfect meal..."):
-                        response = requests.post(
-                            "http://localhost:8000/api/mood/text",
-                            json={"text": mood.split()[1]}
-                        )
+                        response = request_recommendation(mood.split()[1])
                         if response.status_code == 200:
-                            result = response.json()
-                            display_recommendation(result)
+                            st.session_state.last_recommendation = response.json()
                         else:
                             st.error("Error getting recommendation. Please try again.")
                 except Exception as e:
                     st.error("Error connecting to the server. Please make sure the backend is running.")
 
-def display_recommendation(result):
+    # Kept in session state so the recommendation survives reruns from other widgets
+    if st.session_state.get('last_recommendation'):
+        display_recommendation(st.session_state.last_recommendation, load_user_preferences())
+
+def request_recommendation(text):
+    """POST the mood text, warming the preferences cache while the request is in flight"""
+    future = submit(get_session().post, f"{API_URL}/api/mood/text", json={"text": text}, timeout=REQUEST_TIMEOUT)
+    load_user_preferences()  # st.cache_data needs the script thread
+    return future.result()
+
+def display_recommendation(result, user_preferences=None):
     """Display the meal recommendation in a beautifully formatted way"""
     st.markdown('---')
     
-    # Get user's dietary preferences
-    try:
-        prefs_response = requests.get("http://localhost:8000/api/user/preferences/default_user")
-        user_preferences = prefs_response.json() if prefs_response.status_code == 200 else None
-    except:
-        user_preferences = None
-    
     # Display detected mood
     st.markdown(f"""
         <div class="mood-box">
@@ -1,10 +1,16 @@
 import streamlit as st
 import requests
+from http_client import get_session
+from api_cache import clear_user_preferences, load_cuisines, load_dietary_options
+
+DEFAULT_RESTRICTIONS = ["Vegetarian", "Vegan", "Gluten-Free", "Dairy-Free", "Kosher", "Halal", "None"]
+DEFAULT_CUISINES = ["Italian", "Indian", "Chinese", "Japanese", "Mexican", "Mediterranean", "Thai", "American",
+                    "French"]
 
 def check_server_health():
     """Check if the backend server is running and responding"""
     try:
-        response = requests.get("http://localhost:8000/health", timeout=2)
+        response = get_session().get("http://localhost:8000/health", timeout=2)
         return response.status_code == 200
     except:
         return False
@@ -18,18 +24,13 @@ def save_dietary_preferences():
         st.error("⚠️ Backend server is not running. Please start the server and try again.")
         st.info("To start the server, run the backend application first.")
     
-    # Dietary Restrictions
+    # Dietary Restrictions ("None" is offered even when the backend's list lacks it)
+    restriction_options = load_dietary_options(DEFAULT_RESTRICTIONS)
+    if "None" not in restriction_options:
+        restriction_options.append("None")
     restrictions = st.multiselect(
         "Select any dietary restrictions:",
-        options=[
-            "Vegetarian",
-            "Vegan",
-            "Gluten-Free",
-            "Dairy-Free",
-            "Kosher",
-            "Halal",
-            "None"
-        ],
+        options=restriction_options,
         default=[]
     )
     
@@ -53,17 +54,7 @@ def save_dietary_preferences():
     # Preferred Cuisines
     cuisines = st.multiselect(
         "Select your preferred cuisines:",
-        options=[
-            "Italian",
-            "Indian",
-            "Chinese",
-            "Japanese",
-            "Mexican",
-            "Mediterranean",
-            "Thai",
-            "American",
-            "French"
-        ],
+        options=load_cuisines(DEFAULT_CUISINES),
         default=[]
     )
     
@@ -107,13 +98,14 @@ def save_dietary_preferences():
                 return False
 
             # Attempt to save preferences with increased timeout
-            response = requests.post(
+            response = get_session().post(
                 "http://localhost:8000/api/user/preferences",
                 json=preferences,
                 timeout=10  # Increased timeout
             )
             
             if response.status_code == 200:
+                clear_user_preferences()
                 st.success("✅ Preferences saved successfully!")
                 st.balloons()
                 # Store in session state to prevent re-execution
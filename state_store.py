@@ -0,0 +1,511 @@
+"""
+Shared state store for per-user backend state.
+
+``user_last_meal``, ``meal_reminders`` and user preferences used to live in
+module-level dicts and whole-file pickles, so every backend worker saw its own
+copy and the dicts grew without bound. They now go through a ``StateStore``:
+
+- ``SQLiteStateStore`` (default): WAL-mode SQLite file shared by all workers
+  on a box and kept across restarts, with TTL eviction and batched writes.
+- ``InMemoryStateStore``: single-process and lost on restart (tests, load
+  tests); namespaces with TTLs are bounded by LRU eviction.
+
+Values must be JSON-serializable. Pick the implementation with the
+``MEAL_STATE_STORE`` environment variable: ``sqlite:///path/to/state.db``
+(default ``sqlite:///meal_state.db``) or ``memory``. Both the top-level
+backend and the src backend use this module.
+"""
+import json
+import logging
+import os
+import sqlite3
+import copy
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from collections.abc import MutableMapping
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_STATE_STORE = "sqlite:///meal_state.db"
+
+_MISSING = object()
+
+
+def _score(value: Any, score: Optional[float]) -> Optional[float]:
+    """Sort key for range_by_score: the explicit score, else the value itself if it is a number"""
+    if score is not None:
+        return float(score)
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return float(value)
+    return None
+
+
+class StateStore(ABC):
+    """Namespaced key/value store with optional per-key TTL"""
+
+    # True when other processes see this store's writes (e.g. a shared SQLite file)
+    shared = False
+
+    @abstractmethod
+    def get(self, namespace: str, key: str, default: Any = None) -> Any:
+        """Return the value for key, or default if missing or expired"""
+
+    @abstractmethod
+    def set(self, namespace: str, key: str, value: Any, ttl: Optional[float] = None,
+            score: Optional[float] = None) -> None:
+        """Store a JSON-serializable value, expiring after ttl seconds if given.
+        score (default: the value, if it is a number) orders the key for range_by_score."""
+
+    @abstractmethod
+    def delete(self, namespace: str, key: str) -> None:
+        """Remove a key (no error if missing)"""
+
+    @abstractmethod
+    def items(self, namespace: str) -> Iterator[Tuple[str, Any]]:
+        """Iterate over unexpired (key, value) pairs in a namespace"""
+
+    @abstractmethod
+    def count(self, namespace: str) -> int:
+        """Number of unexpired keys in a namespace"""
+
+    @abstractmethod
+    def evict_expired(self) -> int:
+        """Drop expired keys; returns how many were removed"""
+
+    @abstractmethod
+    def claim(self, namespace: str, key: str, expected: Any) -> bool:
+        """Atomically delete key if it still holds expected; True for the one caller that did"""
+
+    @abstractmethod
+    def update(self, namespace: str, key: str, fn: Callable[[Any], Any], default: Any = None,
+               ttl: Optional[float] = None) -> Any:
+        """Atomically replace key's value (or default) with fn(value); returns the new value"""
+
+    @abstractmethod
+    def range_by_score(self, namespace: str, above: Optional[float] = None, upto: Optional[float] = None,
+                       limit: int = 1000) -> Iterator[Tuple[str, Any, float]]:
+        """Unexpired (key, value, score) with above < score <= upto, lowest score first"""
+
+    def flush(self) -> None:
+        """Persist any buffered writes (no-op for unbuffered stores)"""
+
+    def close(self) -> None:
+        self.flush()
+
+    @contextmanager
+    def batch(self):
+        """Group many writes; buffered stores flush once at the end"""
+        yield self
+
+    def namespace(self, name: str, ttl: Optional[float] = None) -> "StoreNamespace":
+        """Dict-like view over one namespace"""
+        return StoreNamespace(self, name, ttl)
+
+
+class StoreNamespace(MutableMapping):
+    """MutableMapping adapter over a single namespace of a StateStore.
+
+    Values are copies: mutate the returned object and assign it back to persist,
+    or use ``update`` when concurrent writers may change the same key.
+    """
+
+    def __init__(self, store: StateStore, name: str, ttl: Optional[float] = None):
+        self.store = store
+        self.name = name
+        self.ttl = ttl
+
+    def __getitem__(self, key: str) -> Any:
+        value = self.store.get(self.name, key, _MISSING)
+        if value is _MISSING:
+            raise KeyError(key)
+        return value
+
+    def __setitem__(self, key: str, value: Any) -> None:
+        self.store.set(self.name, key, value, ttl=self.ttl)
+
+    def __delitem__(self, key: str) -> None:
+        if key not in self:
+            raise KeyError(key)
+        self.store.delete(self.name, key)
+
+    def __contains__(self, key: object) -> bool:
+        return self.store.get(self.name, key, _MISSING) is not _MISSING
+
+    def __iter__(self) -> Iterator[str]:
+        return (key for key, _ in self.store.items(self.name))
+
+    def __len__(self) -> int:
+        return self.store.count(self.name)
+
+    def items(self):
+        return list(self.store.items(self.name))
+
+    def update(self, key: str, fn: Callable[[Any], Any], default: Any = None) -> Any:
+        return self.store.update(self.name, key, fn, default, ttl=self.ttl)
+
+
+class InMemoryStateStore(StateStore):
+    """Process-local store; namespaces whose entries expire are bounded with LRU eviction.
+
+    A namespace that holds any entry without a TTL (e.g. preferences) is never
+    LRU-evicted: those entries are records, not cache.
+    """
+
+    def __init__(self, max_entries_per_namespace: int = 100_000, sweep_interval: float = 60.0):
+        self.max_entries = max_entries_per_namespace
+        self.sweep_interval = sweep_interval
+        # key -> (JSON value, expires_at, score)
+        self._data: Dict[str, "OrderedDict[str, Tuple[str, Optional[float], Optional[float]]]"] = {}
+        self._durable_namespaces = set()
+        self._lock = threading.RLock()
+        self._last_sweep = time.time()
+
+    def _namespace(self, namespace: str) -> "OrderedDict[str, Tuple[str, Optional[float], Optional[float]]]":
+        return self._data.setdefault(namespace, OrderedDict())
+
+    def get(self, namespace: str, key: str, default: Any = None) -> Any:
+        with self._lock:
+            entries = self._namespace(namespace)
+            entry = entries.get(key)
+            if entry is None:
+                return default
+            value, expires_at, _ = entry
+            if expires_at is not None and expires_at <= time.time():
+                del entries[key]
+                return default
+            entries.move_to_end(key)
+            return json.loads(value)
+
+    def set(self, namespace: str, key: str, value: Any, ttl: Optional[float] = None,
+            score: Optional[float] = None) -> None:
+        expires_at = time.time() + ttl if ttl else None
+        encoded = json.dumps(value)
+        with self._lock:
+            entries = self._namespace(namespace)
+            entries[key] = (encoded, expires_at, _score(value, score))
+            entries.move_to_end(key)
+            if expires_at is None:
+                self._durable_namespaces.add(namespace)
+            if time.time() - self._last_sweep > self.sweep_interval:
+                self.evict_expired()
+            if namespace not in self._durable_namespaces:
+                while len(entries) > self.max_entries:
+                    entries.popitem(last=False)
+
+    def delete(self, namespace: str, key: str) -> None:
+        with self._lock:
+            self._namespace(namespace).pop(key, None)
+
+    def items(self, namespace: str) -> Iterator[Tuple[str, Any]]:
+        now = time.time()
+        with self._lock:
+            snapshot = list(self._namespace(namespace).items())
+        for key, (value, expires_at, _) in snapshot:
+            if expires_at is None or expires_at > now:
+                yield key, json.loads(value)
+
+    def count(self, namespace: str) -> int:
+        now = time.time()
+        with self._lock:
+            return sum(
+                1 for _, expires_at, _ in self._namespace(namespace).values()
+                if expires_at is None or expires_at > now
+            )
+
+    def range_by_score(self, namespace: str, above: Optional[float] = None, upto: Optional[float] = None,
+                       limit: int = 1000) -> Iterator[Tuple[str, Any, float]]:
+        now = time.time()
+        with self._lock:
+            matches = [
+                (key, value, score) for key, (value, expires_at, score) in self._namespace(namespace).items()
+                if score is not None and (above is None or score > above) and (upto is None or score <= upto)
+                and (expires_at is None or expires_at > now)
+            ]
+        matches.sort(key=lambda match: match[2])
+        return iter([(key, json.loads(value), score) for key, value, score in matches[:limit]])
+
+    def update(self, namespace: str, key: str, fn: Callable[[Any], Any], default: Any = None,
+               ttl: Optional[float] = None) -> Any:
+        with self._lock:
+            value = fn(self.get(namespace, key, copy.deepcopy(default)))
+            self.set(namespace, key, value, ttl=ttl)
+            return value
+
+    def claim(self, namespace: str, key: str, expected: Any) -> bool:
+        with self._lock:
+            entries = self._namespace(namespace)
+            entry = entries.get(key)
+            if entry is None or entry[0] != json.dumps(expected):
+                return False
+            if entry[1] is not None and entry[1] <= time.time():
+                return False
+            del entries[key]
+            return True
+
+    def evict_expired(self) -> int:
+        now = time.time()
+        removed = 0
+        with self._lock:
+            for entries in self._data.values():
+                expired = [key for key, (_, expires_at, _) in entries.items()
+                           if expires_at is not None and expires_at <= now]
+                for key in expired:
+                    del entries[key]
+                removed += len(expired)
+            self._last_sweep = now
+        return removed
+
+
+class SQLiteStateStore(StateStore):
+    """SQLite (WAL) store shared by every worker process on the box.
+
+    Writes are buffered and flushed in one transaction once ``batch_size``
+    writes are pending or ``flush_interval`` seconds have passed, so other
+    processes see a write at most ``flush_interval`` seconds late. Reads in the
+    writing process see their own buffered writes immediately.
+
+    Scores (numeric values, or an explicit ``score``) are stored in an indexed
+    column, so ``range_by_score`` (reminders due before a time, events after
+    the last one seen) is a range scan.
+    """
+
+    shared = True
+    _DELETE = object()
+
+    def __init__(self, path: str = "meal_state.db", batch_size: int = 100,
+                 flush_interval: float = 0.5, evict_interval: float = 60.0):
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.evict_interval = evict_interval
+        self._open()
+        if hasattr(os, "register_at_fork"):
+            # Connections, locks and threads do not survive fork (pre-fork serving)
+            os.register_at_fork(after_in_child=self._open)
+
+    def _open(self):
+        """(Re)open the connection; runs again in every forked child"""
+        self._pid = os.getpid()
+        self._lock = threading.RLock()
+        self._batch_depth = 0
+        self._conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS state ("
+            " namespace TEXT NOT NULL,"
+            " key TEXT NOT NULL,"
+            " value TEXT NOT NULL,"
+            " expires_at REAL,"
+            " score REAL,"
+            " PRIMARY KEY (namespace, key))"
+        )
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(state)")}
+        if "score" not in columns:
+            # Files created before the score column: index the numbers already stored
+            self._conn.execute("ALTER TABLE state ADD COLUMN score REAL")
+            self._conn.execute(
+                "UPDATE state SET score = CAST(value AS REAL)"
+                " WHERE substr(value, 1, 1) IN ('-', '0', '1', '2', '3', '4', '5', '6', '7', '8', '9')"
+            )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS state_expires_at ON state (expires_at)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS state_score ON state (namespace, score)")
+        self._pending: Dict[Tuple[str, str], Any] = {}
+        self._last_flush = time.time()
+        self._last_evict = time.time()
+        self._stop = threading.Event()
+        self._flusher = threading.Thread(target=self._flush_loop, name="state-store-flush", daemon=True)
+        self._flusher.start()
+
+    def _flush_loop(self):
+        while not self._stop.wait(self.flush_interval):
+            if os.getpid() != self._pid:
+                return
+            try:
+                self.flush()
+                if time.time() - self._last_evict > self.evict_interval:
+                    self.evict_expired()
+            except Exception as e:
+                logger.error(f"Error flushing state store: {e}")
+
+    def get(self, namespace: str, key: str, default: Any = None) -> Any:
+        with self._lock:
+            pending = self._pending.get((namespace, key), _MISSING)
+            if pending is not _MISSING:
+                if pending is self._DELETE:
+                    return default
+                value, expires_at, _ = pending
+                if expires_at is not None and expires_at <= time.time():
+                    return default
+                return json.loads(value)
+
+            row = self._conn.execute(
+                "SELECT value FROM state WHERE namespace = ? AND key = ? AND (expires_at IS NULL OR expires_at > ?)",
+                (namespace, key, time.time())
+            ).fetchone()
+        return json.loads(row[0]) if row else default
+
+    def set(self, namespace: str, key: str, value: Any, ttl: Optional[float] = None,
+            score: Optional[float] = None) -> None:
+        expires_at = time.time() + ttl if ttl else None
+        encoded = json.dumps(value)
+        with self._lock:
+            self._pending[(namespace, key)] = (encoded, expires_at, _score(value, score))
+            self._maybe_flush()
+
+    def delete(self, namespace: str, key: str) -> None:
+        with self._lock:
+            self._pending[(namespace, key)] = self._DELETE
+            self._maybe_flush()
+
+    def _maybe_flush(self):
+        if self._batch_depth:
+            return
+        if len(self._pending) >= self.batch_size or time.time() - self._last_flush > self.flush_interval:
+            self.flush()
+
+    def flush(self) -> None:
+        with self._lock:
+            self._last_flush = time.time()
+            if not self._pending:
+                return
+            upserts = []
+            deletes = []
+            for (namespace, key), pending in self._pending.items():
+                if pending is self._DELETE:
+                    deletes.append((namespace, key))
+                else:
+                    upserts.append((namespace, key) + pending)
+            try:
+                self._conn.execute("BEGIN IMMEDIATE")
+                if upserts:
+                    self._conn.executemany(
+                        "INSERT OR REPLACE INTO state (namespace, key, value, expires_at, score) VALUES (?, ?, ?, ?, ?)",
+                        upserts
+                    )
+                if deletes:
+                    self._conn.executemany("DELETE FROM state WHERE namespace = ? AND key = ?", deletes)
+                self._conn.execute("COMMIT")
+                self._pending.clear()
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    @contextmanager
+    def batch(self):
+        with self._lock:
+            self._batch_depth += 1
+        try:
+            yield self
+        finally:
+            with self._lock:
+                self._batch_depth -= 1
+                if not self._batch_depth:
+                    self.flush()
+
+    def items(self, namespace: str) -> Iterator[Tuple[str, Any]]:
+        self.flush()
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT key, value FROM state WHERE namespace = ? AND (expires_at IS NULL OR expires_at > ?)",
+                (namespace, time.time())
+            ).fetchall()
+        for key, value in rows:
+            yield key, json.loads(value)
+
+    def count(self, namespace: str) -> int:
+        self.flush()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT COUNT(*) FROM state WHERE namespace = ? AND (expires_at IS NULL OR expires_at > ?)",
+                (namespace, time.time())
+            ).fetchone()
+        return row[0]
+
+    def range_by_score(self, namespace: str, above: Optional[float] = None, upto: Optional[float] = None,
+                       limit: int = 1000) -> Iterator[Tuple[str, Any, float]]:
+        self.flush()
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT key, value, score FROM state WHERE namespace = ? AND score > ? AND score <= ?"
+                " AND (expires_at IS NULL OR expires_at > ?) ORDER BY score LIMIT ?",
+                (namespace, float("-inf") if above is None else above, float("inf") if upto is None else upto,
+                 time.time(), limit)
+            ).fetchall()
+        return iter([(key, json.loads(value), score) for key, value, score in rows])
+
+    def update(self, namespace: str, key: str, fn: Callable[[Any], Any], default: Any = None,
+               ttl: Optional[float] = None) -> Any:
+        # Read and write in one write transaction: other processes' updates of the key wait for it
+        with self._lock:
+            self.flush()
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = self._conn.execute(
+                    "SELECT value FROM state WHERE namespace = ? AND key = ? AND (expires_at IS NULL OR expires_at > ?)",
+                    (namespace, key, time.time())
+                ).fetchone()
+                value = fn(json.loads(row[0]) if row else copy.deepcopy(default))
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO state (namespace, key, value, expires_at, score) VALUES (?, ?, ?, ?, ?)",
+                    (namespace, key, json.dumps(value), time.time() + ttl if ttl else None, _score(value, None))
+                )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        return value
+
+    def claim(self, namespace: str, key: str, expected: Any) -> bool:
+        # One conditional DELETE is atomic across processes sharing the file
+        self.flush()
+        with self._lock:
+            cursor = self._conn.execute(
+                "DELETE FROM state WHERE namespace = ? AND key = ? AND value = ?"
+                " AND (expires_at IS NULL OR expires_at > ?)",
+                (namespace, key, json.dumps(expected), time.time())
+            )
+            return cursor.rowcount == 1
+
+    def evict_expired(self) -> int:
+        with self._lock:
+            self._last_evict = time.time()
+            cursor = self._conn.execute(
+                "DELETE FROM state WHERE expires_at IS NOT NULL AND expires_at <= ?", (time.time(),)
+            )
+            return cursor.rowcount
+
+    def close(self) -> None:
+        self._stop.set()
+        self.flush()
+        self._conn.close()
+
+
+def create_state_store(url: Optional[str] = None) -> StateStore:
+    """Build a store from a URL such as 'sqlite:///meal_state.db' (default) or 'memory'"""
+    url = url or os.environ.get("MEAL_STATE_STORE") or DEFAULT_STATE_STORE
+    if url == "memory":
+        return InMemoryStateStore()
+    if url.startswith("sqlite:///"):
+        return SQLiteStateStore(url[len("sqlite:///"):])
+    if url.endswith(".db"):
+        return SQLiteStateStore(url)
+    raise ValueError(f"Unsupported state store: {url}")
+
+
+_default_store: Optional[StateStore] = None
+_default_store_lock = threading.Lock()
+
+
+def get_default_store() -> StateStore:
+    """Process-wide store configured from MEAL_STATE_STORE"""
+    global _default_store
+    if _default_store is None:
+        with _default_store_lock:
+            if _default_store is None:
+                _default_store = create_state_store()
+    return _default_store
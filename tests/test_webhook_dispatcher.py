@@ -0,0 +1,205 @@
+"""
+Retry, spill and replay behaviour of WebhookDispatcher against a local stub server.
+
+    python -m pytest -q tests/test_webhook_dispatcher.py
+"""
+import json
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from webhook_dispatcher import WebhookDispatcher
+
+
+class StubServer:
+    """Answers POSTs with the next status from `statuses` (then 200) and records accepted bodies"""
+
+    def __init__(self, statuses=()):
+        self.statuses = list(statuses)
+        self.calls = 0
+        self.received = []
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))))
+                stub.calls += 1
+                status = stub.statuses.pop(0) if stub.statuses else 200
+                if status == 200:
+                    stub.received.append(body)
+                self.send_response(status)
+                self.end_headers()
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}/webhook-tired"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+@pytest.fixture
+def stub():
+    servers = []
+
+    def make(statuses=()):
+        server = StubServer(statuses)
+        servers.append(server)
+        return server
+
+    yield make
+    for server in servers:
+        server.close()
+
+
+@pytest.fixture
+def spill_path(tmp_path):
+    return str(tmp_path / "spill.jsonl")
+
+
+def make_dispatcher(url, spill_path, **kwargs):
+    options = dict(backoff_base=0.01, flush_interval=0.02, replay_interval=3600, spill_path=spill_path)
+    options.update(kwargs)
+    return WebhookDispatcher(url, **options)
+
+
+def read_spill(path):
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def wait_for(condition, timeout=5.0):
+    deadline = time.time() + timeout
+    while not condition():
+        assert time.time() < deadline, "timed out"
+        time.sleep(0.01)
+
+
+def test_transient_failures_are_retried(stub, spill_path):
+    server = stub([500, 429])
+    dispatcher = make_dispatcher(server.url, spill_path, max_retries=3)
+    try:
+        dispatcher.submit({"user": "u1", "mood": ["Tired"]})
+        assert dispatcher.flush(5)
+    finally:
+        dispatcher.stop()
+
+    assert server.calls == 3
+    assert server.received == [{"user": "u1", "mood": ["Tired"]}]
+    assert dispatcher.stats["retried"] == 2
+    assert dispatcher.stats["sent"] == 1
+    assert not os.path.exists(spill_path)
+
+
+def test_client_errors_are_dropped_without_retry(stub, spill_path):
+    server = stub([400])
+    dispatcher = make_dispatcher(server.url, spill_path, max_retries=3)
+    try:
+        dispatcher.submit({"user": "u1"})
+        assert dispatcher.flush(5)
+    finally:
+        dispatcher.stop()
+
+    assert server.calls == 1
+    assert dispatcher.stats["dropped"] == 1
+    assert dispatcher.stats["retried"] == 0
+
+
+def test_exhausted_retries_spill_with_attempt_count(stub, spill_path):
+    server = stub([500] * 10)
+    dispatcher = make_dispatcher(server.url, spill_path, max_retries=1)
+    try:
+        dispatcher.submit({"user": "u1"})
+        assert dispatcher.flush(5)
+    finally:
+        dispatcher.stop()
+
+    assert server.calls == 2
+    [entry] = read_spill(spill_path)
+    assert entry["event"] == {"user": "u1"}
+    assert entry["attempts"] == 1
+    assert entry["first_seen"] <= time.time()
+    assert dispatcher.stats["spilled"] == 1
+
+
+def test_queue_overflow_spills_without_counting_an_attempt(stub, spill_path):
+    server = stub()
+    # Never drains: the sender only wakes up for a full batch or after an hour
+    dispatcher = make_dispatcher(server.url, spill_path, max_queue=2, batch_size=10, flush_interval=3600)
+    try:
+        assert dispatcher.submit({"user": "u1"})
+        assert dispatcher.submit({"user": "u2"})
+        assert not dispatcher.submit({"user": "u3"})
+        [entry] = read_spill(spill_path)
+        assert entry["event"] == {"user": "u3"}
+        assert entry["attempts"] == 0
+    finally:
+        dispatcher.stop()
+
+
+def test_spilled_events_are_replayed(stub, spill_path):
+    now = time.time()
+    with open(spill_path, "w", encoding="utf-8") as f:
+        f.write(json.dumps({"event": {"user": "u1"}, "attempts": 2, "first_seen": now}) + "\n")
+        f.write(json.dumps({"user": "u2"}) + "\n")  # bare event from an older spill file
+    server = stub()
+    dispatcher = make_dispatcher(server.url, spill_path, replay_interval=0)
+    try:
+        dispatcher.start()
+        wait_for(lambda: len(server.received) == 2)
+        assert dispatcher.flush(5)
+    finally:
+        dispatcher.stop()
+
+    assert sorted(event["user"] for event in server.received) == ["u1", "u2"]
+    assert dispatcher.stats["replayed"] == 2
+    assert dispatcher.stats["submitted"] == 0
+    assert not os.path.exists(spill_path)
+
+
+def test_spilled_events_are_dropped_after_the_cap(stub, spill_path):
+    now = time.time()
+    with open(spill_path, "w", encoding="utf-8") as f:
+        f.write(json.dumps({"event": {"user": "tries"}, "attempts": 3, "first_seen": now}) + "\n")
+        f.write(json.dumps({"event": {"user": "old"}, "attempts": 0, "first_seen": now - 7200}) + "\n")
+        f.write(json.dumps({"event": {"user": "fresh"}, "attempts": 0, "first_seen": now}) + "\n")
+    server = stub()
+    dispatcher = make_dispatcher(server.url, spill_path, replay_interval=0,
+                                 max_spill_attempts=3, max_spill_age=3600)
+    try:
+        dispatcher.start()
+        wait_for(lambda: dispatcher.stats["replayed"] == 1)
+        assert dispatcher.flush(5)
+    finally:
+        dispatcher.stop()
+
+    assert server.received == [{"user": "fresh"}]
+    assert dispatcher.stats["dropped"] == 2
+
+
+def test_failing_event_stops_cycling_through_the_spill_file(stub, spill_path):
+    server = stub([500] * 100)
+    dispatcher = make_dispatcher(server.url, spill_path, max_retries=0, replay_interval=0,
+                                 max_spill_attempts=3)
+    try:
+        dispatcher.submit({"user": "u1"})
+        wait_for(lambda: dispatcher.stats["dropped"] == 1)
+        assert dispatcher.flush(5)
+    finally:
+        dispatcher.stop()
+
+    # One POST per delivery round, then dropped instead of spilled a third time
+    assert server.calls == 3
+    assert dispatcher.stats["spilled"] == 2
+    assert dispatcher.stats["replayed"] == 2
+    assert dispatcher.stats["submitted"] == 1
+    assert not os.path.exists(spill_path) or read_spill(spill_path) == []
@@ -4,12 +4,12 @@ import pickle
 import json
 import os
 from typing import List, Dict, Tuple, Optional
-from sentence_transformers import SentenceTransformer
-from transformers import pipeline, AutoTokenizer, AutoModelForCausalLM
-import torch
 from datetime import datetime
 import logging
 
+from model_registry import registry
+from deadline import Deadline, stage_timings
+
 # Set up logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -18,27 +18,21 @@ class VectorMealEngine:
     def __init__(self, meal_data_path: str = "meal.json"):
         """Initialize the vector-based meal recommendation engine"""
         
-        # Load sentence transformer for embeddings
+        # Models come from the shared registry so they are loaded once per process
         logger.info("Loading sentence transformer model...")
-        self.sentence_model = SentenceTransformer('all-MiniLM-L6-v2')
+        self.sentence_model = registry.get("sentence_encoder")
         
         # Load small language model for text generation
         logger.info("Loading small language model...")
-        self.tokenizer = AutoTokenizer.from_pretrained("microsoft/DialoGPT-small")
-        self.language_model = AutoModelForCausalLM.from_pretrained("microsoft/DialoGPT-small")
+        try:
+            self.tokenizer, self.language_model = registry.get("dialogpt")
+        except Exception as e:
+            logger.warning(f"Could not load DialoGPT model: {e}")
+            self.tokenizer, self.language_model = None, None
         
         # Alternative: Use a smaller, faster model
         try:
-            self.text_generator = pipeline(
-                "text-generation",
-                model="distilgpt2",
-                tokenizer="distilgpt2",
-                max_length=150,
-                num_return_sequences=1,
-                temperature=0.7,
-                do_sample=True,
-                pad_token_id=50256
-            )
+            self.text_generator = registry.get("text_generator")
         except Exception as e:
             logger.warning(f"Could not load text generation model: {e}")
             self.text_generator = None
@@ -48,6 +42,7 @@ class VectorMealEngine:
         
         # Initialize FAISS index
         self.embedding_dim = 384  # Dimension for all-MiniLM-L6-v2
+        self.catalog_version = 0  # Bumped whenever meal embeddings change
         self.faiss_index = None
         self.meal_embeddings = None
         self.meal_texts = []
@@ -87,9 +82,11 @@ class VectorMealEngine:
         logger.info("Vector meal engine initialized successfully!")
     
     def load_meal_data(self, filepath: str) -> List[Dict]:
-        """Load meal data from JSON file"""
+        """Load meal data from a JSON (or JSON Lines) file"""
         try:
             with open(filepath, 'r', encoding='utf-8') as f:
+                if filepath.endswith('.jsonl'):
+                    return [json.loads(line) for line in f if line.strip()]
                 return json.load(f)
         except Exception as e:
             logger.error(f"Error loading meal data: {e}")
@@ -173,19 +170,22 @@ class VectorMealEngine:
             logger.error(f"Error loading index: {e}")
         return False
     
+    def build_query_text(self, mood_text: str, mood1: str = None, mood2: str = None) -> str:
+        """Combine text description with mood keywords into a single query string"""
+        query_parts = [mood_text]
+        
+        if mood1 and mood1 in self.mood_descriptions:
+            query_parts.append(self.mood_descriptions[mood1])
+        
+        if mood2 and mood2 in self.mood_descriptions:
+            query_parts.append(self.mood_descriptions[mood2])
+        
+        return " ".join(query_parts)
+    
     def encode_mood_query(self, mood_text: str, mood1: str = None, mood2: str = None) -> np.ndarray:
         """Encode mood query into vector representation"""
         try:
-            # Combine text description with mood keywords
-            query_parts = [mood_text]
-            
-            if mood1 and mood1 in self.mood_descriptions:
-                query_parts.append(self.mood_descriptions[mood1])
-            
-            if mood2 and mood2 in self.mood_descriptions:
-                query_parts.append(self.mood_descriptions[mood2])
-            
-            query_text = " ".join(query_parts)
+            query_text = self.build_query_text(mood_text, mood1, mood2)
             
             # Generate embedding
             query_embedding = self.sentence_model.encode([query_text])
@@ -216,24 +216,67 @@ class VectorMealEngine:
             logger.error(f"Error in vector search: {e}")
             return []
     
-    def generate_explanation(self, meal: Dict, mood_text: str, mood1: str, mood2: str) -> str:
-        """Generate explanation using small language model"""
+    def encode_mood_queries(self, queries: List[Tuple[str, Optional[str], Optional[str]]],
+                            batch_size: int = 64) -> np.ndarray:
+        """Encode many (mood_text, mood1, mood2) queries in one batched model call"""
+        try:
+            query_texts = [self.build_query_text(*query) for query in queries]
+            query_embeddings = self.sentence_model.encode(query_texts, batch_size=batch_size)
+            query_embeddings = np.ascontiguousarray(query_embeddings, dtype='float32')
+            faiss.normalize_L2(query_embeddings)
+            return query_embeddings
+        except Exception as e:
+            logger.error(f"Error encoding mood queries: {e}")
+            return np.zeros((len(queries), self.embedding_dim), dtype='float32')
+    
+    def vector_search_batch(self, query_embeddings: np.ndarray, k: int = 5) -> List[List[Tuple[int, float]]]:
+        """Run a single FAISS search for a matrix of query embeddings"""
+        try:
+            if self.faiss_index is None:
+                logger.error("FAISS index not initialized")
+                return [[] for _ in range(len(query_embeddings))]
+            
+            query_embeddings = np.ascontiguousarray(query_embeddings, dtype='float32')
+            scores, indices = self.faiss_index.search(query_embeddings, k)
+            
+            return [
+                [(int(idx), float(score)) for idx, score in zip(row_indices, row_scores) if idx >= 0]
+                for row_indices, row_scores in zip(indices, scores)
+            ]
+            
+        except Exception as e:
+            logger.error(f"Error in batched vector search: {e}")
+            return [[] for _ in range(len(query_embeddings))]
+    
+    def generate_explanation(self, meal: Dict, mood_text: str, mood1: str, mood2: str,
+                             deadline: Optional[Deadline] = None) -> str:
+        """Generate explanation using small language model (rule-based if it would miss the deadline)"""
         try:
             if self.text_generator is None:
                 return self.generate_simple_explanation(meal, mood_text, mood1, mood2)
             
+            generation_kwargs = {}
+            if deadline is not None and deadline.bounded:
+                if not stage_timings.fits(deadline, "generate_explanation"):
+                    meal['explanation_degraded'] = True
+                    return self.generate_simple_explanation(meal, mood_text, mood1, mood2)
+                # Stop generating once the deadline passes
+                generation_kwargs['max_time'] = deadline.remaining()
+            
             # Create prompt for text generation
             prompt = f"You are feeling {mood1} and {mood2}. The recommended meal is {meal['meal_name']}. This meal helps because {meal['reason']} and provides {meal['benefit']}. Here's why this is perfect for you:"
             
             # Generate explanation
-            generated = self.text_generator(
-                prompt,
-                max_length=len(prompt.split()) + 50,
-                num_return_sequences=1,
-                temperature=0.7,
-                do_sample=True,
-                pad_token_id=50256
-            )
+            with stage_timings.measure("generate_explanation"):
+                generated = self.text_generator(
+                    prompt,
+                    max_length=len(prompt.split()) + 50,
+                    num_return_sequences=1,
+                    temperature=0.7,
+                    do_sample=True,
+                    pad_token_id=50256,
+                    **generation_kwargs
+                )
             
             # Extract generated text
             full_text = generated[0]['generated_text']
@@ -270,14 +313,17 @@ class VectorMealEngine:
         return " ".join(explanations[:3])  # Return first 3 sentences
     
     def recommend_meals(self, mood_text: str, mood1: str = None, mood2: str = None, 
-                       user_preferences: Dict = None, k: int = 3) -> List[Dict]:
+                       user_preferences: Dict = None, k: int = 3,
+                       deadline: Optional[Deadline] = None) -> List[Dict]:
         """Get meal recommendations using vector search"""
         try:
             # Encode the mood query
-            query_embedding = self.encode_mood_query(mood_text, mood1, mood2)
+            with stage_timings.measure("encode_query"):
+                query_embedding = self.encode_mood_query(mood_text, mood1, mood2)
             
             # Perform vector search
-            search_results = self.vector_search(query_embedding, k=k*2)  # Get more results for filtering
+            with stage_timings.measure("vector_search"):
+                search_results = self.vector_search(query_embedding, k=k*2)  # Get more results for filtering
             
             recommendations = []
             
@@ -285,20 +331,71 @@ class VectorMealEngine:
                 if idx < len(self.meal_data):
                     meal = self.meal_data[idx].copy()
                     meal['similarity_score'] = score
-                    meal['explanation'] = self.generate_explanation(meal, mood_text, mood1 or "", mood2 or "")
                     recommendations.append(meal)
             
             # Filter by user preferences if provided
             if user_preferences:
                 recommendations = self.filter_by_preferences(recommendations, user_preferences)
             
-            # Return top k recommendations
-            return recommendations[:k]
+            # Explain only the top k; each explanation checks the remaining budget
+            recommendations = recommendations[:k]
+            for meal in recommendations:
+                meal['explanation'] = self.generate_explanation(meal, mood_text, mood1 or "", mood2 or "", deadline)
+            
+            return recommendations
             
         except Exception as e:
             logger.error(f"Error in meal recommendation: {e}")
             return []
     
+    def recommend_meals_batch(self, queries: List[Dict], k: int = 1,
+                              include_explanation: bool = True,
+                              deadline: Optional[Deadline] = None) -> List[List[Dict]]:
+        """
+        Get recommendations for many queries at once.
+        
+        Each query is a dict with ``mood_text`` and optional ``mood1``, ``mood2`` and
+        ``user_preferences``. Queries are encoded in one batch and searched with a
+        single FAISS call; preference filtering runs per query, and explanations are
+        only generated for the final top-k picks.
+        """
+        if not queries:
+            return []
+        
+        try:
+            query_embeddings = self.encode_mood_queries([
+                (query['mood_text'], query.get('mood1'), query.get('mood2'))
+                for query in queries
+            ])
+            search_results = self.vector_search_batch(query_embeddings, k=k*2)
+            
+            batch_recommendations = []
+            for query, results in zip(queries, search_results):
+                recommendations = []
+                for idx, score in results:
+                    if idx < len(self.meal_data):
+                        meal = self.meal_data[idx].copy()
+                        meal['similarity_score'] = score
+                        recommendations.append(meal)
+                
+                user_preferences = query.get('user_preferences')
+                if user_preferences:
+                    recommendations = self.filter_by_preferences(recommendations, user_preferences)
+                
+                recommendations = recommendations[:k]
+                if include_explanation:
+                    for meal in recommendations:
+                        meal['explanation'] = self.generate_explanation(
+                            meal, query['mood_text'], query.get('mood1') or "", query.get('mood2') or "", deadline
+                        )
+                batch_recommendations.append(recommendations)
+            
+            return batch_recommendations
+            
+        except Exception as e:
+            logger.error(f"Error in batched meal recommendation: {e}")
+            return [[] for _ in queries]
+    
     def filter_by_preferences(self, meals: List[Dict], preferences: Dict) -> List[Dict]:
         """Filter meals based on user preferences"""
         try:
@@ -389,6 +486,7 @@ class VectorMealEngine:
                     # Update the FAISS index
                     self.faiss_index = faiss.IndexFlatIP(self.embedding_dim)
                     self.faiss_index.add(self.meal_embeddings.astype('float32'))
+                    self.catalog_version += 1
                     
                     logger.info(f"Updated embedding for {meal_name} based on positive feedback")
                 
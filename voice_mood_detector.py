@@ -1,14 +1,17 @@
 import sounddevice as sd
 import numpy as np
-import librosa
+from audio_features import voice_feature_summary
+from audio_feature_pool import FeaturePoolUnavailable
 import scipy.io.wavfile as wav
 import os
 from datetime import datetime
 
 class VoiceMoodDetector:
-    def __init__(self):
+    def __init__(self, feature_profile=None, feature_pool=None):
         self.sample_rate = 44100
         self.duration = 5  # Record for 5 seconds
+        self.feature_profile = feature_profile  # "full" / "fast"; None = MEAL_AUDIO_FEATURE_PROFILE
+        self.feature_pool = feature_pool  # optional AudioFeaturePool (worker processes)
         
     def record_voice(self):
         """Record voice input from microphone"""
@@ -27,25 +30,13 @@ class VoiceMoodDetector:
         if len(audio_data.shape) > 1:
             audio_data = audio_data.mean(axis=1)
         
-        # Extract features
-        mfcc = librosa.feature.mfcc(y=audio_data.flatten(), sr=self.sample_rate, n_mfcc=13)
-        spectral_centroids = librosa.feature.spectral_centroid(y=audio_data.flatten(), sr=self.sample_rate)
-        zero_crossing_rate = librosa.feature.zero_crossing_rate(audio_data.flatten())
-        
-        # Calculate energy and other features
-        energy = np.sum(np.abs(audio_data)**2) / len(audio_data)
-        pitch = librosa.yin(audio_data.flatten(), fmin=50, fmax=500, sr=self.sample_rate)
-        
-        # Combine features
-        features = {
-            'mfcc_mean': np.mean(mfcc),
-            'spectral_centroid_mean': np.mean(spectral_centroids),
-            'zero_crossing_rate_mean': np.mean(zero_crossing_rate),
-            'energy': energy,
-            'pitch_mean': np.mean(pitch)
-        }
-        
-        return features
+        # MFCC and spectral centroid share one STFT; the fast profile also skips yin
+        if self.feature_pool is not None and self.feature_pool.enabled:
+            try:
+                return self.feature_pool.voice_features(audio_data.flatten(), self.sample_rate, self.feature_profile)
+            except FeaturePoolUnavailable:
+                pass  # the pool failed to start: extract in this thread
+        return voice_feature_summary(audio_data.flatten(), self.sample_rate, self.feature_profile)
 
     def detect_mood(self, features):
         """Detect mood based on audio features"""
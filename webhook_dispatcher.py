@@ -0,0 +1,344 @@
+"""
+Background webhook dispatcher (used for the n8n "tired" notification).
+
+``submit`` never blocks the request path: events go into a bounded in-memory
+queue that a background thread drains with a pooled ``httpx.AsyncClient``.
+
+- Coalescing: a newer event for the same key (e.g. user) replaces the queued one.
+- Batching: up to ``batch_size`` queued events are sent concurrently per drain.
+- Retries: 5xx, 429 and network errors are retried with exponential backoff
+  and jitter; other 4xx responses are dropped.
+- Spill to disk: events that overflow the queue or exhaust their retries are
+  appended to a JSONL file and replayed once the queue has room again. Each
+  spilled line keeps the event's failed delivery rounds and when it was first
+  submitted; after ``max_spill_attempts`` rounds or ``max_spill_age`` seconds
+  the event is dropped instead of being replayed forever.
+
+Run ``python webhook_dispatcher.py`` for a demo against a local stub server.
+"""
+import asyncio
+import atexit
+import itertools
+import json
+import logging
+import os
+import random
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class WebhookDispatcher:
+    def __init__(
+        self,
+        url: str,
+        max_queue: int = 1000,
+        batch_size: int = 50,
+        flush_interval: float = 0.5,
+        max_retries: int = 4,
+        backoff_base: float = 0.5,
+        timeout: float = 5.0,
+        max_connections: int = 10,
+        coalesce_key: Optional[str] = "user",
+        spill_path: str = "webhook_spill.jsonl",
+        replay_interval: float = 30.0,
+        max_spill_attempts: int = 5,
+        max_spill_age: float = 24 * 3600
+    ):
+        self.url = url
+        self.max_queue = max_queue
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.timeout = timeout
+        self.max_connections = max_connections
+        self.coalesce_key = coalesce_key
+        self.spill_path = spill_path
+        self.replay_interval = replay_interval
+        self.max_spill_attempts = max_spill_attempts
+        self.max_spill_age = max_spill_age
+
+        # Queued entries: {"event": ..., "attempts": failed delivery rounds, "first_seen": ...}
+        self._pending: "OrderedDict[str, Dict]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._spill_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self._sequence = itertools.count()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._thread: Optional[threading.Thread] = None
+        self._stopping = False
+        self._in_flight = 0
+        self._ready = threading.Event()
+        self.stats = {"submitted": 0, "coalesced": 0, "sent": 0, "retried": 0,
+                      "dropped": 0, "spilled": 0, "replayed": 0}
+
+    # --- Producer side (any thread) ---
+
+    def start(self) -> None:
+        """Start the background sender thread (idempotent)"""
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._thread = threading.Thread(target=self._run_loop, name="webhook-dispatcher", daemon=True)
+            self._thread.start()
+        self._ready.wait(5)
+        atexit.register(self.stop)
+
+    def submit(self, event: Dict) -> bool:
+        """Queue an event without blocking; returns False if it had to be spilled to disk"""
+        self._count("submitted")
+        return self._enqueue({"event": event, "attempts": 0, "first_seen": time.time()})
+
+    def _enqueue(self, entry: Dict) -> bool:
+        self.start()
+        event = entry["event"]
+        key = str(event.get(self.coalesce_key)) if self.coalesce_key and self.coalesce_key in event \
+            else f"_{next(self._sequence)}"
+
+        with self._lock:
+            if key in self._pending:
+                # Latest state wins; the event keeps its place in line
+                self._pending[key] = entry
+                self._count("coalesced")
+                return True
+            if len(self._pending) >= self.max_queue:
+                overflow = True
+            else:
+                overflow = False
+                self._pending[key] = entry
+                full_batch = len(self._pending) >= self.batch_size
+
+        if overflow:
+            self._spill([entry])
+            return False
+        if full_batch:
+            self._notify()
+        return True
+
+    def queue_size(self) -> int:
+        return len(self._pending)
+
+    def flush(self, timeout: float = 30.0) -> bool:
+        """Wait until the queue is empty and nothing is in flight"""
+        deadline = time.time() + timeout
+        self._notify()
+        while self._pending or self._in_flight:
+            if time.time() > deadline:
+                return False
+            time.sleep(0.01)
+        return True
+
+    def stop(self, timeout: float = 10.0) -> None:
+        """Drain what can be sent within timeout; anything left is spilled to disk"""
+        if self._thread is None or self._stopping:
+            return
+        self._stopping = True
+        self._notify()
+        self._thread.join(timeout)
+        with self._lock:
+            leftover = list(self._pending.values())
+            self._pending.clear()
+        if leftover:
+            self._spill(leftover)
+
+    def _count(self, stat: str, n: int = 1):
+        # Updated from producer threads and the sender thread
+        with self._stats_lock:
+            self.stats[stat] += n
+
+    def _notify(self):
+        if self._loop is not None and self._wakeup is not None:
+            self._loop.call_soon_threadsafe(self._wakeup.set)
+
+    # --- Spill file ---
+
+    def _spill(self, entries: List[Dict]) -> None:
+        try:
+            with self._spill_lock, open(self.spill_path, "a", encoding="utf-8") as f:
+                for entry in entries:
+                    f.write(json.dumps(entry) + "\n")
+            self._count("spilled", len(entries))
+            logger.warning(f"Spilled {len(entries)} webhook events to {self.spill_path}")
+        except Exception as e:
+            self._count("dropped", len(entries))
+            logger.error(f"Could not spill webhook events: {e}")
+
+    def _expired(self, entry: Dict) -> bool:
+        return (entry["attempts"] >= self.max_spill_attempts
+                or time.time() - entry["first_seen"] > self.max_spill_age)
+
+    async def _replay_spill(self) -> int:
+        """Move spilled events back into the queue while there is room; returns how many"""
+        with self._lock:
+            room = self.max_queue - len(self._pending)
+        if room <= 0:
+            return 0
+        # File I/O runs in a worker thread so sends in flight are not held up
+        requeue = await asyncio.get_running_loop().run_in_executor(None, self._take_spilled, room)
+        for entry in requeue:
+            self._enqueue(entry)
+        self._count("replayed", len(requeue))
+        if requeue:
+            logger.info(f"Replayed {len(requeue)} spilled webhook events")
+        return len(requeue)
+
+    def _take_spilled(self, room: int) -> List[Dict]:
+        """Up to room unexpired entries from the spill file; the rest is spilled back (blocking)"""
+        if not os.path.exists(self.spill_path):
+            return []
+        replay_path = self.spill_path + ".replay"
+        with self._spill_lock:
+            try:
+                os.replace(self.spill_path, replay_path)
+            except FileNotFoundError:
+                return []
+
+        with open(replay_path, "r", encoding="utf-8") as f:
+            entries = [json.loads(line) for line in f if line.strip()]
+        os.remove(replay_path)
+        # Files written before attempts were recorded hold bare events
+        entries = [entry if "attempts" in entry and "event" in entry
+                   else {"event": entry, "attempts": 0, "first_seen": time.time()} for entry in entries]
+
+        expired = [entry for entry in entries if self._expired(entry)]
+        if expired:
+            self._count("dropped", len(expired))
+            logger.error(f"Dropped {len(expired)} spilled webhook events after "
+                         f"{self.max_spill_attempts} attempts or {self.max_spill_age:.0f}s")
+        entries = [entry for entry in entries if not self._expired(entry)]
+
+        requeue, leftover = entries[:room], entries[room:]
+        if leftover:
+            self._spill(leftover)
+        return requeue
+
+    # --- Consumer side (background event loop) ---
+
+    def _run_loop(self):
+        asyncio.run(self._drain_forever())
+
+    def _take_batch(self) -> List[Dict]:
+        with self._lock:
+            batch = []
+            while self._pending and len(batch) < self.batch_size:
+                batch.append(self._pending.popitem(last=False)[1])
+            # Counted under the lock so flush() never sees the batch in neither place
+            self._in_flight += len(batch)
+            return batch
+
+    async def _drain_forever(self):
+        import httpx
+
+        self._loop = asyncio.get_running_loop()
+        self._wakeup = asyncio.Event()
+        limits = httpx.Limits(max_connections=self.max_connections,
+                              max_keepalive_connections=self.max_connections)
+        last_replay = 0.0
+
+        async with httpx.AsyncClient(timeout=self.timeout, limits=limits) as client:
+            self._ready.set()
+            while True:
+                # Cleared before looking for work, so a wake-up during a send or replay is not lost
+                self._wakeup.clear()
+                batch = self._take_batch()
+                if batch:
+                    try:
+                        await asyncio.gather(*(self._send(client, entry) for entry in batch))
+                    finally:
+                        with self._lock:
+                            self._in_flight -= len(batch)
+                    continue
+                if self._stopping:
+                    return
+
+                if time.time() - last_replay > self.replay_interval:
+                    last_replay = time.time()
+                    try:
+                        if await self._replay_spill():
+                            continue
+                    except Exception as e:
+                        logger.error(f"Error replaying spilled webhook events: {e}")
+
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), self.flush_interval)
+                except asyncio.TimeoutError:
+                    pass
+
+    async def _send(self, client, entry: Dict) -> None:
+        """POST one event, retrying transient failures with exponential backoff"""
+        event = entry["event"]
+        for attempt in range(self.max_retries + 1):
+            try:
+                response = await client.post(self.url, json=event)
+                if response.status_code < 400:
+                    self._count("sent")
+                    return
+                if response.status_code != 429 and response.status_code < 500:
+                    self._count("dropped")
+                    logger.error(f"Webhook rejected event ({response.status_code}): {event}")
+                    return
+                error = f"HTTP {response.status_code}"
+            except Exception as e:
+                error = str(e) or type(e).__name__
+
+            if attempt < self.max_retries and not self._stopping:
+                self._count("retried")
+                delay = self.backoff_base * (2 ** attempt) * random.uniform(0.5, 1.5)
+                logger.warning(f"Webhook delivery failed ({error}), retrying in {delay:.1f}s")
+                await asyncio.sleep(delay)
+            else:
+                break
+
+        if not self._stopping:  # a round cut short by shutdown does not count
+            entry = dict(entry, attempts=entry["attempts"] + 1)
+        if self._expired(entry):
+            self._count("dropped")
+            logger.error(f"Dropped webhook event after {entry['attempts']} failed delivery rounds: {event}")
+            return
+        self._spill([entry])
+
+
+if __name__ == "__main__":
+    # Demo: a local stub server that fails every third request
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    logging.basicConfig(level=logging.INFO)
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+    received = []
+
+    class StubHandler(BaseHTTPRequestHandler):
+        calls = itertools.count(1)
+
+        def do_POST(self):
+            body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+            status = 500 if next(self.calls) % 3 == 0 else 200
+            if status == 200:
+                received.append(json.loads(body))
+            self.send_response(status)
+            self.end_headers()
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_address[1]}/webhook-tired"
+
+    dispatcher = WebhookDispatcher(url, backoff_base=0.05, spill_path="webhook_demo_spill.jsonl")
+    start = time.perf_counter()
+    for i in range(200):
+        dispatcher.submit({"user": f"user_{i % 50:03d}", "mood": ["Tired", "Sad"], "meal": f"meal {i}"})
+    print(f"Submitted 200 events in {(time.perf_counter() - start) * 1000:.1f} ms")
+
+    dispatcher.flush()
+    dispatcher.stop()
+    server.shutdown()
+    print(f"Stub server received {len(received)} events for {len({e['user'] for e in received})} users")
+    print(f"Dispatcher stats: {dispatcher.stats}")
+    if os.path.exists(dispatcher.spill_path):
+        os.remove(dispatcher.spill_path)